@@ -0,0 +1,170 @@
+"""Camera framing used by the CameraReticleExtension
+
+The reticle guides frame the film gate of the viewport's active camera rather than the whole render target: the
+gate aspect ratio comes from the camera apertures and anamorphic squeeze, and overscan shrinks the gate within the
+render target. CameraFramingTracker only subscribes to changes of the attributes the framing depends on, on the
+active camera prim, so edits to any other prim of the stage never reach the overlay.
+"""
+from typing import NamedTuple
+
+import carb
+
+from . import constants
+
+
+class CameraFraming(NamedTuple):
+    """The framing of a camera's film gate.
+
+    Attributes:
+        gate_aspect_ratio (float): Desqueezed aspect ratio of the film gate, or None to frame the whole render target.
+        overscan (float): Render target area rendered beyond the gate, e.g. 0.1 for 10% overscan.
+    """
+    gate_aspect_ratio: float = None
+    overscan: float = 0.0
+
+
+# Framing of viewports without a camera, or of cameras without apertures: the whole render target.
+DEFAULT_FRAMING = CameraFraming()
+
+
+def get_current_timecode():
+    """Get the current time of the timeline.
+
+    Returns:
+        float: The current timecode, or None if omni.timeline is unavailable.
+    """
+    try:
+        import omni.timeline
+    except ImportError:
+        return None
+    timeline = omni.timeline.get_timeline_interface()
+    return timeline.get_current_time() * timeline.get_time_codes_per_seconds()
+
+
+def get_camera_framing(prim, timecode=None):
+    """Read the framing of a camera prim.
+
+    Args:
+        prim (Usd.Prim): The camera prim.
+        timecode (float): The timecode to read the framing attributes at, or None for their default values.
+
+    Returns:
+        CameraFraming: The framing, DEFAULT_FRAMING if the prim isn't a valid camera.
+    """
+    if not prim or not prim.IsValid():
+        return DEFAULT_FRAMING
+    from pxr import Usd
+    time = Usd.TimeCode.Default() if timecode is None else Usd.TimeCode(timecode)
+
+    def get_value(name, default):
+        attribute = prim.GetAttribute(name)
+        value = attribute.Get(time) if attribute else None
+        return default if value is None else float(value)
+
+    horizontal_aperture = get_value(constants.CAMERA_HORIZONTAL_APERTURE_ATTRIBUTE, 0.0)
+    vertical_aperture = get_value(constants.CAMERA_VERTICAL_APERTURE_ATTRIBUTE, 0.0)
+    squeeze = get_value(constants.CAMERA_SQUEEZE_ATTRIBUTE, 1.0)
+    overscan = max(get_value(constants.CAMERA_OVERSCAN_ATTRIBUTE, 0.0), 0.0)
+    if horizontal_aperture <= 0 or vertical_aperture <= 0 or squeeze <= 0:
+        return CameraFraming(None, overscan)
+    return CameraFraming(horizontal_aperture * squeeze / vertical_aperture, overscan)
+
+
+class CameraFramingTracker:
+    """Keep the framing of a viewport's active camera, read once per change of its framing attributes.
+
+    The framing is read at the current time of the timeline, lazily on the first get_framing() call after the camera,
+    one of its framing attributes or the current time changed. Changes are watched per attribute path through the
+    omni.usd watcher.
+    """
+    def __init__(self, on_changed=None):
+        """CameraFramingTracker constructor
+
+        Args:
+            on_changed (Callable): Called without arguments when the tracked camera or one of its framing
+                attributes changed.
+        """
+        self._on_changed = on_changed
+        self._stage = None
+        self._camera_path = None
+        self._framing = DEFAULT_FRAMING
+        # Timecode the framing was read at
+        self._timecode = None
+        self._dirty = False
+        self._subs = []
+
+    def destroy(self):
+        """Stop watching the camera."""
+        self._subs = []
+        self._stage = None
+        self._on_changed = None
+
+    @property
+    def camera_path(self):
+        """str: Path of the tracked camera, or None."""
+        return self._camera_path
+
+    @property
+    def stage(self):
+        """Usd.Stage: Stage of the tracked camera, or None."""
+        return self._stage
+
+    def get_camera_prim(self):
+        """Get the tracked camera prim.
+
+        Returns:
+            Usd.Prim: The prim, or None if no camera is tracked.
+        """
+        return self._stage.GetPrimAtPath(self._camera_path) if self._camera_path is not None else None
+
+    def set_camera(self, stage, camera_path):
+        """Track another camera and call on_changed. Does nothing if the camera is already tracked.
+
+        Args:
+            stage (Usd.Stage): The stage of the camera.
+            camera_path (str | Sdf.Path): The camera prim path, or None to frame the whole render target.
+        """
+        camera_path = str(camera_path) if camera_path else None
+        if stage is None:
+            camera_path = None
+        if stage is self._stage and camera_path == self._camera_path:
+            return
+        self._stage = stage
+        self._camera_path = camera_path
+        self._subs = self._watch_camera()
+        self._on_camera_changed()
+
+    def _watch_camera(self):
+        if self._camera_path is None:
+            return []
+        try:
+            import omni.usd
+            from pxr import Sdf
+            watcher = omni.usd.get_watcher()
+        except (ImportError, AttributeError):
+            carb.log_info("[omni.example.reticle] USD watcher unavailable: camera framing changes aren't tracked.")
+            return []
+        prim_path = Sdf.Path(self._camera_path)
+        subs = [watcher.subscribe_to_resync_path(prim_path, self._on_camera_changed)]
+        for name in constants.CAMERA_FRAMING_ATTRIBUTES:
+            subs.append(watcher.subscribe_to_change_info_path(prim_path.AppendProperty(name),
+                                                              self._on_camera_changed))
+        return subs
+
+    def _on_camera_changed(self, *args):
+        self._dirty = True
+        if self._on_changed is not None:
+            self._on_changed()
+
+    def get_framing(self):
+        """Get the framing of the tracked camera at the current time of the timeline.
+
+        Returns:
+            CameraFraming: The framing, DEFAULT_FRAMING if no camera is tracked.
+        """
+        timecode = get_current_timecode() if self._camera_path is not None else None
+        if self._dirty or timecode != self._timecode:
+            self._dirty = False
+            self._timecode = timecode
+            self._framing = get_camera_framing(self.get_camera_prim(), timecode)
+        return self._framing
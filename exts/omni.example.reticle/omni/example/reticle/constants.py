@@ -3,11 +3,19 @@ import enum
 
 
 class CompositionGuidelines(enum.IntEnum):
-    """Enum representing all of the composition modes."""
+    """Enum representing the built-in composition modes.
+
+    These are the ids of the guides registered by the guides module. Guides registered by other extensions get
+    their ids from guides.register_guide().
+    """
     OFF = 0
     THIRDS = 1
     QUAD = 2
     CROSSHAIR = 3
+    GOLDEN_RATIO = 4
+    GOLDEN_SPIRAL = 5
+    DIAGONALS = 6
+    GRID = 7
 
 
 DEFAULT_ACTION_SAFE_PERCENTAGE = 93
@@ -16,6 +24,66 @@ DEFAULT_CUSTOM_SAFE_PERCENTAGE = 85
 DEFAULT_LETTERBOX_RATIO = 2.35
 DEFAULT_COMPOSITION_MODE = CompositionGuidelines.OFF
 
+# RGBA colors of the built-in safe areas, and default color of safe areas added with ReticleModel.add_safe_area().
+ACTION_SAFE_COLOR = (1.0, 0.0, 0.0, 1.0)
+TITLE_SAFE_COLOR = (1.0, 1.0, 0.0, 1.0)
+CUSTOM_SAFE_COLOR = (0.0, 1.0, 0.0, 1.0)
+DEFAULT_SAFE_AREA_COLOR = (0.0, 0.75, 1.0, 1.0)
+# RGBA colors of the letterbox bars and of the composition guides.
+LETTERBOX_COLOR = (0.0, 0.0, 0.0, 0.75)
+COMP_LINES_COLOR = (1.0, 1.0, 1.0, 0.6)
+# Style names of the composition guides and of the letterbox in ReticleModel.get_guide_style(). The safe areas are
+# styled by their names.
+COMPOSITION_GUIDE_STYLE = "Composition"
+LETTERBOX_GUIDE_STYLE = "Letterbox"
+# Line thickness of the guides, in pixels.
+DEFAULT_GUIDE_THICKNESS = 1.0
+
 SETTING_RESOLUTION_WIDTH = "/app/renderer/resolution/width"
 SETTING_RESOLUTION_HEIGHT = "/app/renderer/resolution/height"
 SETTING_RESOLUTION_FILL = "/app/runLoops/rendering_0/fillResolution"
+SETTING_INSTRUMENTATION_ENABLED = "/exts/omni.example.reticle/instrumentation/enabled"
+SETTING_PRESETS_PATH = "/exts/omni.example.reticle/presets/path"
+SETTING_DEFER_SCENE_VIEW = "/exts/omni.example.reticle/deferSceneView"
+SETTING_IDLE_SCENE_VIEW = "/exts/omni.example.reticle/idleSceneView"
+SETTING_BAKE_TRACKS = "/exts/omni.example.reticle/bakeTracks"
+SETTING_SYNC_PATH = "/exts/omni.example.reticle/sync/path"
+SETTING_CONTROL_PATH = "/exts/omni.example.reticle/control/path"
+
+# What an overlay does with its SceneView while no guide is enabled: keep it, hide it or destroy it.
+IDLE_SCENE_VIEW_KEEP = "keep"
+IDLE_SCENE_VIEW_HIDE = "hide"
+IDLE_SCENE_VIEW_DESTROY = "destroy"
+
+DEFAULT_PRESETS_PATH = "${data}/omni.example.reticle/presets.json"
+
+# Geometry cache: number of distinct reticle layouts kept, and decimals aspect ratios and ratios are rounded to
+# before being used as cache keys.
+GEOMETRY_CACHE_SIZE = 64
+GEOMETRY_CACHE_PRECISION = 4
+
+# Size in bytes of the file the reticle state is synced between processes through, which bounds the state size.
+SYNC_FILE_SIZE = 64 * 1024
+
+# Largest command batch line accepted by the control endpoint, in bytes.
+CONTROL_MAX_BATCH_SIZE = 1024 * 1024
+
+# Number of rasterized reticle masks (one per resolution and reticle state) kept by the raster module.
+RASTER_MASK_CACHE_SIZE = 8
+
+# Relative aspect ratio difference the viewport frame must move past the render target aspect ratio by before the
+# SceneView aspect ratio policy flips back, so resizes around the boundary don't keep rebuilding the SceneView.
+ASPECT_RATIO_POLICY_HYSTERESIS = 0.01
+
+# Camera attributes the reticle framing is derived from. Squeeze and overscan aren't UsdGeomCamera schema
+# attributes: cameras without them have a squeeze of 1 and no overscan.
+CAMERA_HORIZONTAL_APERTURE_ATTRIBUTE = "horizontalAperture"
+CAMERA_VERTICAL_APERTURE_ATTRIBUTE = "verticalAperture"
+CAMERA_SQUEEZE_ATTRIBUTE = "squeeze"
+CAMERA_OVERSCAN_ATTRIBUTE = "overscan"
+CAMERA_FRAMING_ATTRIBUTES = (
+    CAMERA_HORIZONTAL_APERTURE_ATTRIBUTE,
+    CAMERA_VERTICAL_APERTURE_ATTRIBUTE,
+    CAMERA_SQUEEZE_ATTRIBUTE,
+    CAMERA_OVERSCAN_ATTRIBUTE,
+)
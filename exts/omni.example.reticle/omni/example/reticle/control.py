@@ -0,0 +1,285 @@
+"""Local control endpoint for the CameraReticleExtension
+
+Pipeline tools configure the reticles of many viewports through a Unix socket rather than the reticle menu, e.g. with
+tools/scripts/reticle_control.py. Each line sent is a JSON batch of commands, applied to the models of the targeted
+viewports as one coalesced update, and answered by a JSON line reporting how long applying the batch took:
+
+    {"id": 1, "viewports": ["Viewport"], "commands": [
+        {"op": "set", "values": {"composition_mode": 1, "letterbox_enabled": true, "letterbox_ratio": 2.39}},
+        {"op": "set_safe_area", "name": "Title Safe", "enabled": true, "percentage": 90}]}
+    -> {"id": 1, "ok": true, "viewports": ["Viewport"], "apply_ms": 0.41}
+
+Commands:
+    set: Set the ReticleModel submodels in "values", keyed by ReticleModel.SUBMODEL_NAMES.
+    set_safe_area: Set "enabled" and/or "percentage" of the safe area called "name".
+    add_safe_area: Add a safe area, with the ReticleModel.add_safe_area() arguments.
+    remove_safe_area: Remove the safe area called "name".
+    set_guide_style: Set the style of a guide, with the ReticleModel.set_guide_style() arguments.
+
+Every viewport is targeted if "viewports" is omitted, and a batch with "get_state" set to true is answered with the
+resulting state of each targeted viewport. A batch is applied entirely or, if any of its commands fails, not at all.
+"""
+import asyncio
+import json
+import os
+import socket
+import stat
+import time
+
+import carb
+import carb.tokens
+
+from . import constants
+from .instrumentation import stats, timed
+from .models import ReticleModel
+
+
+def get_control_path():
+    """Get the path of the control socket from the SETTING_CONTROL_PATH carb setting.
+
+    Returns:
+        str: The path, with carb tokens such as ${temp} resolved, or None if the endpoint is disabled.
+    """
+    path = carb.settings.get_settings().get(constants.SETTING_CONTROL_PATH)
+    if not path:
+        return None
+    return carb.tokens.get_tokens_interface().resolve(path)
+
+
+def _set_values(model, values):
+    if not isinstance(values, dict):
+        raise ValueError(f"Expected the values keyed by name, got {values!r}")
+    for name, value in values.items():
+        if name not in ReticleModel.SUBMODEL_NAMES:
+            raise ValueError(f"Unknown reticle value '{name}'")
+        if not isinstance(value, (bool, int, float)):
+            raise ValueError(f"Expected a number for '{name}', got {value!r}")
+        getattr(model, name).set_value(value)
+
+
+def _set_safe_area(model, name, enabled=None, percentage=None):
+    safe_area = model.get_safe_area(name)
+    if safe_area is None:
+        raise ValueError(f"There is no safe area named '{name}'")
+    if enabled is not None:
+        safe_area.enabled.set_value(bool(enabled))
+    if percentage is not None:
+        safe_area.percentage.set_value(float(percentage))
+
+
+# Command op -> function called with the model and the other command keys as keyword arguments
+_COMMANDS = {
+    "set": _set_values,
+    "set_safe_area": _set_safe_area,
+    "add_safe_area": ReticleModel.add_safe_area,
+    "remove_safe_area": ReticleModel.remove_safe_area,
+    "set_guide_style": ReticleModel.set_guide_style,
+}
+
+
+def _parse_command(command):
+    """Get the function and keyword arguments of a command, raising ValueError if it isn't valid."""
+    if not isinstance(command, dict) or command.get("op") not in _COMMANDS:
+        raise ValueError(f"Unknown command {command!r}, expected an op among {sorted(_COMMANDS)}")
+    kwargs = dict(command)
+    return _COMMANDS[kwargs.pop("op")], kwargs
+
+
+class ReticleControlServer:
+    """Apply command batches received on a Unix socket to the overlays of a ReticleManager.
+
+    The server runs on the asyncio event loop of Kit, so batches are applied on the main thread between app updates.
+    The socket is only accessible to the user running Kit.
+    """
+    def __init__(self, manager, path: str):
+        """ReticleControlServer constructor
+
+        Args:
+            manager (ReticleManager): The manager of the overlays to control.
+            path (str): The Unix socket path.
+        """
+        self.manager = manager
+        self.path = path
+        self._server = None
+        # Inode of the bound socket file, to only remove the file this server created
+        self._socket_inode = None
+        self._start_task = None
+        self._writers = set()
+
+    @property
+    def serving(self):
+        """bool: Whether the server is accepting connections."""
+        return self._server is not None
+
+    def start(self):
+        """Start accepting connections on the next iteration of the event loop."""
+        if not hasattr(asyncio, "start_unix_server"):
+            carb.log_warn("[omni.example.reticle] Unix sockets aren't available: the reticle control endpoint is off.")
+            return
+        if self._start_task is None and self._server is None:
+            self._start_task = asyncio.ensure_future(self._start())
+
+    async def _start(self):
+        try:
+            if os.path.exists(self.path) and stat.S_ISSOCK(os.stat(self.path).st_mode):
+                if await self._is_served():
+                    carb.log_warn(f"[omni.example.reticle] '{self.path}' is served by another process: the reticle "
+                                  "control endpoint is off.")
+                    return
+                # A socket file left behind by a Kit process that crashed would make binding fail.
+                os.unlink(self.path)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            sock = self._bind()
+            self._socket_inode = os.stat(self.path).st_ino
+            self._server = await asyncio.start_unix_server(self._handle_connection, sock=sock,
+                                                           limit=constants.CONTROL_MAX_BATCH_SIZE)
+        except OSError as e:
+            carb.log_warn(f"[omni.example.reticle] Failed to start the reticle control endpoint on '{self.path}': {e}")
+        finally:
+            self._start_task = None
+
+    async def _is_served(self):
+        """Get whether a process accepts connections on the socket path."""
+        try:
+            _, writer = await asyncio.open_unix_connection(self.path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+        writer.close()
+        return True
+
+    def _bind(self):
+        """Bind a socket to the path, which is only ever accessible to the user running Kit."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The umask applies to the socket file as it is created, unlike a chmod() after binding.
+        umask = os.umask(0o177)
+        try:
+            sock.bind(self.path)
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        return sock
+
+    def destroy(self):
+        """Stop accepting connections, close the open ones and remove the socket file."""
+        if self._start_task is not None:
+            self._start_task.cancel()
+            self._start_task = None
+        for writer in self._writers:
+            writer.close()
+        self._writers = set()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            try:
+                # The file may have been replaced, e.g. by a process started after this one crashed.
+                if os.stat(self.path).st_ino == self._socket_inode:
+                    os.unlink(self.path)
+            except OSError:
+                pass
+        self.manager = None
+
+    async def _handle_connection(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The batch is larger than CONTROL_MAX_BATCH_SIZE: the rest of the stream can't be framed.
+                    writer.write(self._encode({"ok": False, "error": "Batch too large"}))
+                    break
+                if not line:
+                    break
+                writer.write(self._encode(self.handle_request(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _encode(response):
+        return json.dumps(response, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def handle_request(self, line):
+        """Apply a JSON batch request and get its response.
+
+        Args:
+            line (bytes | str): The JSON request, as described in the module docstring.
+
+        Returns:
+            dict: The response, with "ok" false and an "error" message if the batch wasn't applied.
+        """
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Expected a JSON object")
+            request_id = request.get("id")
+            titles, apply_ms = self.apply_batch(request.get("commands", []), request.get("viewports"))
+        except Exception as e:
+            # Any failure is answered, rather than ending the connection without a response.
+            if stats.enabled:
+                stats.increment("control.rejected_batches")
+            return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+        response = {"id": request_id, "ok": True, "viewports": titles, "apply_ms": apply_ms}
+        if request.get("get_state"):
+            overlays = self.manager.get_overlays()
+            response["states"] = {title: overlays[title].model.get_state().to_dict() for title in titles}
+        return response
+
+    @timed("control.apply_batch")
+    def apply_batch(self, commands, viewports=None):
+        """Apply a batch of commands to the models of some overlays, as one update of each model.
+
+        The overlays are updated before returning, even if their model debounces changes. If a command fails, the
+        models are restored to their state before the batch.
+
+        Args:
+            commands (list): The commands, as described in the module docstring.
+            viewports (list): Titles of the viewport windows to apply the commands to. All of them if None.
+
+        Returns:
+            tuple: The titles of the viewport windows the commands were applied to, and the apply duration in
+            milliseconds.
+
+        Raises:
+            ValueError: If a viewport window isn't tracked or a command is invalid.
+            TypeError: If a command has unexpected arguments.
+            Exception: Whatever a command raised, once the models were restored.
+        """
+        overlays = self.manager.get_overlays()
+        titles = list(overlays) if viewports is None else [str(title) for title in viewports]
+        missing = [title for title in titles if title not in overlays]
+        if missing:
+            raise ValueError(f"Unknown viewport windows {missing}")
+        parsed_commands = [_parse_command(command) for command in commands]
+        models = []
+        for title in titles:
+            # Viewports sharing a model only apply the batch once.
+            if all(overlays[title].model is not model for model in models):
+                models.append(overlays[title].model)
+
+        start = time.perf_counter()
+        for model in models:
+            model.begin_update()
+        snapshots = [model.get_state() for model in models]
+        try:
+            for model in models:
+                for fn, kwargs in parsed_commands:
+                    fn(model, **kwargs)
+        except Exception:
+            # Whatever failed, the batch is either applied entirely or not at all.
+            for model, snapshot in zip(models, snapshots):
+                model.apply_state(snapshot)
+            raise
+        finally:
+            for model in models:
+                model.end_update()
+                model.flush()
+        if stats.enabled:
+            stats.increment("control.batches")
+        return titles, (time.perf_counter() - start) * 1e3
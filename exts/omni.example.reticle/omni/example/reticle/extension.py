@@ -1,10 +1,12 @@
+import sys
+
 import carb
 import omni.ext
-from omni.kit.viewport.utility import get_active_viewport_window
 
 from . import constants
-from .models import ReticleModel
-from .views import ReticleOverlay
+from .instrumentation import SettingsSubscription
+from .manager import ReticleManager
+from .presets import PresetStore, ReticlePresets, get_presets_path
 
 
 class ExampleViewportReticleExtension(omni.ext.IExt):
@@ -16,13 +18,61 @@ class ExampleViewportReticleExtension(omni.ext.IExt):
         settings = carb.settings.get_settings()
         settings.set(constants.SETTING_RESOLUTION_FILL, False)
 
-        viewport_window = get_active_viewport_window()
-        if viewport_window is not None:
-            reticle_model = ReticleModel()
-            self.reticle = ReticleOverlay(reticle_model, viewport_window, ext_id)
-            self.reticle.build_viewport_overlay()
+        # Record hot path counters and timings while the instrumentation setting is on.
+        self._instrumentation_sub = SettingsSubscription()
+
+        # Attach a reticle to every viewport window, all of them sharing the same ReticleModel.
+        # With every guide off (the default), startup only adds the Reticle button to the viewports.
+        # The SceneView is also hidden whenever every guide gets disabled again.
+        settings.set_default(constants.SETTING_DEFER_SCENE_VIEW, True)
+        settings.set_default(constants.SETTING_IDLE_SCENE_VIEW, constants.IDLE_SCENE_VIEW_HIDE)
+        settings.set_default(constants.SETTING_BAKE_TRACKS, False)
+        self.reticle_manager = ReticleManager(ext_id, share_model=True,
+                                              defer_scene_view=settings.get(constants.SETTING_DEFER_SCENE_VIEW),
+                                              idle_scene_view=settings.get(constants.SETTING_IDLE_SCENE_VIEW),
+                                              bake_tracks=settings.get(constants.SETTING_BAKE_TRACKS))
+
+        # Restore the last used reticle. The presets file is only read on the next app update.
+        self.presets = ReticlePresets(self.reticle_manager.model, PresetStore(get_presets_path()))
+
+        # Mirror the reticle with the other Kit processes syncing the same file, if any. A state already in the
+        # file is adopted right away, and is kept instead of the last used reticle, which would otherwise be restored
+        # over it and published to the other processes.
+        self.sync = None
+        settings.set_default(constants.SETTING_SYNC_PATH, "")
+        if settings.get(constants.SETTING_SYNC_PATH):
+            from .sync import ReticleStateSync, get_sync_path
+            try:
+                self.sync = ReticleStateSync(self.reticle_manager.model, get_sync_path())
+            except (OSError, ValueError) as e:
+                carb.log_warn(f"[omni.example.reticle] Failed to open the reticle sync file: {e}")
+            else:
+                if self.sync.adopted:
+                    self.presets.keep_current()
+
+        # Let pipeline tools configure the reticles of all the viewports through a local socket.
+        self.control = None
+        settings.set_default(constants.SETTING_CONTROL_PATH, "")
+        if settings.get(constants.SETTING_CONTROL_PATH):
+            from .control import ReticleControlServer, get_control_path
+            self.control = ReticleControlServer(self.reticle_manager, get_control_path())
+            self.control.start()
 
     def on_shutdown(self):
         """ Executed when the extension is disabled."""
         carb.log_info("[omni.example.reticle] ExampleViewportReticleExtension shutdown")
-        self.reticle.destroy()
+        if self.control is not None:
+            self.control.destroy()
+            self.control = None
+        if self.sync is not None:
+            self.sync.destroy()
+            self.sync = None
+        self.presets.destroy()
+        self.presets = None
+        self.reticle_manager.destroy()
+        self.reticle_manager = None
+        # Stop the guide track bake thread, without importing the tracks module if no track was ever baked.
+        if "omni.example.reticle.tracks" in sys.modules:
+            sys.modules["omni.example.reticle.tracks"].shutdown()
+        self._instrumentation_sub.destroy()
+        self._instrumentation_sub = None
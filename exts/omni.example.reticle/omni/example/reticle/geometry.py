@@ -0,0 +1,317 @@
+"""Reticle geometry used by the CameraReticleExtension
+
+All the guide coordinates are computed here with NumPy, independently of omni.ui.scene, so the math can run
+headless and for many aspect ratios at once. Coordinates are in the SceneView's normalized space: with
+PRESERVE_ASPECT_VERTICAL the render target spans [-aspect_ratio, aspect_ratio] x [-1, 1], with
+PRESERVE_ASPECT_HORIZONTAL it spans [-1, 1] x [-1 / aspect_ratio, 1 / aspect_ratio].
+
+Every function broadcasts over leading dimensions, e.g. passing an array of N aspect ratios returns N sets of
+guides.
+"""
+from typing import NamedTuple
+
+import numpy as np
+
+from . import constants, guides
+
+_RECT_CORNER_SIGNS = np.array([[-1, -1], [1, -1], [1, 1], [-1, 1]], dtype=float)
+
+
+def _get_guide(composition_mode):
+    return composition_mode if isinstance(composition_mode, guides.Guide) else guides.get_guide(composition_mode)
+
+
+def _get_guide_scale(guide, half_extents):
+    """Get the (..., 3) scale taking the guide's normalized coordinates to SceneView coordinates."""
+    half_extents = np.asarray(half_extents, dtype=float)
+    half_width = half_extents[..., 0]
+    half_height = half_width if guide.uniform else half_extents[..., 1]
+    return np.stack([half_width, half_height, np.ones_like(half_width)], axis=-1)
+
+
+class PolygonMeshData(NamedTuple):
+    """Flat polygon arrays, as taken by scene.PolygonMesh.
+
+    Attributes:
+        positions (ndarray): (V, 3) vertex positions.
+        colors (ndarray): (V, 4) RGBA vertex colors.
+        vertex_counts (ndarray): (P,) number of vertices of each polygon.
+        vertex_indices (ndarray): (V,) indices of the vertices of each polygon, polygon after polygon.
+        thicknesses (ndarray): (V,) vertex line thicknesses.
+    """
+    positions: np.ndarray
+    colors: np.ndarray
+    vertex_counts: np.ndarray
+    vertex_indices: np.ndarray
+    thicknesses: np.ndarray
+
+
+class ReticleGeometry(NamedTuple):
+    """All the guide coordinates for one render target.
+
+    Attributes:
+        half_extents (ndarray): (..., 2) half width and half height of the framed area: the render target or the
+            camera film gate.
+        composition_lines (ndarray): (..., S, 2, 3) start and end points of the composition guide lines.
+        composition_points (ndarray): (..., P, 3) positions of the composition guide points.
+        safe_rects (ndarray): (..., N, 2) width and height of each centered safe area rectangle.
+        letterbox_rects (ndarray): (..., 2, 4) center x, center y, width and height of both letterbox bars.
+    """
+    half_extents: np.ndarray
+    composition_lines: np.ndarray
+    composition_points: np.ndarray
+    safe_rects: np.ndarray
+    letterbox_rects: np.ndarray
+
+
+def get_half_extents(aspect_ratio, preserve_vertical):
+    """Get the half width and half height of the render target in SceneView space.
+
+    Args:
+        aspect_ratio (float | ArrayLike): The render target aspect ratio(s).
+        preserve_vertical (bool | ArrayLike): Whether the SceneView uses PRESERVE_ASPECT_VERTICAL
+            rather than PRESERVE_ASPECT_HORIZONTAL.
+
+    Returns:
+        ndarray: (..., 2) half extents.
+    """
+    aspect_ratio = np.asarray(aspect_ratio, dtype=float)
+    preserve_vertical = np.asarray(preserve_vertical, dtype=bool)
+    half_width = np.where(preserve_vertical, aspect_ratio, 1.0)
+    half_height = np.where(preserve_vertical, 1.0, 1.0 / aspect_ratio)
+    return np.stack([half_width, half_height], axis=-1)
+
+
+def get_gate_scale(aspect_ratio, gate_aspect_ratio=None, overscan=0.0):
+    """Get the size of a camera film gate relative to the render target.
+
+    The gate is fit inside the render target: it spans the render target width if it is wider than the render
+    target, and its height otherwise. Overscan shrinks the gate within the render target.
+
+    Args:
+        aspect_ratio (float | ArrayLike): The render target aspect ratio(s).
+        gate_aspect_ratio (float | ArrayLike): The desqueezed gate aspect ratio(s). The gate matches the render
+            target aspect ratio if None.
+        overscan (float | ArrayLike): Render target area rendered beyond the gate, e.g. 0.1 for 10% overscan.
+
+    Returns:
+        ndarray: (..., 2) horizontal and vertical scale of the gate.
+    """
+    aspect_ratio = np.asarray(aspect_ratio, dtype=float)
+    gate_aspect_ratio = aspect_ratio if gate_aspect_ratio is None else np.asarray(gate_aspect_ratio, dtype=float)
+    shrink = 1.0 / (1.0 + np.asarray(overscan, dtype=float))
+    ratio = gate_aspect_ratio / aspect_ratio
+    return np.stack(np.broadcast_arrays(np.minimum(1.0, ratio) * shrink, np.minimum(1.0, 1.0 / ratio) * shrink),
+                    axis=-1)
+
+
+def is_preserve_vertical(frame_aspect_ratio, texture_aspect_ratio, previous=None,
+                         hysteresis=constants.ASPECT_RATIO_POLICY_HYSTERESIS):
+    """Get whether the SceneView should use PRESERVE_ASPECT_VERTICAL rather than PRESERVE_ASPECT_HORIZONTAL.
+
+    The viewport fits the render target in its frame: it fills the frame height if the frame is wider than the
+    render target and the frame width otherwise. The SceneView must preserve the same axis. Both policies are
+    equivalent when the aspect ratios match, so the policy only flips once the frame aspect ratio has moved past
+    the render target's by the hysteresis.
+
+    Args:
+        frame_aspect_ratio (float | ArrayLike): Aspect ratio(s) of the frame the SceneView fills.
+        texture_aspect_ratio (float | ArrayLike): Aspect ratio(s) of the render target.
+        previous (bool | ArrayLike): The current policy, as returned by a previous call. No hysteresis if None.
+        hysteresis (float): Relative aspect ratio difference needed to flip the previous policy.
+
+    Returns:
+        bool | ndarray: Whether to preserve the vertical axis.
+    """
+    ratio = np.asarray(frame_aspect_ratio, dtype=float) / np.asarray(texture_aspect_ratio, dtype=float)
+    threshold = 1.0 if previous is None else np.where(previous, 1.0 - hysteresis, 1.0 + hysteresis)
+    preserve_vertical = ratio >= threshold
+    return bool(preserve_vertical) if preserve_vertical.ndim == 0 else preserve_vertical
+
+
+def get_composition_lines(composition_mode, half_extents):
+    """Get the composition guide line segments.
+
+    Args:
+        composition_mode (int | guides.Guide): The composition mode, i.e. the id of a registered guide, or a guide.
+        half_extents (ndarray): (..., 2) half extents from get_half_extents().
+
+    Returns:
+        ndarray: (..., S, 2, 3) line segments.
+    """
+    guide = _get_guide(composition_mode)
+    return guide.segments * _get_guide_scale(guide, half_extents)[..., None, None, :]
+
+
+def get_composition_points(composition_mode, half_extents):
+    """Get the composition guide points.
+
+    Args:
+        composition_mode (int | guides.Guide): The composition mode, i.e. the id of a registered guide, or a guide.
+        half_extents (ndarray): (..., 2) half extents from get_half_extents().
+
+    Returns:
+        ndarray: (..., P, 3) point positions.
+    """
+    guide = _get_guide(composition_mode)
+    return guide.points * _get_guide_scale(guide, half_extents)[..., None, :]
+
+
+def get_safe_rects(percentages, half_extents):
+    """Get the sizes of centered safe area rectangles.
+
+    Args:
+        percentages (ArrayLike): (N,) 0-1 percentages of the render target each rectangle should fill.
+        half_extents (ndarray): (..., 2) half extents from get_half_extents().
+
+    Returns:
+        ndarray: (..., N, 2) width and height of each rectangle.
+    """
+    percentages = np.asarray(percentages, dtype=float)
+    half_extents = np.asarray(half_extents, dtype=float)
+    return 2 * percentages[:, None] * half_extents[..., None, :]
+
+
+def get_letterbox_rects(letterbox_ratio, half_extents):
+    """Get the two letterbox bars.
+
+    The bars are horizontal if the letterbox ratio is wider than the render target, vertical (pillarbox) otherwise.
+
+    Args:
+        letterbox_ratio (float | ArrayLike): The letterbox aspect ratio(s).
+        half_extents (ndarray): (..., 2) half extents from get_half_extents().
+
+    Returns:
+        ndarray: (..., 2, 4) center x, center y, width and height of both bars.
+    """
+    half_extents = np.asarray(half_extents, dtype=float)
+    half_width = half_extents[..., 0]
+    half_height = half_extents[..., 1]
+    letterbox_ratio = np.asarray(letterbox_ratio, dtype=float)
+    horizontal_bars = letterbox_ratio >= half_width / half_height
+
+    bar_half_height = (half_height - half_width / letterbox_ratio) / 2
+    bar_half_width = (half_width - letterbox_ratio * half_height) / 2
+    rect_half_width = np.where(horizontal_bars, half_width, bar_half_width)
+    rect_half_height = np.where(horizontal_bars, bar_half_height, half_height)
+    x_offset = np.where(horizontal_bars, 0.0, half_width - bar_half_width)
+    y_offset = np.where(horizontal_bars, half_height - bar_half_height, 0.0)
+
+    first = np.stack([x_offset, y_offset, rect_half_width * 2, rect_half_height * 2], axis=-1)
+    second = np.stack([-x_offset, -y_offset, rect_half_width * 2, rect_half_height * 2], axis=-1)
+    return np.stack([first, second], axis=-2)
+
+
+def compute_reticle_geometry(aspect_ratio, preserve_vertical, composition_mode, safe_percentages, letterbox_ratio,
+                             gate_scale=None):
+    """Compute every guide of the reticle in one pass.
+
+    The guides frame the camera film gate, the whole render target by default.
+
+    Args:
+        aspect_ratio (float | ArrayLike): The render target aspect ratio(s).
+        preserve_vertical (bool | ArrayLike): Whether the SceneView uses PRESERVE_ASPECT_VERTICAL.
+        composition_mode (int | guides.Guide): The composition mode, i.e. the id of a registered guide, or a guide.
+        safe_percentages (ArrayLike): (N,) 0-1 percentages of the safe area rectangles.
+        letterbox_ratio (float | ArrayLike): The letterbox aspect ratio(s).
+        gate_scale (ArrayLike): (..., 2) size of the film gate relative to the render target, from get_gate_scale().
+
+    Returns:
+        ReticleGeometry: The guide coordinates.
+    """
+    half_extents = get_half_extents(aspect_ratio, preserve_vertical)
+    if gate_scale is not None:
+        half_extents = half_extents * np.asarray(gate_scale, dtype=float)
+    return ReticleGeometry(
+        half_extents=half_extents,
+        composition_lines=get_composition_lines(composition_mode, half_extents),
+        composition_points=get_composition_points(composition_mode, half_extents),
+        safe_rects=get_safe_rects(safe_percentages, half_extents),
+        letterbox_rects=get_letterbox_rects(letterbox_ratio, half_extents),
+    )
+
+
+def get_rect_outlines(rect_sizes, centers=None):
+    """Get the corners of rectangles as closed 4 vertex polygons.
+
+    Args:
+        rect_sizes (ArrayLike): (..., N, 2) width and height of each rectangle.
+        centers (ArrayLike): (..., N, 2) center of each rectangle. Rectangles are centered on the origin if None.
+
+    Returns:
+        ndarray: (..., N, 4, 3) corners of each rectangle, counterclockwise from the bottom left.
+    """
+    half_sizes = np.asarray(rect_sizes, dtype=float) / 2
+    corners = half_sizes[..., None, :] * _RECT_CORNER_SIGNS
+    if centers is not None:
+        corners = corners + np.asarray(centers, dtype=float)[..., None, :]
+    return np.concatenate([corners, np.zeros(corners.shape[:-1] + (1,))], axis=-1)
+
+
+def get_letterbox_polygons(letterbox_rects):
+    """Get the corners of the letterbox bars.
+
+    Args:
+        letterbox_rects (ndarray): (..., 2, 4) letterbox bars from get_letterbox_rects().
+
+    Returns:
+        ndarray: (..., 2, 4, 3) corners of both bars.
+    """
+    letterbox_rects = np.asarray(letterbox_rects, dtype=float)
+    return get_rect_outlines(letterbox_rects[..., 2:], centers=letterbox_rects[..., :2])
+
+
+def pack_polygon_styles(shapes, colors, thicknesses=None):
+    """Get the vertex colors and thicknesses of sets of polygons packed by pack_polygons().
+
+    Restyling packed polygons only needs their shapes, so the vertex positions don't have to be packed again.
+
+    Args:
+        shapes (list): (K, n) number of polygons and of vertices per polygon of each set.
+        colors (list): RGBA color(s) of each set, either one (4,) color for the whole set or (K, 4) colors.
+        thicknesses (list): Line thickness(es) of each set, either one for the whole set or (K,) thicknesses.
+            Every line is 1 thick if None.
+
+    Returns:
+        tuple: (V, 4) vertex colors and (V,) vertex thicknesses.
+    """
+    if thicknesses is None:
+        thicknesses = [1.0] * len(shapes)
+    vertex_colors = [np.zeros((0, 4))]
+    vertex_thicknesses = [np.zeros(0)]
+    for (polygon_count, vertex_count), polygon_colors, polygon_thicknesses in zip(shapes, colors, thicknesses):
+        if polygon_count == 0:
+            continue
+        polygon_colors = np.broadcast_to(np.asarray(polygon_colors, dtype=float), (polygon_count, 4))
+        polygon_thicknesses = np.broadcast_to(np.asarray(polygon_thicknesses, dtype=float), (polygon_count,))
+        vertex_colors.append(np.repeat(polygon_colors, vertex_count, axis=0))
+        vertex_thicknesses.append(np.repeat(polygon_thicknesses, vertex_count))
+    return np.concatenate(vertex_colors), np.concatenate(vertex_thicknesses)
+
+
+def pack_polygons(polygon_sets, colors, thicknesses=None):
+    """Pack sets of polygons into one flat polygon mesh so they can be drawn by a single scene item.
+
+    Args:
+        polygon_sets (list): (K, n, 3) arrays, each holding K polygons of n vertices. Line segments are
+            2 vertex polygons.
+        colors (list): RGBA color(s) of each set, either one (4,) color for the whole set or (K, 4) colors.
+        thicknesses (list): Line thickness(es) of each set, either one for the whole set or (K,) thicknesses.
+            Every line is 1 thick if None.
+
+    Returns:
+        PolygonMeshData: The packed polygons.
+    """
+    shapes = [polygons.shape[:2] for polygons in polygon_sets]
+    vertex_colors, vertex_thicknesses = pack_polygon_styles(shapes, colors, thicknesses)
+    positions = [np.zeros((0, 3))] + [polygons.reshape(-1, 3) for polygons in polygon_sets if len(polygons)]
+    positions = np.concatenate(positions)
+    vertex_counts = [np.zeros(0, dtype=int)] + [np.full(polygon_count, vertex_count, dtype=int)
+                                                for polygon_count, vertex_count in shapes if polygon_count]
+    return PolygonMeshData(
+        positions=positions,
+        colors=vertex_colors,
+        vertex_counts=np.concatenate(vertex_counts),
+        vertex_indices=np.arange(len(positions)),
+        thicknesses=vertex_thicknesses,
+    )
@@ -0,0 +1,320 @@
+"""Composition guide registry used by the CameraReticleExtension
+
+Every composition guide is declared once, here or by other extensions through register_guide(), as line segments
+and points normalized to the render target: x and y span [-1, 1] from the bottom left to the top right corner.
+Curves are sampled into line segments at registration, so drawing a guide only scales its precomputed arrays by
+the render target half extents. The ReticleModel composition mode holds the id of the active guide.
+"""
+import math
+import re
+
+import numpy as np
+
+from .constants import CompositionGuidelines
+
+# Ids given to guides registered without an explicit id. Lower ids are reserved for CompositionGuidelines.
+FIRST_CUSTOM_GUIDE_ID = 100
+
+_PATH_TOKEN_RE = re.compile(r"[A-Za-z]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+class Guide:
+    """A registered composition guide.
+
+    Guides are immutable and compared by identity, so they can be used as cache keys: re-registering an id
+    creates a new Guide.
+
+    Attributes:
+        id (int): The composition mode id.
+        name (str): Unique name, also used as the menu button style name (e.g. for "Button.Image::<name>").
+        label (str): Menu button text.
+        segments (ndarray): (S, 2, 3) read-only line segments in normalized render target units.
+        points (ndarray): (P, 3) read-only points in normalized render target units.
+        uniform (bool): Whether to scale by the half width on both axes, keeping the guide proportions,
+            rather than stretching it to the render target.
+        icon (str): Menu button image path, or None to use the label or an icon from styles.comp_group_style.
+    """
+    __slots__ = ("id", "name", "label", "segments", "points", "uniform", "icon")
+
+    def __init__(self, guide_id, name, label, segments, points, uniform, icon):
+        for attr, value in zip(self.__slots__, (guide_id, name, label, segments, points, uniform, icon)):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Guide is immutable, register a new guide instead")
+
+    def __repr__(self):
+        return f"Guide(id={self.id}, name={self.name!r}, segments={len(self.segments)}, points={len(self.points)})"
+
+
+# Guide id -> Guide, in registration order
+_guides = {}
+# Incremented whenever a guide is registered or unregistered, so menus know when to regenerate their buttons.
+_revision = 0
+
+
+def _as_points(values):
+    """Convert 2D or 3D coordinates to (..., 3) float coordinates."""
+    values = np.asarray(values, dtype=float)
+    if values.shape[-1] == 2:
+        values = np.concatenate([values, np.zeros(values.shape[:-1] + (1,))], axis=-1)
+    elif values.shape[-1] != 3:
+        raise ValueError(f"Coordinates must have 2 or 3 components, got {values.shape[-1]}")
+    return values
+
+
+def register_guide(name, segments=None, points=None, path=None, uniform=False, label=None, icon=None,
+                   guide_id=None):
+    """Register a composition guide, or replace the guide registered with the same id.
+
+    Args:
+        name (str): Unique name of the guide.
+        segments (ArrayLike): (S, 2, 2) or (S, 2, 3) line segments in normalized render target units.
+        points (ArrayLike): (P, 2) or (P, 3) points in normalized render target units.
+        path (str): SVG-like path of line segments, see parse_path(). Added to the segments.
+        uniform (bool): Whether to keep the guide proportions rather than stretching it to the render target.
+        label (str): Menu button text. Uses the name if None.
+        icon (str): Menu button image path.
+        guide_id (int): Id of the guide. A new id is allocated if None.
+
+    Returns:
+        int: The guide id, to be set as the ReticleModel composition mode.
+    """
+    global _revision
+    all_segments = [np.zeros((0, 2, 3))]
+    if segments is not None and len(segments):
+        all_segments.append(_as_points(segments).reshape(-1, 2, 3))
+    if path is not None:
+        all_segments.append(parse_path(path))
+    segments = np.concatenate(all_segments)
+    points = _as_points(points).reshape(-1, 3) if points is not None and len(points) else np.zeros((0, 3))
+    segments.flags.writeable = False
+    points.flags.writeable = False
+
+    if guide_id is None:
+        guide_id = max([FIRST_CUSTOM_GUIDE_ID - 1] + list(_guides)) + 1
+    guide_id = int(guide_id)
+    for guide in _guides.values():
+        if guide.name == name and guide.id != guide_id:
+            raise ValueError(f"A guide named '{name}' is already registered with id {guide.id}")
+    _guides[guide_id] = Guide(guide_id, name, label or name, segments, points, uniform, icon)
+    _revision += 1
+    return guide_id
+
+
+def unregister_guide(guide_id):
+    """Unregister a guide. Overlays using it draw no composition guide until another one is selected.
+
+    Args:
+        guide_id (int): The guide id.
+
+    Raises:
+        ValueError: If guide_id is CompositionGuidelines.OFF.
+    """
+    global _revision
+    if guide_id == CompositionGuidelines.OFF:
+        raise ValueError("The OFF guide can't be unregistered")
+    if _guides.pop(guide_id, None) is not None:
+        _revision += 1
+
+
+def get_guide(guide_id):
+    """Get a registered guide.
+
+    Args:
+        guide_id (int): The guide id.
+
+    Returns:
+        Guide: The guide, or the OFF guide if no guide is registered with that id.
+    """
+    guide = _guides.get(guide_id)
+    return guide if guide is not None else _guides[CompositionGuidelines.OFF]
+
+
+def get_guides():
+    """Get all the registered guides.
+
+    Returns:
+        list: The guides, in registration order.
+    """
+    return list(_guides.values())
+
+
+def get_revision():
+    """Get the registry revision.
+
+    Returns:
+        int: A number that changes whenever a guide is registered or unregistered.
+    """
+    return _revision
+
+
+def parse_path(path):
+    """Parse an SVG-like path of straight lines into line segments.
+
+    Supports the M (move to), L (line to), H (horizontal line to), V (vertical line to) and Z (close path)
+    commands, with lowercase relative variants. Coordinates are in normalized render target units, with y up.
+
+    Args:
+        path (str): The path, e.g. "M -1 -1 L 1 1 M -1 1 L 1 -1".
+
+    Returns:
+        ndarray: (S, 2, 3) line segments.
+
+    Raises:
+        ValueError: If the path is malformed.
+    """
+    tokens = _PATH_TOKEN_RE.findall(path)
+    segments = []
+    position = start = None
+    command = None
+    index = 0
+
+    def read_numbers(count):
+        nonlocal index
+        numbers = tokens[index:index + count]
+        if len(numbers) != count or any(number.isalpha() for number in numbers):
+            raise ValueError(f"Expected {count} coordinate(s) after '{command}' in path '{path}'")
+        index += count
+        return [float(number) for number in numbers]
+
+    while index < len(tokens):
+        if tokens[index].isalpha():
+            command = tokens[index]
+            index += 1
+        elif command is None:
+            raise ValueError(f"Expected a command at '{tokens[index]}' in path '{path}'")
+        upper = command.upper()
+        relative = command.islower() and position is not None
+        if upper == "Z":
+            if position is not None and start is not None and position != start:
+                segments.append((position, start))
+            position = start
+            command = None
+            continue
+        if upper in ("M", "L"):
+            x, y = read_numbers(2)
+            if relative:
+                x, y = position[0] + x, position[1] + y
+        elif position is None:
+            raise ValueError(f"Path '{path}' must start with a move to")
+        elif upper == "H":
+            x, y = read_numbers(1)[0] + (position[0] if relative else 0), position[1]
+        elif upper == "V":
+            x, y = position[0], read_numbers(1)[0] + (position[1] if relative else 0)
+        else:
+            raise ValueError(f"Unsupported path command '{command}'")
+        if upper == "M":
+            start = (x, y)
+            # Further coordinate pairs after a move to are implicit line tos.
+            command = "l" if command.islower() else "L"
+        elif position is None:
+            raise ValueError(f"Path '{path}' must start with a move to")
+        else:
+            segments.append((position, (x, y)))
+        position = (x, y)
+
+    if not segments:
+        return np.zeros((0, 2, 3))
+    segments = np.asarray(segments, dtype=float)
+    return np.concatenate([segments, np.zeros(segments.shape[:-1] + (1,))], axis=-1)
+
+
+def get_polyline_segments(points):
+    """Get the line segments joining consecutive points.
+
+    Args:
+        points (ArrayLike): (N, 2) or (N, 3) points.
+
+    Returns:
+        ndarray: (N - 1, 2, 3) line segments.
+    """
+    points = _as_points(points).reshape(-1, 3)
+    return np.stack([points[:-1], points[1:]], axis=1)
+
+
+def get_grid_segments(columns, rows):
+    """Get the lines splitting the render target into a grid of equal cells.
+
+    Args:
+        columns (int): Number of columns.
+        rows (int): Number of rows.
+
+    Returns:
+        ndarray: (columns + rows - 2, 2, 3) line segments.
+    """
+    xs = np.linspace(-1, 1, columns + 1)[1:-1]
+    ys = np.linspace(-1, 1, rows + 1)[1:-1]
+    vertical = [[[x, -1, 0], [x, 1, 0]] for x in xs]
+    horizontal = [[[-1, y, 0], [1, y, 0]] for y in ys]
+    return np.asarray(vertical + horizontal, dtype=float).reshape(-1, 2, 3)
+
+
+def get_golden_spiral_points(quarter_turns=10, samples_per_quarter_turn=16):
+    """Sample a golden spiral fitted to the render target.
+
+    The spiral is built from quarter circles inscribed in the squares of a recursively subdivided golden
+    rectangle, starting from the bottom left corner and winding clockwise towards its pole.
+
+    Args:
+        quarter_turns (int): Number of quarter circles.
+        samples_per_quarter_turn (int): Number of line segments per quarter circle.
+
+    Returns:
+        ndarray: (N, 3) points along the spiral.
+    """
+    phi = (1 + math.sqrt(5)) / 2
+    x0, y0, x1, y1 = 0.0, 0.0, phi, 1.0
+    arcs = []
+    for turn in range(quarter_turns):
+        side = min(x1 - x0, y1 - y0)
+        direction = turn % 4
+        if direction == 0:
+            center = (x0 + side, y0)
+            x0 += side
+        elif direction == 1:
+            center = (x0, y1 - side)
+            y1 -= side
+        elif direction == 2:
+            center = (x1 - side, y1)
+            x1 -= side
+        else:
+            center = (x1, y0 + side)
+            y0 += side
+        start_angle = math.pi - turn * math.pi / 2
+        angles = np.linspace(start_angle, start_angle - math.pi / 2, samples_per_quarter_turn + 1)
+        # Skip the first sample of every arc but the first, it's the last sample of the previous arc.
+        angles = angles if turn == 0 else angles[1:]
+        arcs.append(np.stack([center[0] + side * np.cos(angles), center[1] + side * np.sin(angles)], axis=-1))
+    points = np.concatenate(arcs)
+    # Stretch the golden rectangle to the normalized render target.
+    points = points / [phi / 2, 0.5] - 1
+    return np.concatenate([points, np.zeros((len(points), 1))], axis=-1)
+
+
+def _register_builtin_guides():
+    golden_section = 1 - 2 / ((1 + math.sqrt(5)) / 2) ** 2
+    register_guide("Off", guide_id=CompositionGuidelines.OFF)
+    register_guide("Thirds", guide_id=CompositionGuidelines.THIRDS, segments=[
+        [[-0.333, -1], [-0.333, 1]],
+        [[0.333, -1], [0.333, 1]],
+        [[-1, -0.333], [1, -0.333]],
+        [[-1, 0.333], [1, 0.333]],
+    ])
+    register_guide("Quad", guide_id=CompositionGuidelines.QUAD, path="M 0 -1 V 1 M -1 0 H 1")
+    register_guide("Crosshair", guide_id=CompositionGuidelines.CROSSHAIR, uniform=True,
+                   path="M 0 0.05 V 0.1 M 0 -0.05 V -0.1 M 0.05 0 H 0.1 M -0.05 0 H -0.1", points=[[0.00005, 0]])
+    register_guide("GoldenRatio", label="Golden Ratio", guide_id=CompositionGuidelines.GOLDEN_RATIO,
+                   segments=[
+                       [[-golden_section, -1], [-golden_section, 1]],
+                       [[golden_section, -1], [golden_section, 1]],
+                       [[-1, -golden_section], [1, -golden_section]],
+                       [[-1, golden_section], [1, golden_section]],
+                   ])
+    register_guide("GoldenSpiral", label="Golden Spiral", guide_id=CompositionGuidelines.GOLDEN_SPIRAL,
+                   segments=get_polyline_segments(get_golden_spiral_points()))
+    register_guide("Diagonals", guide_id=CompositionGuidelines.DIAGONALS, path="M -1 -1 L 1 1 M -1 1 L 1 -1")
+    register_guide("Grid", label="Grid 4x4", guide_id=CompositionGuidelines.GRID, segments=get_grid_segments(4, 4))
+
+
+_register_builtin_guides()
@@ -0,0 +1,144 @@
+"""Optional instrumentation of the CameraReticleExtension hot paths
+
+Counters and histograms are only recorded while the SETTING_INSTRUMENTATION_ENABLED carb setting is on.
+When it is off, instrumented functions only pay for one attribute check.
+"""
+import bisect
+import functools
+import time
+
+import carb
+
+from . import constants
+
+# Upper bounds of the histogram buckets. Durations are recorded in milliseconds.
+HISTOGRAM_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 50, 100, float("inf"))
+
+
+class Histogram:
+    """Bucketed distribution of recorded values."""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.buckets = [0] * len(HISTOGRAM_BUCKETS)
+
+    def record(self, value):
+        """Add a value to the histogram.
+
+        Args:
+            value (float): The value to add.
+        """
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[bisect.bisect_left(HISTOGRAM_BUCKETS, value)] += 1
+
+    def get_report(self):
+        """Get the histogram statistics.
+
+        Returns:
+            dict: count, total, min, max, mean and the bucket counts keyed by upper bound.
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.total / self.count if self.count else None,
+            "buckets": {str(bound): count for bound, count in zip(HISTOGRAM_BUCKETS, self.buckets) if count},
+        }
+
+
+class ReticleStats:
+    """Counters and histograms of the reticle hot paths."""
+    def __init__(self):
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+
+    def reset(self):
+        """Clear all recorded data."""
+        self.counters = {}
+        self.histograms = {}
+
+    def increment(self, name, amount=1):
+        """Increment a counter. Callers on hot paths should check `enabled` first.
+
+        Args:
+            name (str): The counter name.
+            amount (int): The amount to add.
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name, value):
+        """Record a value in a histogram. Callers on hot paths should check `enabled` first.
+
+        Args:
+            name (str): The histogram name.
+            value (float): The value to record.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.record(value)
+
+    def get_report(self):
+        """Get everything recorded so far.
+
+        Returns:
+            dict: "counters" and "histograms" keyed by name.
+        """
+        return {
+            "counters": dict(self.counters),
+            "histograms": {name: histogram.get_report() for name, histogram in self.histograms.items()},
+        }
+
+
+stats = ReticleStats()
+
+
+def timed(name):
+    """Decorator recording the duration of each call, in milliseconds, in the `name` histogram.
+
+    Args:
+        name (str): The histogram name.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not stats.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.record(name, (time.perf_counter() - start) * 1000.0)
+        return wrapper
+    return decorator
+
+
+class SettingsSubscription:
+    """Keeps `stats.enabled` in sync with the SETTING_INSTRUMENTATION_ENABLED carb setting."""
+    def __init__(self):
+        self._settings = carb.settings.get_settings()
+        stats.enabled = bool(self._settings.get(constants.SETTING_INSTRUMENTATION_ENABLED))
+        self._sub = self._settings.subscribe_to_node_change_events(constants.SETTING_INSTRUMENTATION_ENABLED,
+                                                                   self._on_setting_changed)
+
+    def _on_setting_changed(self, item, event_type):
+        enabled = bool(self._settings.get(constants.SETTING_INSTRUMENTATION_ENABLED))
+        if enabled and not stats.enabled:
+            stats.reset()
+        elif not enabled and stats.enabled:
+            carb.log_info(f"[omni.example.reticle] Instrumentation report: {stats.get_report()}")
+        stats.enabled = enabled
+
+    def destroy(self):
+        """Stop following the setting and disable instrumentation."""
+        if self._sub is not None:
+            self._settings.unsubscribe_to_change_events(self._sub)
+            self._sub = None
+        stats.enabled = False
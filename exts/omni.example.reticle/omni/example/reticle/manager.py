@@ -0,0 +1,121 @@
+"""Multi-viewport management for the CameraReticleExtension"""
+import carb
+import omni.ui as ui
+from omni.kit.viewport.utility import get_active_viewport_window
+
+from . import constants
+from .models import ReticleModel
+from .views import ReticleOverlay
+
+
+def get_viewport_windows():
+    """Get all the viewport windows that can host a reticle.
+
+    Returns:
+        list: The viewport windows. Only the active viewport window is returned if the viewport window
+            extension (VP2) isn't available.
+    """
+    try:
+        from omni.kit.viewport.window import get_viewport_window_instances
+    except ImportError:
+        viewport_window = get_active_viewport_window()
+        return [viewport_window] if viewport_window is not None else []
+    return list(get_viewport_window_instances())
+
+
+class ReticleManager:
+    """Attach a ReticleOverlay to every viewport window.
+
+    Viewport windows opened after the manager is created get an overlay as soon as they become visible
+    and overlays of viewport windows that no longer exist are destroyed. All the overlays can share a
+    single ReticleModel, or each viewport can get its own.
+
+    Each overlay only updates the guides of its own viewport: resizing one viewport never touches the
+    others, and a shared model change updates the existing guides in place rather than rebuilding them.
+    """
+    def __init__(self, ext_id: str, share_model: bool = True, model: ReticleModel = None,
+                 defer_scene_view: bool = False, idle_scene_view: str = constants.IDLE_SCENE_VIEW_KEEP,
+                 bake_tracks: bool = False):
+        """ReticleManager constructor
+
+        Args:
+            ext_id (str): The extension id.
+            share_model (bool): Whether all viewports share the same ReticleModel.
+            model (ReticleModel): The shared model. A new one is created if None and share_model is True.
+            defer_scene_view (bool): Whether overlays wait for a guide to be enabled before building their SceneView.
+            idle_scene_view (str): What overlays do with their SceneView while no guide is enabled, one of
+                IDLE_SCENE_VIEW_KEEP, IDLE_SCENE_VIEW_HIDE or IDLE_SCENE_VIEW_DESTROY.
+            bake_tracks (bool): Whether overlays bake the guides of animated cameras for timeline playback.
+        """
+        self.ext_id = ext_id
+        self.share_model = share_model
+        self.defer_scene_view = defer_scene_view
+        self.idle_scene_view = idle_scene_view
+        self.bake_tracks = bake_tracks
+        self.model = None
+        if share_model:
+            self.model = model if model is not None else self._create_model()
+        # Viewport window title -> ReticleOverlay
+        self._overlays = {}
+        self._visibility_changed_sub = ui.Workspace.set_window_visibility_changed_callback(
+            self._on_window_visibility_changed)
+        self.refresh()
+
+    def destroy(self):
+        """Destroy all overlays and stop tracking viewport windows."""
+        if self._visibility_changed_sub is not None:
+            ui.Workspace.remove_window_visibility_changed_callback(self._visibility_changed_sub)
+            self._visibility_changed_sub = None
+        for overlay in self._overlays.values():
+            overlay.destroy()
+        self._overlays = {}
+        self.model = None
+
+    @staticmethod
+    def _create_model():
+        # Coalesce all model changes made within a frame (e.g. slider drags) into one overlay update.
+        return ReticleModel(debounce=True)
+
+    def _on_window_visibility_changed(self, title, visible):
+        self.refresh()
+
+    def refresh(self):
+        """Attach overlays to new viewport windows and destroy the ones of closed viewport windows."""
+        viewport_windows = {viewport_window.title: viewport_window for viewport_window in get_viewport_windows()}
+
+        for title in list(self._overlays):
+            overlay = self._overlays[title]
+            if viewport_windows.get(title) is not overlay.vp_win:
+                overlay.destroy()
+                del self._overlays[title]
+
+        for title, viewport_window in viewport_windows.items():
+            if title not in self._overlays:
+                self._overlays[title] = self._create_overlay(viewport_window)
+
+    def _create_overlay(self, viewport_window):
+        carb.log_info(f"[omni.example.reticle] Attaching reticle to '{viewport_window.title}'")
+        model = self.model if self.share_model else self._create_model()
+        overlay = ReticleOverlay(model, viewport_window, self.ext_id, defer_scene_view=self.defer_scene_view,
+                                 idle_scene_view=self.idle_scene_view, bake_tracks=self.bake_tracks)
+        overlay.build_viewport_overlay()
+        return overlay
+
+    def get_overlays(self):
+        """Get the overlays of all the tracked viewport windows.
+
+        Returns:
+            dict: Viewport window title -> ReticleOverlay
+        """
+        return dict(self._overlays)
+
+    def get_overlay(self, window_title):
+        """Get the overlay of a viewport window.
+
+        Args:
+            window_title (str): The viewport window title.
+
+        Returns:
+            ReticleOverlay: The overlay, or None if the viewport window isn't tracked.
+        """
+        return self._overlays.get(window_title)
@@ -1,7 +1,310 @@
 """Models used by the CameraReticleExtension"""
+import weakref
+from contextlib import contextmanager
+from functools import partial
+from typing import NamedTuple
+
 import omni.ui as ui
 
 from . import constants
+from .instrumentation import stats, timed
+from .utils import DeferredCall
+
+
+# (name, enabled submodel, percentage submodel, color) of the built-in safe areas, which are always the first
+# entries of ReticleModel.safe_areas.
+BUILTIN_SAFE_AREAS = (
+    ("Action Safe", "action_safe_enabled", "action_safe_percentage", constants.ACTION_SAFE_COLOR),
+    ("Title Safe", "title_safe_enabled", "title_safe_percentage", constants.TITLE_SAFE_COLOR),
+    ("Custom Safe", "custom_safe_enabled", "custom_safe_percentage", constants.CUSTOM_SAFE_COLOR),
+)
+
+
+class SafeAreaState(NamedTuple):
+    """Values of one safe area in a ReticleState."""
+    name: str
+    enabled: bool
+    percentage: float
+    color: tuple
+
+    @classmethod
+    def from_value(cls, value):
+        """Create a safe area state from another one, a dict or a (name, enabled, percentage, color) sequence.
+
+        Args:
+            value (SafeAreaState | dict | Sequence): The values.
+
+        Returns:
+            SafeAreaState: The normalized safe area state.
+        """
+        if isinstance(value, dict):
+            value = (value["name"], value.get("enabled", True), value["percentage"],
+                     value.get("color", constants.DEFAULT_SAFE_AREA_COLOR))
+        name, enabled, percentage, color = value
+        return cls(str(name), bool(enabled), float(percentage), tuple(float(channel) for channel in color))
+
+
+class GuideStyle(NamedTuple):
+    """Drawing style of one guide in a ReticleState.
+
+    Attributes:
+        color (tuple): RGBA color of the guide, its alpha being the guide opacity.
+        thickness (float): Line thickness of the guide, in pixels.
+    """
+    color: tuple
+    thickness: float = constants.DEFAULT_GUIDE_THICKNESS
+
+    @property
+    def opacity(self):
+        """float: Opacity of the guide, the alpha of its color."""
+        return self.color[3]
+
+    @classmethod
+    def from_value(cls, value):
+        """Create a guide style from another one, a dict or a (color, thickness) sequence.
+
+        Args:
+            value (GuideStyle | dict | Sequence): The values.
+
+        Returns:
+            GuideStyle: The normalized guide style.
+        """
+        if isinstance(value, dict):
+            value = (value["color"], value.get("thickness", constants.DEFAULT_GUIDE_THICKNESS))
+        color, thickness = value
+        return cls(tuple(float(channel) for channel in color), float(thickness))
+
+
+class SafeAreaModel:
+    """Submodels of one safe area of a ReticleModel."""
+    def __init__(self, name: str, color: tuple, enabled: ui.SimpleBoolModel, percentage: ui.SimpleFloatModel,
+                 thickness: float = constants.DEFAULT_GUIDE_THICKNESS):
+        """SafeAreaModel constructor
+
+        Args:
+            name (str): The safe area name, unique within its ReticleModel.
+            color (tuple): RGBA color of the safe area rectangle.
+            enabled (SimpleBoolModel): Whether the safe area is shown.
+            percentage (SimpleFloatModel): 0-100 percentage of the render target the safe area fills.
+            thickness (float): Line thickness of the safe area rectangle, in pixels.
+        """
+        self.name = name
+        # Only change the style with ReticleModel.set_guide_style(), so the change is notified.
+        self.color = tuple(float(channel) for channel in color)
+        self.thickness = float(thickness)
+        self.enabled = enabled
+        self.percentage = percentage
+        self._callback_ids = []
+
+    def _add_value_changed_fn(self, fn):
+        self._callback_ids += [(submodel, submodel.add_value_changed_fn(fn))
+                               for submodel in (self.enabled, self.percentage)]
+
+    def _remove_value_changed_fns(self):
+        for submodel, callback_id in self._callback_ids:
+            submodel.remove_value_changed_fn(callback_id)
+        self._callback_ids = []
+
+    def get_state(self):
+        """Get the current values.
+
+        Returns:
+            SafeAreaState: The values.
+        """
+        return SafeAreaState(self.name, self.enabled.as_bool, self.percentage.as_float, self.color)
+
+
+class ReticleChangedSubscription:
+    """Handle returned by the ReticleModel callback registration methods to remove the callback."""
+    def __init__(self, model, callback_ref):
+        self._model_ref = weakref.ref(model)
+        self._callback_ref = callback_ref
+
+    def unsubscribe(self):
+        """Remove the callback from the model. Safe to call several times."""
+        model = self._model_ref()
+        if model is not None:
+            model._remove_callback_ref(self._callback_ref)
+        self._callback_ref = None
+
+
+class ReticleState:
+    """Immutable snapshot of all the ReticleModel values.
+
+    Snapshots are cheap to compare, hash and diff, so consumers can early-out when nothing they care about
+    changed and caches can key on them without reading the UI models.
+    """
+    FIELDS = (
+        "composition_mode",
+        "action_safe_enabled",
+        "action_safe_percentage",
+        "title_safe_enabled",
+        "title_safe_percentage",
+        "custom_safe_enabled",
+        "custom_safe_percentage",
+        "letterbox_enabled",
+        "letterbox_ratio",
+        "extra_safe_areas",
+        "guide_styles",
+    )
+    __slots__ = FIELDS + ("_values", "_hash", "_safe_areas", "_guide_style_map")
+
+    def __init__(self, composition_mode, action_safe_enabled, action_safe_percentage, title_safe_enabled,
+                 title_safe_percentage, custom_safe_enabled, custom_safe_percentage, letterbox_enabled,
+                 letterbox_ratio, extra_safe_areas=(), guide_styles=()):
+        extra_safe_areas = tuple(SafeAreaState.from_value(safe_area) for safe_area in extra_safe_areas)
+        # Every guide has a style: the given ones override the defaults, and the styles of guides that don't exist
+        # are dropped. The safe area colors are the ones of their styles.
+        style_map = {
+            constants.COMPOSITION_GUIDE_STYLE: GuideStyle(constants.COMP_LINES_COLOR),
+            constants.LETTERBOX_GUIDE_STYLE: GuideStyle(constants.LETTERBOX_COLOR),
+        }
+        style_map.update((name, GuideStyle(color)) for name, _, _, color in BUILTIN_SAFE_AREAS)
+        style_map.update((safe_area.name, GuideStyle(safe_area.color)) for safe_area in extra_safe_areas)
+        if isinstance(guide_styles, dict):
+            guide_styles = guide_styles.items()
+        style_map.update((str(name), GuideStyle.from_value(style)) for name, style in guide_styles
+                         if name in style_map)
+        extra_safe_areas = tuple(safe_area._replace(color=style_map[safe_area.name].color)
+                                 for safe_area in extra_safe_areas)
+        values = (int(composition_mode), bool(action_safe_enabled), float(action_safe_percentage),
+                  bool(title_safe_enabled), float(title_safe_percentage), bool(custom_safe_enabled),
+                  float(custom_safe_percentage), bool(letterbox_enabled), float(letterbox_ratio), extra_safe_areas,
+                  tuple(style_map.items()))
+        for name, value in zip(self.FIELDS, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, "_values", values)
+        object.__setattr__(self, "_hash", hash(values))
+        object.__setattr__(self, "_guide_style_map", style_map)
+        builtin_safe_areas = tuple(
+            SafeAreaState(name, getattr(self, enabled_name), getattr(self, percentage_name), style_map[name].color)
+            for name, enabled_name, percentage_name, _ in BUILTIN_SAFE_AREAS
+        )
+        object.__setattr__(self, "_safe_areas", builtin_safe_areas + extra_safe_areas)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ReticleState is immutable, use replace() to get a modified copy")
+
+    def __eq__(self, other):
+        if not isinstance(other, ReticleState):
+            return NotImplemented
+        return self._values == other._values
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in zip(self.FIELDS, self._values))
+        return f"ReticleState({fields})"
+
+    def __reduce__(self):
+        return (ReticleState, self._values)
+
+    def as_tuple(self):
+        """Get the values in FIELDS order.
+
+        Returns:
+            tuple: The snapshot values.
+        """
+        return self._values
+
+    def diff(self, other):
+        """Get the names of the fields that differ from another snapshot.
+
+        Args:
+            other (ReticleState): The snapshot to compare with. All fields differ if None.
+
+        Returns:
+            frozenset: The names of the differing fields.
+        """
+        if other is None:
+            return frozenset(self.FIELDS)
+        return frozenset(name for name, value, other_value in zip(self.FIELDS, self._values, other._values)
+                         if value != other_value)
+
+    @property
+    def safe_areas(self):
+        """tuple: SafeAreaState of every safe area, the built-in ones first, in ReticleModel.safe_areas order."""
+        return self._safe_areas
+
+    def get_guide_style(self, name):
+        """Get the style of a guide.
+
+        Args:
+            name (str): COMPOSITION_GUIDE_STYLE, LETTERBOX_GUIDE_STYLE or a safe area name.
+
+        Returns:
+            GuideStyle: The style, or None if there is no guide with that name.
+        """
+        return self._guide_style_map.get(name)
+
+    @property
+    def has_guides(self):
+        """bool: Whether any guide is enabled."""
+        return (self.composition_mode != constants.CompositionGuidelines.OFF or self.letterbox_enabled
+                or any(safe_area.enabled for safe_area in self._safe_areas))
+
+    @classmethod
+    def get_default(cls):
+        """Get the snapshot of a newly created ReticleModel.
+
+        Returns:
+            ReticleState: The default values.
+        """
+        return cls(
+            composition_mode=constants.DEFAULT_COMPOSITION_MODE,
+            action_safe_enabled=False,
+            action_safe_percentage=constants.DEFAULT_ACTION_SAFE_PERCENTAGE,
+            title_safe_enabled=False,
+            title_safe_percentage=constants.DEFAULT_TITLE_SAFE_PERCENTAGE,
+            custom_safe_enabled=False,
+            custom_safe_percentage=constants.DEFAULT_CUSTOM_SAFE_PERCENTAGE,
+            letterbox_enabled=False,
+            letterbox_ratio=constants.DEFAULT_LETTERBOX_RATIO,
+        )
+
+    def to_dict(self):
+        """Get the values keyed by field name, e.g. for serialization.
+
+        Returns:
+            dict: The snapshot values. The extra safe areas are dicts keyed by SafeAreaState field name and the guide
+            styles are dicts keyed by guide name.
+        """
+        values = dict(zip(self.FIELDS, self._values))
+        values["extra_safe_areas"] = [dict(safe_area._asdict()) for safe_area in self.extra_safe_areas]
+        values["guide_styles"] = {name: {"color": list(style.color), "thickness": style.thickness}
+                                  for name, style in self.guide_styles}
+        return values
+
+    @classmethod
+    def from_dict(cls, values, defaults=None):
+        """Create a snapshot from values keyed by field name.
+
+        Args:
+            values (dict): The values. Unknown keys are ignored.
+            defaults (ReticleState): Snapshot to take missing values from. Uses get_default() if None.
+
+        Returns:
+            ReticleState: The new snapshot.
+        """
+        if defaults is None:
+            defaults = cls.get_default()
+        merged = defaults.to_dict()
+        merged.update((name, value) for name, value in values.items() if name in cls.FIELDS)
+        return cls(**merged)
+
+    def replace(self, **changes):
+        """Get a copy of the snapshot with some fields replaced.
+
+        Args:
+            **changes: New values keyed by field name.
+
+        Returns:
+            ReticleState: The modified copy.
+        """
+        values = dict(zip(self.FIELDS, self._values))
+        values.update(changes)
+        return ReticleState(**values)
 
 
 class ReticleModel:
@@ -10,8 +313,36 @@ class ReticleModel:
     The ReticleOverlay and ReticleMenu classes need to share the same data and stay
     in sync with updates from user input. This is achieve by passing the same
     ReticleModel object to both classes.
+
+    Submodel changes are coalesced: changes made between begin_update() and end_update()
+    (or inside a batch_update() block) produce a single notification. With debounce enabled,
+    all changes made within the same app update are also coalesced into one notification
+    sent on the next update.
+
+    Besides the three built-in safe areas, any number of safe areas can be added with
+    add_safe_area(). Changes to those are notified as "extra_safe_areas".
+
+    The color, opacity and line thickness of every guide are set with set_guide_style() and
+    notified as "guide_styles", so views can restyle their items without rebuilding them.
     """
-    def __init__(self):
+    SUBMODEL_NAMES = (
+        "composition_mode",
+        "action_safe_enabled",
+        "action_safe_percentage",
+        "title_safe_enabled",
+        "title_safe_percentage",
+        "custom_safe_enabled",
+        "custom_safe_percentage",
+        "letterbox_enabled",
+        "letterbox_ratio",
+    )
+
+    def __init__(self, debounce=False):
+        """ReticleModel constructor
+
+        Args:
+            debounce (bool): Whether to defer change notifications to the next app update.
+        """
         self.composition_mode = ui.SimpleIntModel(constants.DEFAULT_COMPOSITION_MODE)
         self.action_safe_enabled = ui.SimpleBoolModel(False)
         self.action_safe_percentage = ui.SimpleFloatModel(constants.DEFAULT_ACTION_SAFE_PERCENTAGE, min=0, max=100)
@@ -21,38 +352,345 @@ class ReticleModel:
         self.custom_safe_percentage = ui.SimpleFloatModel(constants.DEFAULT_CUSTOM_SAFE_PERCENTAGE, min=0, max=100)
         self.letterbox_enabled = ui.SimpleBoolModel(False)
         self.letterbox_ratio = ui.SimpleFloatModel(constants.DEFAULT_LETTERBOX_RATIO, min=0.001)
+        # All the safe areas, the built-in ones first. Only change it with add_safe_area() and remove_safe_area().
+        self.safe_areas = [SafeAreaModel(name, color, getattr(self, enabled_name), getattr(self, percentage_name))
+                           for name, enabled_name, percentage_name, color in BUILTIN_SAFE_AREAS]
+        # Incremented whenever a safe area is added or removed
+        self.safe_areas_revision = 0
+        # Styles of the guides other than the safe areas, which keep their own
+        self._guide_styles = {
+            constants.COMPOSITION_GUIDE_STYLE: GuideStyle(constants.COMP_LINES_COLOR),
+            constants.LETTERBOX_GUIDE_STYLE: GuideStyle(constants.LETTERBOX_COLOR),
+        }
 
-        self._register_submodel_callbacks()
-
+        self._state = None
         self._callbacks = []
+        self._changed_fields = set()
+        self._update_depth = 0
+        self._debounce = debounce
+        self._deferred_notify = DeferredCall(self._notify)
+
+        self._register_submodel_callbacks()
 
     def _register_submodel_callbacks(self):
         """Register to listen to when any submodel values change."""
-        self.composition_mode.add_value_changed_fn(self._reticle_changed)
-        self.action_safe_enabled.add_value_changed_fn(self._reticle_changed)
-        self.action_safe_percentage.add_value_changed_fn(self._reticle_changed)
-        self.title_safe_enabled.add_value_changed_fn(self._reticle_changed)
-        self.title_safe_percentage.add_value_changed_fn(self._reticle_changed)
-        self.custom_safe_enabled.add_value_changed_fn(self._reticle_changed)
-        self.custom_safe_percentage.add_value_changed_fn(self._reticle_changed)
-        self.letterbox_enabled.add_value_changed_fn(self._reticle_changed)
-        self.letterbox_ratio.add_value_changed_fn(self._reticle_changed)
+        for name in self.SUBMODEL_NAMES:
+            getattr(self, name).add_value_changed_fn(partial(self._reticle_changed, name))
 
-    def _reticle_changed(self, model):
-        """Executes all registered callbacks of this model.
+    def _reticle_changed(self, field_name, model):
+        """Record a submodel change and notify callbacks unless the change is being batched.
 
         Args:
+            field_name (str): The ReticleModel attribute name of the submodel that has changed.
             model (Any): The submodel that has changed. [Unused]
         """
-        for callback in self._callbacks:
-            callback()
+        self._state = None
+        self._changed_fields.add(field_name)
+        if self._update_depth == 0:
+            self._request_notify()
+
+    def _request_notify(self):
+        if self._debounce:
+            self._deferred_notify.schedule()
+        else:
+            self._notify()
+
+    @timed("model.notify")
+    def _notify(self):
+        """Executes all registered callbacks of this model with the set of fields changed since the last call."""
+        if not self._changed_fields:
+            return
+        changed_fields = frozenset(self._changed_fields)
+        self._changed_fields.clear()
+        if stats.enabled:
+            stats.increment("model.notifications")
+            stats.record("model.callback_fanout", len(self._callbacks))
+        for callback_ref, pass_fields in list(self._callbacks):
+            callback = callback_ref()
+            if callback is None:
+                # The object owning the bound method callback has been garbage collected.
+                self._remove_callback_ref(callback_ref)
+            elif pass_fields:
+                callback(changed_fields)
+            else:
+                callback()
+
+    def _remove_callback_ref(self, callback_ref):
+        self._callbacks = [entry for entry in self._callbacks if entry[0] is not callback_ref]
+
+    def get_state(self):
+        """Get an immutable snapshot of all the model values.
+
+        The snapshot is cached until the next submodel change, so calling this repeatedly is cheap.
+
+        Returns:
+            ReticleState: The current values.
+        """
+        if self._state is None:
+            self._state = ReticleState(
+                composition_mode=self.composition_mode.as_int,
+                action_safe_enabled=self.action_safe_enabled.as_bool,
+                action_safe_percentage=self.action_safe_percentage.as_float,
+                title_safe_enabled=self.title_safe_enabled.as_bool,
+                title_safe_percentage=self.title_safe_percentage.as_float,
+                custom_safe_enabled=self.custom_safe_enabled.as_bool,
+                custom_safe_percentage=self.custom_safe_percentage.as_float,
+                letterbox_enabled=self.letterbox_enabled.as_bool,
+                letterbox_ratio=self.letterbox_ratio.as_float,
+                extra_safe_areas=tuple(safe_area.get_state()
+                                       for safe_area in self.safe_areas[len(BUILTIN_SAFE_AREAS):]),
+                guide_styles=tuple(self._guide_styles.items()) + tuple(
+                    (safe_area.name, GuideStyle(safe_area.color, safe_area.thickness))
+                    for safe_area in self.safe_areas),
+            )
+        return self._state
+
+    def apply_state(self, state):
+        """Set all the submodels from a snapshot with a single change notification.
+
+        Safe areas are added and removed to match the snapshot's extra safe areas, then the guides are restyled.
+
+        Args:
+            state (ReticleState): The values to set.
+        """
+        with self.batch_update():
+            for name in self.SUBMODEL_NAMES:
+                getattr(self, name).set_value(getattr(state, name))
+            extra_safe_areas = self.safe_areas[len(BUILTIN_SAFE_AREAS):]
+            if [safe_area.name for safe_area in extra_safe_areas] == \
+                    [safe_area.name for safe_area in state.extra_safe_areas]:
+                for safe_area, safe_area_state in zip(extra_safe_areas, state.extra_safe_areas):
+                    safe_area.enabled.set_value(safe_area_state.enabled)
+                    safe_area.percentage.set_value(safe_area_state.percentage)
+            else:
+                for safe_area in extra_safe_areas:
+                    self.remove_safe_area(safe_area.name)
+                for safe_area_state in state.extra_safe_areas:
+                    self.add_safe_area(safe_area_state.name, safe_area_state.percentage, safe_area_state.color,
+                                       safe_area_state.enabled)
+            for name, style in state.guide_styles:
+                self.set_guide_style(name, style.color, thickness=style.thickness)
+
+    def get_safe_area(self, name):
+        """Get a safe area by name.
+
+        Args:
+            name (str): The safe area name.
+
+        Returns:
+            SafeAreaModel: The safe area, or None if there is no safe area with that name.
+        """
+        for safe_area in self.safe_areas:
+            if safe_area.name == name:
+                return safe_area
+        return None
+
+    def add_safe_area(self, name, percentage, color=constants.DEFAULT_SAFE_AREA_COLOR, enabled=True,
+                      thickness=constants.DEFAULT_GUIDE_THICKNESS):
+        """Add a safe area, e.g. for a broadcast spec or a social media crop.
+
+        Args:
+            name (str): The safe area name, unique within the model.
+            percentage (float): 0-100 percentage of the render target the safe area fills.
+            color (tuple): RGBA color of the safe area rectangle.
+            enabled (bool): Whether the safe area is shown.
+            thickness (float): Line thickness of the safe area rectangle, in pixels.
+
+        Returns:
+            SafeAreaModel: The new safe area.
+
+        Raises:
+            ValueError: If the model already has a safe area or a guide style with that name.
+        """
+        if self.get_safe_area(name) is not None or name in self._guide_styles:
+            raise ValueError(f"A safe area or guide named '{name}' already exists")
+        safe_area = SafeAreaModel(name, color, ui.SimpleBoolModel(enabled),
+                                  ui.SimpleFloatModel(percentage, min=0, max=100), thickness)
+        safe_area._add_value_changed_fn(partial(self._reticle_changed, "extra_safe_areas"))
+        self.safe_areas.append(safe_area)
+        self.safe_areas_revision += 1
+        with self.batch_update():
+            self._reticle_changed("extra_safe_areas", None)
+            self._reticle_changed("guide_styles", None)
+        return safe_area
+
+    def remove_safe_area(self, name):
+        """Remove a safe area added with add_safe_area().
+
+        Args:
+            name (str): The safe area name.
+
+        Returns:
+            bool: Whether the safe area existed.
+
+        Raises:
+            ValueError: If the safe area is a built-in one.
+        """
+        safe_area = self.get_safe_area(name)
+        if safe_area is None:
+            return False
+        index = self.safe_areas.index(safe_area)
+        if index < len(BUILTIN_SAFE_AREAS):
+            raise ValueError(f"The built-in safe area '{name}' can't be removed")
+        safe_area._remove_value_changed_fns()
+        del self.safe_areas[index]
+        self.safe_areas_revision += 1
+        with self.batch_update():
+            self._reticle_changed("extra_safe_areas", None)
+            self._reticle_changed("guide_styles", None)
+        return True
+
+    def get_guide_style(self, name):
+        """Get the style of a guide.
+
+        Args:
+            name (str): COMPOSITION_GUIDE_STYLE, LETTERBOX_GUIDE_STYLE or a safe area name.
+
+        Returns:
+            GuideStyle: The style.
+
+        Raises:
+            ValueError: If there is no guide with that name.
+        """
+        style = self._guide_styles.get(name)
+        if style is not None:
+            return style
+        safe_area = self.get_safe_area(name)
+        if safe_area is None:
+            raise ValueError(f"There is no guide named '{name}'")
+        return GuideStyle(safe_area.color, safe_area.thickness)
+
+    def set_guide_style(self, name, color=None, opacity=None, thickness=None):
+        """Set the color, opacity and/or line thickness of a guide. Values left to None are kept.
+
+        The change is notified as "guide_styles". Views apply it to their existing items.
+
+        Args:
+            name (str): COMPOSITION_GUIDE_STYLE, LETTERBOX_GUIDE_STYLE or a safe area name.
+            color (tuple): RGB or RGBA color. An RGB color keeps the current opacity.
+            opacity (float): 0-1 opacity, overriding the alpha of the color.
+            thickness (float): Line thickness, in pixels. Ignored by the letterbox, which is filled.
+
+        Returns:
+            GuideStyle: The new style.
+
+        Raises:
+            ValueError: If there is no guide with that name, or a value is invalid.
+        """
+        style = self.get_guide_style(name)
+        new_color = style.color
+        if color is not None:
+            if len(color) not in (3, 4):
+                raise ValueError(f"Expected an RGB or RGBA color, got {color!r}")
+            new_color = tuple(float(channel) for channel in color) + new_color[len(color):]
+        if opacity is not None:
+            new_color = new_color[:3] + (min(max(float(opacity), 0.0), 1.0),)
+        new_thickness = style.thickness
+        if thickness is not None:
+            if thickness <= 0:
+                raise ValueError(f"Expected a positive line thickness, got {thickness!r}")
+            new_thickness = float(thickness)
+        new_style = GuideStyle(new_color, new_thickness)
+        if new_style == style:
+            return style
+        if name in self._guide_styles:
+            self._guide_styles[name] = new_style
+        else:
+            safe_area = self.get_safe_area(name)
+            safe_area.color = new_style.color
+            safe_area.thickness = new_style.thickness
+        self._reticle_changed("guide_styles", None)
+        return new_style
+
+    def begin_update(self):
+        """Start batching submodel changes. Calls can be nested."""
+        self._update_depth += 1
+
+    def end_update(self):
+        """Stop batching submodel changes.
+
+        When the outermost batch ends, a single notification is sent for all the changes made during the batch.
+        """
+        if self._update_depth == 0:
+            raise RuntimeError("ReticleModel.end_update() called without a matching begin_update()")
+        self._update_depth -= 1
+        if self._update_depth == 0 and self._changed_fields:
+            self._request_notify()
 
-    def add_reticle_changed_fn(self, callback):
+    @contextmanager
+    def batch_update(self):
+        """Context manager batching all submodel changes made in its block into a single notification.
+
+        Example:
+            with model.batch_update():
+                model.action_safe_enabled.set_value(True)
+                model.action_safe_percentage.set_value(90)
+        """
+        self.begin_update()
+        try:
+            yield self
+        finally:
+            self.end_update()
+
+    def set_debounce(self, enabled):
+        """Enable/disable deferring change notifications to the next app update.
+
+        Args:
+            enabled (bool): Whether to debounce change notifications.
+        """
+        self._debounce = enabled
+        if not enabled:
+            self.flush()
+
+    def flush(self):
+        """Immediately send any notification deferred by debouncing."""
+        self._deferred_notify.cancel()
+        if self._update_depth == 0:
+            self._notify()
+
+    def add_reticle_changed_fn(self, callback, weak=False):
         """Add a callback to be executed whenever any ReticleModel submodel data changes.
 
-        This is useful for rebuilding the overlay whenever any data changes.
+        This is useful for updating the overlay whenever any data changes.
+
+        Args:
+            callback (function): The function to call when the reticle model changes. It is called without
+                arguments.
+            weak (bool): Only weakly reference a bound method callback, so subscribing doesn't keep its object
+                alive. The callback is dropped once the object is garbage collected.
+
+        Returns:
+            ReticleChangedSubscription: Handle to remove the callback with.
+        """
+        return self._add_callback(callback, False, weak)
+
+    def add_reticle_fields_changed_fn(self, callback, weak=False):
+        """Add a callback to be executed with the names of the changed fields whenever any submodel data changes.
 
         Args:
-            callback (function): The function to call when the reticle model changes.
+            callback (function): The function to call when the reticle model changes. It is called with a
+                frozenset of the names of the ReticleState fields that changed.
+            weak (bool): Only weakly reference a bound method callback, so subscribing doesn't keep its object
+                alive. The callback is dropped once the object is garbage collected.
+
+        Returns:
+            ReticleChangedSubscription: Handle to remove the callback with.
+        """
+        return self._add_callback(callback, True, weak)
+
+    def _add_callback(self, callback, pass_fields, weak):
+        if weak and hasattr(callback, "__self__") and hasattr(callback, "__func__"):
+            callback_ref = weakref.WeakMethod(callback)
+        else:
+            def callback_ref():
+                return callback
+        self._callbacks.append((callback_ref, pass_fields))
+        return ReticleChangedSubscription(self, callback_ref)
+
+    def get_callback_count(self):
+        """Get the number of live registered callbacks. Used to check for leaks.
+
+        Returns:
+            int: The number of callbacks whose owner is still alive.
         """
-        self._callbacks.append(callback)
+        return sum(1 for callback_ref, _ in self._callbacks if callback_ref() is not None)
@@ -0,0 +1,330 @@
+"""Persistent reticle presets for the CameraReticleExtension"""
+import json
+import os
+
+import carb
+import carb.tokens
+
+from . import constants
+from .models import ReticleModel, ReticleState
+from .utils import DeferredCall
+
+PRESETS_FILE_VERSION = 1
+
+
+def get_presets_path():
+    """Get the path of the presets file from the SETTING_PRESETS_PATH carb setting.
+
+    Returns:
+        str: The path, with carb tokens such as ${data} resolved.
+    """
+    path = carb.settings.get_settings().get(constants.SETTING_PRESETS_PATH) or constants.DEFAULT_PRESETS_PATH
+    return carb.tokens.get_tokens_interface().resolve(path)
+
+
+def get_project_key():
+    """Get the key of the project the open stage belongs to, i.e. the folder the stage was opened from.
+
+    Returns:
+        str: The project key, or None if the stage isn't saved or omni.usd isn't available.
+    """
+    try:
+        import omni.usd
+    except ImportError:
+        return None
+    url = omni.usd.get_context().get_stage_url()
+    if not url or url.startswith("anon:"):
+        return None
+    return os.path.dirname(url.replace("\\", "/"))
+
+
+class PresetStore:
+    """Named presets and last used reticle states, persisted to a compact JSON file.
+
+    Presets and last used states are either global or scoped to a project. The file is only read on first
+    access and only written by save() when something changed.
+    """
+    def __init__(self, path: str):
+        """PresetStore constructor
+
+        Args:
+            path (str): The presets file path. It doesn't need to exist.
+        """
+        self.path = path
+        self._data = None
+        self._dirty = False
+
+    @staticmethod
+    def _create_scope():
+        return {"presets": {}, "last_used": None}
+
+    def _get_data(self):
+        if self._data is None:
+            self.load()
+        return self._data
+
+    def _get_scope(self, project=None, create=False):
+        data = self._get_data()
+        if project is None:
+            return data
+        scope = data["projects"].get(project)
+        if scope is None and create:
+            scope = data["projects"][project] = self._create_scope()
+        return scope
+
+    @property
+    def loaded(self):
+        """bool: Whether the presets file has been read."""
+        return self._data is not None
+
+    def load(self):
+        """Read the presets file, discarding unsaved changes. A missing or invalid file gives an empty store."""
+        data = None
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as presets_file:
+                    data = json.load(presets_file)
+            except (OSError, ValueError) as e:
+                carb.log_warn(f"[omni.example.reticle] Failed to read presets from '{self.path}': {e}")
+        if not isinstance(data, dict) or data.get("version") != PRESETS_FILE_VERSION:
+            data = self._create_scope()
+            data["projects"] = {}
+        self._data = data
+        self._dirty = False
+
+    def save(self):
+        """Write the presets file if anything changed since it was read or last written."""
+        if not self._dirty:
+            return
+        data = dict(self._data, version=PRESETS_FILE_VERSION)
+        temp_path = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as presets_file:
+                json.dump(data, presets_file, separators=(",", ":"))
+            # Replace the file in one step so a crash while writing never leaves a truncated file behind.
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            carb.log_warn(f"[omni.example.reticle] Failed to write presets to '{self.path}': {e}")
+            return
+        self._dirty = False
+
+    def get_preset_names(self, project=None):
+        """Get the names of the presets.
+
+        Args:
+            project (str): Project key. The project presets are listed along with the global ones if set.
+
+        Returns:
+            list: The sorted preset names.
+        """
+        names = set(self._get_scope()["presets"])
+        scope = self._get_scope(project)
+        if scope is not None:
+            names.update(scope["presets"])
+        return sorted(names)
+
+    def get_preset(self, name, project=None):
+        """Get a preset.
+
+        Args:
+            name (str): The preset name.
+            project (str): Project key. A project preset takes precedence over a global preset of the same name.
+
+        Returns:
+            ReticleState: The preset, or None if there is no preset with that name.
+        """
+        for scope in (self._get_scope(project), self._get_scope()):
+            if scope is not None and name in scope["presets"]:
+                return ReticleState.from_dict(scope["presets"][name])
+        return None
+
+    def set_preset(self, name, state, project=None):
+        """Add or replace a preset.
+
+        Args:
+            name (str): The preset name.
+            state (ReticleState): The preset values.
+            project (str): Project key to scope the preset to. The preset is global if None.
+        """
+        self._get_scope(project, create=True)["presets"][name] = state.to_dict()
+        self._dirty = True
+
+    def remove_preset(self, name, project=None):
+        """Remove a preset.
+
+        Args:
+            name (str): The preset name.
+            project (str): Project key of the preset. Removes a global preset if None.
+
+        Returns:
+            bool: Whether the preset existed.
+        """
+        scope = self._get_scope(project)
+        if scope is None or scope["presets"].pop(name, None) is None:
+            return False
+        self._dirty = True
+        return True
+
+    def get_last_used(self, project=None):
+        """Get the last used state.
+
+        Args:
+            project (str): Project key. Falls back to the global last used state if the project has none.
+
+        Returns:
+            ReticleState: The last used state, or None if none was recorded.
+        """
+        for scope in (self._get_scope(project), self._get_scope()):
+            if scope is not None and scope["last_used"] is not None:
+                return ReticleState.from_dict(scope["last_used"])
+        return None
+
+    def set_last_used(self, state, project=None):
+        """Record the last used state.
+
+        Args:
+            state (ReticleState): The state.
+            project (str): Project key. The state is recorded globally and, if set, for the project.
+        """
+        values = state.to_dict()
+        scopes = [self._get_scope()]
+        if project is not None:
+            scopes.append(self._get_scope(project, create=True))
+        for scope in scopes:
+            if scope["last_used"] != values:
+                scope["last_used"] = values
+                self._dirty = True
+
+
+class ReticlePresets:
+    """Restore the last used reticle on startup and when a project's stage is opened, and apply named presets.
+
+    The presets file is read on the first app update after construction, not during extension startup, and
+    restoring a state sets all the model values in one batch so the overlays only update once.
+    """
+    def __init__(self, model: ReticleModel, store: PresetStore):
+        """ReticlePresets constructor
+
+        Args:
+            model (ReticleModel): The model to restore and record.
+            store (PresetStore): The presets.
+        """
+        self.model = model
+        self.store = store
+        self._project = get_project_key()
+        self._restored = False
+        self._restore = DeferredCall(self._restore_last_used)
+        self._restore.schedule()
+        self._model_changed_sub = model.add_reticle_changed_fn(self._on_model_changed)
+        self._stage_event_sub = self._subscribe_to_stage_events()
+
+    def destroy(self):
+        """Record the last used state and write the presets file."""
+        self._restore.cancel()
+        if self._model_changed_sub is not None:
+            self._model_changed_sub.unsubscribe()
+            self._model_changed_sub = None
+        self._stage_event_sub = None
+        if self._restored:
+            self.store.set_last_used(self.model.get_state(), self._project)
+            self.store.save()
+
+    def _subscribe_to_stage_events(self):
+        try:
+            import omni.usd
+        except ImportError:
+            return None
+        return omni.usd.get_context().get_stage_event_stream().create_subscription_to_pop(
+            self._on_stage_event, name="omni.example.reticle presets")
+
+    def _on_stage_event(self, event):
+        import omni.usd
+        if event.type == int(omni.usd.StageEventType.CLOSING):
+            if self._restored:
+                self.store.set_last_used(self.model.get_state(), self._project)
+                self.store.save()
+        elif event.type == int(omni.usd.StageEventType.OPENED):
+            self._project = get_project_key()
+            if self._restored and self._project is not None:
+                self._apply(self.store.get_last_used(self._project))
+
+    def _restore_last_used(self):
+        self._restored = True
+        self._apply(self.store.get_last_used(self._project))
+
+    def _apply(self, state):
+        if state is not None:
+            self.model.apply_state(state)
+
+    def _on_model_changed(self):
+        if not self._restored:
+            # The user changed the reticle before the last used state was restored: keep their changes.
+            self.keep_current()
+
+    def keep_current(self):
+        """Keep the current reticle rather than restoring the last used one, if it isn't restored yet."""
+        self._restore.cancel()
+        self._restored = True
+
+    def get_preset_names(self):
+        """Get the names of the presets available for the open stage.
+
+        Returns:
+            list: The sorted preset names.
+        """
+        return self.store.get_preset_names(self._project)
+
+    def save_preset(self, name, project_scoped=False):
+        """Save the current reticle as a preset.
+
+        Args:
+            name (str): The preset name.
+            project_scoped (bool): Whether to only make the preset available to the open stage's project.
+
+        Returns:
+            bool: Whether the preset was saved. Project scoped presets aren't saved when the open stage has no
+                project.
+        """
+        if project_scoped and self._project is None:
+            carb.log_warn(f"[omni.example.reticle] Can't save the project preset '{name}': the open stage isn't "
+                          "saved in a project.")
+            return False
+        self.store.set_preset(name, self.model.get_state(), self._project if project_scoped else None)
+        self.store.save()
+        return True
+
+    def apply_preset(self, name):
+        """Apply a preset to the model.
+
+        Args:
+            name (str): The preset name.
+
+        Returns:
+            bool: Whether the preset exists.
+        """
+        state = self.store.get_preset(name, self._project)
+        if state is None:
+            return False
+        self._restore.cancel()
+        self._restored = True
+        self._apply(state)
+        return True
+
+    def remove_preset(self, name, project_scoped=False):
+        """Remove a preset.
+
+        Args:
+            name (str): The preset name.
+            project_scoped (bool): Whether the preset is scoped to the open stage's project.
+
+        Returns:
+            bool: Whether the preset existed.
+        """
+        if project_scoped and self._project is None:
+            carb.log_warn(f"[omni.example.reticle] Can't remove the project preset '{name}': the open stage isn't "
+                          "saved in a project.")
+            return False
+        removed = self.store.remove_preset(name, self._project if project_scoped else None)
+        self.store.save()
+        return removed
@@ -0,0 +1,275 @@
+"""Offline reticle rasterizer used to burn the CameraReticleExtension guides into rendered frames
+
+The guides are rasterized once per resolution and reticle state into a mask, from the same geometry the
+ReticleOverlay draws: the pixels covered by lines and points are kept as a sparse list and the letterbox bars as
+pixel ranges. Drawing the reticle on a frame is then a single in-place blend of those pixels and slices, so a mask
+can be streamed over thousands of frames:
+
+    state = reticle_manager.model.get_state()
+    for frame in draw_reticle_frames(frames, state):
+        write_image(frame)
+
+Images are (height, width, channels) NumPy arrays with 3 (RGB) or 4 (RGBA) channels, either floats in [0, 1] or
+unsigned integers using their full range, e.g. uint8 in [0, 255].
+"""
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+
+from . import constants, geometry, guides
+from .camera import DEFAULT_FRAMING, CameraFraming
+from .models import ReticleState
+
+
+class ReticleMask(NamedTuple):
+    """The rasterized guides of a reticle, as the pixels they cover.
+
+    Attributes:
+        width (int): Width of the images the mask applies to.
+        height (int): Height of the images the mask applies to.
+        rows (ndarray): (N,) row of each covered pixel.
+        columns (ndarray): (N,) column of each covered pixel.
+        colors (ndarray): (N, 4) premultiplied RGBA color of each covered pixel, in [0, 1].
+        transparencies (ndarray): (N, 1) one minus the opacity of each covered pixel.
+        letterbox_bars (tuple): (top, bottom, left, right) pixel ranges of the letterbox bars, drawn over the pixels.
+        letterbox_color (ndarray): (4,) premultiplied RGBA color of the letterbox bars.
+    """
+    width: int
+    height: int
+    rows: np.ndarray
+    columns: np.ndarray
+    colors: np.ndarray
+    transparencies: np.ndarray
+    letterbox_bars: tuple
+    letterbox_color: np.ndarray
+
+
+def _to_pixels(points, half_extents, width, height):
+    """Convert (..., 3) SceneView coordinates to (..., 2) column and row pixel centers, y pointing down."""
+    points = np.asarray(points, dtype=float)
+    columns = (points[..., 0] / half_extents[0] + 1) * 0.5 * (width - 1)
+    rows = (1 - points[..., 1] / half_extents[1]) * 0.5 * (height - 1)
+    return np.stack([columns, rows], axis=-1)
+
+
+def _get_footprint(size):
+    """Get the (K, 2) pixel offsets of a size x size square centered on a pixel."""
+    offsets = np.arange(size) - (size - 1) // 2
+    return np.stack(np.meshgrid(offsets, offsets, indexing="ij"), axis=-1).reshape(-1, 2)
+
+
+def _sample_segments(segments):
+    """Sample (S, 2, 2) pixel space line segments at one pixel intervals.
+
+    Returns:
+        tuple: (N, 2) rounded pixel coordinates and (N,) index of the segment each sample belongs to.
+    """
+    starts = segments[:, 0]
+    deltas = segments[:, 1] - starts
+    counts = np.ceil(np.abs(deltas).max(axis=-1)).astype(int) + 1
+    segment_indices = np.repeat(np.arange(len(segments)), counts)
+    # Position of every sample along its segment, from 0 at its start to 1 at its end.
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    t = offsets / np.maximum(counts - 1, 1)[segment_indices]
+    samples = starts[segment_indices] + t[:, None] * deltas[segment_indices]
+    return np.rint(samples).astype(int), segment_indices
+
+
+def _blend(layer, pixels, color):
+    """Composite premultiplied RGBA colors over layer pixels in place."""
+    layer[pixels] = color + layer[pixels] * (1 - color[..., 3:])
+
+
+def _rasterize_lines(layer, segments, colors, line_width):
+    """Draw (S, 2, 2) pixel space line segments of (S, 4) premultiplied colors into the layer."""
+    if not len(segments):
+        return
+    height, width = layer.shape[:2]
+    samples, segment_indices = _sample_segments(segments)
+    footprint = _get_footprint(line_width)
+    samples = (samples[:, None, :] + footprint).reshape(-1, 2)
+    segment_indices = np.repeat(segment_indices, len(footprint))
+    inside = (samples[:, 0] >= 0) & (samples[:, 0] < width) & (samples[:, 1] >= 0) & (samples[:, 1] < height)
+    samples = samples[inside]
+    # Every pixel is blended once even where lines overlap, the last line drawn on it giving its color.
+    _blend(layer, (samples[:, 1], samples[:, 0]), colors[segment_indices[inside]])
+
+
+def _premultiply(colors):
+    colors = np.array(colors, dtype=np.float32).reshape(-1, 4)
+    colors[:, :3] *= colors[:, 3:]
+    return colors
+
+
+@lru_cache(maxsize=constants.RASTER_MASK_CACHE_SIZE)
+def _get_cached_mask(width, height, composition_guide, state, line_width, framing):
+    half_extents = geometry.get_half_extents(width / height, True)
+    safe_areas = [safe_area for safe_area in state.safe_areas if safe_area.enabled]
+    reticle_geometry = geometry.compute_reticle_geometry(
+        width / height, True, composition_guide, [safe_area.percentage / 100.0 for safe_area in safe_areas],
+        state.letterbox_ratio, geometry.get_gate_scale(width / height, framing.gate_aspect_ratio, framing.overscan))
+
+    def get_line_width(style):
+        # The guide thickness scales the line width, as it scales the overlay lines.
+        return max(int(round(line_width * style.thickness)), 1)
+
+    # Premultiplied RGBA layer the lines and points are composited on.
+    layer = np.zeros((height, width, 4), dtype=np.float32)
+    composition_style = state.get_guide_style(constants.COMPOSITION_GUIDE_STYLE)
+    composition_lines = reticle_geometry.composition_lines
+    _rasterize_lines(layer, _to_pixels(composition_lines, half_extents, width, height),
+                     _premultiply(composition_style.color).repeat(len(composition_lines), 0),
+                     get_line_width(composition_style))
+    safe_outlines = geometry.get_rect_outlines(reticle_geometry.safe_rects)
+    safe_segments = np.stack([safe_outlines, np.roll(safe_outlines, -1, axis=-2)], axis=-2)
+    for safe_area, segments in zip(safe_areas, safe_segments):
+        style = state.get_guide_style(safe_area.name)
+        _rasterize_lines(layer, _to_pixels(segments, half_extents, width, height),
+                         _premultiply(style.color).repeat(len(segments), 0), get_line_width(style))
+
+    points = reticle_geometry.composition_points
+    if len(points):
+        # Points are drawn as the squares twice as wide as the composition lines the overlay draws.
+        point_segments = np.repeat(_to_pixels(points, half_extents, width, height)[:, None], 2, axis=1)
+        _rasterize_lines(layer, point_segments, _premultiply(composition_style.color).repeat(len(points), 0),
+                         2 * get_line_width(composition_style))
+
+    # The letterbox bars are drawn over the lines, as in the ReticleOverlay, and can cover a large part of the
+    # image, so they are kept as pixel ranges blended as slices rather than as sparse pixels.
+    letterbox_bars = []
+    if state.letterbox_enabled:
+        # Bar edges, from SceneView coordinates to pixel edges.
+        rects = reticle_geometry.letterbox_rects
+        x_edges = (rects[:, [0, 0]] + rects[:, [2, 2]] * [-0.5, 0.5]) / half_extents[0]
+        y_edges = (rects[:, [1, 1]] + rects[:, [3, 3]] * [0.5, -0.5]) / half_extents[1]
+        lefts, rights = np.clip(np.rint((x_edges + 1) * 0.5 * width), 0, width).astype(int).T
+        tops, bottoms = np.clip(np.rint((1 - y_edges) * 0.5 * height), 0, height).astype(int).T
+        letterbox_bars = [bar for bar in zip(tops.tolist(), bottoms.tolist(), lefts.tolist(), rights.tolist())
+                          if bar[0] < bar[1] and bar[2] < bar[3]]
+
+    rows, columns = np.nonzero(layer[..., 3])
+    covered = layer[rows, columns]
+    mask = ReticleMask(width, height, rows, columns, covered, 1 - covered[:, 3:], tuple(letterbox_bars),
+                       _premultiply(state.get_guide_style(constants.LETTERBOX_GUIDE_STYLE).color)[0])
+    for array in (mask.rows, mask.columns, mask.colors, mask.transparencies, mask.letterbox_color):
+        array.flags.writeable = False
+    return mask
+
+
+def get_reticle_mask(state: ReticleState, width: int, height: int, line_width: int = 1,
+                     framing: CameraFraming = DEFAULT_FRAMING) -> ReticleMask:
+    """Get the rasterized guides of a reticle from a bounded LRU cache.
+
+    The guides are laid out as the ReticleOverlay lays them out on a render target of that resolution.
+
+    Args:
+        state (ReticleState): The reticle model values, e.g. from ReticleModel.get_state().
+        width (int): The image width.
+        height (int): The image height.
+        line_width (int): Thickness of the guide lines, in pixels.
+        framing (CameraFraming): The framing of the camera the frames were rendered from.
+
+    Returns:
+        ReticleMask: The mask, as read-only arrays.
+    """
+    return _get_cached_mask(int(width), int(height), guides.get_guide(state.composition_mode), state,
+                            int(line_width), framing)
+
+
+def get_mask_cache_info():
+    """Get the mask cache statistics.
+
+    Returns:
+        functools._CacheInfo: Named tuple of hits, misses, maxsize and currsize.
+    """
+    return _get_cached_mask.cache_info()
+
+
+def clear_mask_cache():
+    """Clear the mask cache and reset its statistics."""
+    _get_cached_mask.cache_clear()
+
+
+def _get_value_scale(dtype):
+    """Get the pixel value of full intensity for an image dtype."""
+    if np.issubdtype(dtype, np.integer):
+        return float(np.iinfo(dtype).max)
+    return 1.0
+
+
+def blend_mask(image, mask: ReticleMask):
+    """Blend a reticle mask over an image in place.
+
+    Only the pixels covered by the mask are read and written. An RGBA image's alpha channel is composited too.
+
+    Args:
+        image (ndarray): (height, width, 3 or 4) image of the mask resolution.
+        mask (ReticleMask): The mask from get_reticle_mask().
+
+    Returns:
+        ndarray: The image.
+
+    Raises:
+        ValueError: If the image shape doesn't match the mask.
+    """
+    if image.ndim != 3 or image.shape[:2] != (mask.height, mask.width) or image.shape[2] not in (3, 4):
+        raise ValueError(f"Expected a ({mask.height}, {mask.width}, 3 or 4) image, got {image.shape}")
+    scale = _get_value_scale(image.dtype)
+    channels = image.shape[2]
+    if len(mask.rows):
+        image[mask.rows, mask.columns] = _blend_pixels(image[mask.rows, mask.columns], mask.colors[:, :channels],
+                                                       mask.transparencies, scale)
+    for top, bottom, left, right in mask.letterbox_bars:
+        bar = image[top:bottom, left:right]
+        # Broadcasting a color over the last axis is slow, so the bar color is tiled into a whole pixel row.
+        bar_color = np.tile(mask.letterbox_color[:channels], right - left)
+        blended = _blend_pixels(bar.reshape(bottom - top, -1), bar_color, 1 - float(mask.letterbox_color[3]), scale)
+        bar[...] = blended.reshape(bar.shape)
+    return image
+
+
+def _blend_pixels(pixels, colors, transparencies, scale):
+    """Composite premultiplied colors over pixels, the alpha channel included, returning the result as floats."""
+    pixels = pixels.astype(np.float32)
+    pixels *= transparencies
+    pixels += colors * np.float32(scale)
+    if scale != 1.0:
+        np.rint(pixels, out=pixels)
+    return pixels
+
+
+def draw_reticle(image, state: ReticleState, line_width: int = 1, framing: CameraFraming = DEFAULT_FRAMING):
+    """Draw the reticle guides over an image in place.
+
+    Args:
+        image (ndarray): (height, width, 3 or 4) image.
+        state (ReticleState): The reticle model values.
+        line_width (int): Thickness of the guide lines, in pixels.
+        framing (CameraFraming): The framing of the camera the image was rendered from.
+
+    Returns:
+        ndarray: The image.
+    """
+    return blend_mask(image, get_reticle_mask(state, image.shape[1], image.shape[0], line_width, framing))
+
+
+def draw_reticle_frames(frames, state: ReticleState, line_width: int = 1, framing: CameraFraming = DEFAULT_FRAMING):
+    """Draw the reticle guides over a stream of images in place.
+
+    The mask is only looked up again when the image resolution changes.
+
+    Args:
+        frames (Iterable): (height, width, 3 or 4) images.
+        state (ReticleState): The reticle model values.
+        line_width (int): Thickness of the guide lines, in pixels.
+        framing (CameraFraming): The framing of the camera the frames were rendered from.
+
+    Yields:
+        ndarray: Each image, once the guides are drawn over it.
+    """
+    mask = None
+    for frame in frames:
+        if mask is None or frame.shape[:2] != (mask.height, mask.width):
+            mask = get_reticle_mask(state, frame.shape[1], frame.shape[0], line_width, framing)
+        yield blend_mask(frame, mask)
@@ -1,17 +1,21 @@
+from functools import lru_cache
 from pathlib import Path
 
 import omni.ui as ui
 from omni.ui import color as cl
 
+from .constants import ACTION_SAFE_COLOR, COMP_LINES_COLOR, CUSTOM_SAFE_COLOR, LETTERBOX_COLOR, TITLE_SAFE_COLOR
 
 CURRENT_PATH = Path(__file__).parent.absolute()
 ICON_PATH = CURRENT_PATH.parent.parent.parent.joinpath("icons")
 
-cl.action_safe_default = cl(1.0, 0.0, 0.0)
-cl.title_safe_default  = cl(1.0, 1.0, 0.0)
-cl.custom_safe_default = cl(0.0, 1.0, 0.0)
-cl.letterbox_default   = cl(0.0, 0.0, 0.0, 0.75)
-cl.comp_lines_default  = cl(1.0, 1.0, 1.0, 0.6)
+# The RGBA guide colors are defined in constants. Scene meshes take those float colors, widgets take the packed
+# cl colors below.
+cl.action_safe_default = cl(*ACTION_SAFE_COLOR)
+cl.title_safe_default  = cl(*TITLE_SAFE_COLOR)
+cl.custom_safe_default = cl(*CUSTOM_SAFE_COLOR)
+cl.letterbox_default   = cl(*LETTERBOX_COLOR)
+cl.comp_lines_default  = cl(*COMP_LINES_COLOR)
 
 safe_areas_group_style = {
     "Label:disabled": {
@@ -30,15 +34,6 @@ safe_areas_group_style = {
     "CheckBox": {
         "background_color": cl(0.75, 0.75, 0.75, 1),
         "color": cl.black
-    },
-    "Rectangle::ActionSwatch": {
-        "background_color": cl.action_safe_default
-    },
-    "Rectangle::TitleSwatch": {
-        "background_color": cl.title_safe_default
-    },
-    "Rectangle::CustomSwatch": {
-        "background_color": cl.custom_safe_default
     }
 }
 comp_group_style = {
@@ -58,3 +53,32 @@ comp_group_style = {
         "background_color": cl(1.0, 1.0, 1.0, 0.2)
     }
 }
+
+
+@lru_cache(maxsize=1)
+def get_comp_group_style(registered_guides):
+    """Get the composition buttons style, with the icons of the registered guides.
+
+    Args:
+        registered_guides (tuple): The registered guides, from guides.get_guides().
+
+    Returns:
+        dict: The style. Cached until the registered guides change, so don't modify it.
+    """
+    style = dict(comp_group_style)
+    style.update({f"Button.Image::{guide.name}": {"image_url": guide.icon}
+                  for guide in registered_guides if guide.icon})
+    return style
+
+
+@lru_cache(maxsize=64)
+def get_swatch_style(color):
+    """Get the style of the color swatch of a guide.
+
+    Args:
+        color (tuple): RGBA color of the guide.
+
+    Returns:
+        dict: The style. Cached per color, so don't modify it.
+    """
+    return {"background_color": cl(*color)}
@@ -0,0 +1,210 @@
+"""Reticle state sync between Kit processes for the CameraReticleExtension
+
+Every process syncing the same file mirrors its ReticleModel state into it, so review stations running side by side
+show identical reticles. The file is memory-mapped and guarded by a sequence lock: a writer makes the sequence odd,
+writes the state and makes it even again, and readers compare the sequence with the last one they saw once per app
+update. A reader only decodes the state when the sequence changed, and retries on the next update if it changed
+while the state was being read. There is no file or socket polling and no network dependency.
+
+File layout, little endian:
+    0   4s  Magic, b"RTCL"
+    4   I   Layout version
+    8   Q   Sequence, odd while a write is in progress
+    16  Q   Id of the process that wrote the state
+    24  I   State size
+    32  ... State, as the UTF-8 JSON of ReticleState.to_dict()
+"""
+import json
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+
+import carb
+import carb.tokens
+import omni.kit.app
+
+from . import constants
+from .instrumentation import stats, timed
+from .models import ReticleModel, ReticleState
+from .utils import weak_method
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: concurrent writes aren't locked, the last writer wins.
+    fcntl = None
+
+SYNC_FILE_MAGIC = b"RTCL"
+SYNC_FILE_VERSION = 1
+
+_HEADER = struct.Struct("<4sIQQI")
+_SEQUENCE = struct.Struct("<Q")
+_SEQUENCE_OFFSET = 8
+_PAYLOAD_OFFSET = 32
+
+
+def get_sync_path():
+    """Get the path of the sync file from the SETTING_SYNC_PATH carb setting.
+
+    Returns:
+        str: The path, with carb tokens such as ${temp} resolved, or None if syncing is disabled.
+    """
+    path = carb.settings.get_settings().get(constants.SETTING_SYNC_PATH)
+    if not path:
+        return None
+    return carb.tokens.get_tokens_interface().resolve(path)
+
+
+class ReticleStateSync:
+    """Keep a ReticleModel in sync with the models of other processes through a shared memory-mapped file.
+
+    Local model changes are published to the file, and the states published by other processes are applied to the
+    model with ReticleModel.apply_state(), i.e. a single batched update. On construction, the model adopts the
+    state already in the file, if any, so a process joining a session takes the reticle of its peers.
+    """
+    def __init__(self, model: ReticleModel, path: str, size: int = constants.SYNC_FILE_SIZE):
+        """ReticleStateSync constructor
+
+        Args:
+            model (ReticleModel): The model to sync.
+            path (str): The sync file path, shared by all the processes to sync. It is created if missing.
+            size (int): Size of the file in bytes, which bounds the size of the state.
+
+        Raises:
+            OSError: If the file can't be opened or mapped.
+        """
+        self.model = model
+        self.path = path
+        # Tells the states this process wrote apart from the ones of its peers.
+        self._writer_id = int.from_bytes(os.urandom(8), "little")
+        self._file = self._mmap = None
+        self._open(size)
+        # Last sequence seen in the file, and last state published or applied
+        self._sequence = None
+        self._synced_state = None
+        self._applying = False
+        self._model_changed_sub = None
+        self._update_sub = None
+
+        # Whether the model adopted the state of the peers on construction
+        self.adopted = self.check()
+        if self._synced_state is None:
+            self.publish()
+        self._model_changed_sub = model.add_reticle_changed_fn(self._on_model_changed)
+        self._update_sub = omni.kit.app.get_app().get_update_event_stream().create_subscription_to_pop(
+            weak_method(self._on_update), name="omni.example.reticle sync")
+
+    def _open(self, size):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+b")
+        try:
+            with self._lock():
+                if os.fstat(self._file.fileno()).st_size < size:
+                    self._file.truncate(size)
+                self._mmap = mmap.mmap(self._file.fileno(), size)
+                magic, version = _HEADER.unpack_from(self._mmap)[:2]
+                if magic != SYNC_FILE_MAGIC or version != SYNC_FILE_VERSION:
+                    _HEADER.pack_into(self._mmap, 0, SYNC_FILE_MAGIC, SYNC_FILE_VERSION, 0, 0, 0)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+
+    def destroy(self):
+        """Stop syncing and release the file. The state stays in the file for the other processes."""
+        self._update_sub = None
+        if self._model_changed_sub is not None:
+            self._model_changed_sub.unsubscribe()
+            self._model_changed_sub = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @contextmanager
+    def _lock(self):
+        """Lock the file against concurrent writes from other processes. Readers never lock."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.lockf(self._file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._file.fileno(), fcntl.LOCK_UN)
+
+    def _on_model_changed(self):
+        if not self._applying:
+            self.publish()
+
+    def _on_update(self, event):
+        self.check()
+
+    @timed("sync.publish")
+    def publish(self):
+        """Write the model state to the file, unless it is the last state published or applied."""
+        state = self.model.get_state()
+        if state == self._synced_state or self._mmap is None:
+            return
+        payload = json.dumps(state.to_dict(), separators=(",", ":")).encode("utf-8")
+        if _PAYLOAD_OFFSET + len(payload) > len(self._mmap):
+            carb.log_warn(f"[omni.example.reticle] The reticle state doesn't fit in the {len(self._mmap)} bytes "
+                          f"sync file '{self.path}', it isn't synced.")
+            return
+        with self._lock():
+            sequence = _SEQUENCE.unpack_from(self._mmap, _SEQUENCE_OFFSET)[0]
+            # The sequence is left odd by a writer that died mid-write, which is then overwritten.
+            sequence += 1 if sequence % 2 == 0 else 0
+            _SEQUENCE.pack_into(self._mmap, _SEQUENCE_OFFSET, sequence)
+            _HEADER.pack_into(self._mmap, 0, SYNC_FILE_MAGIC, SYNC_FILE_VERSION, sequence, self._writer_id,
+                              len(payload))
+            self._mmap[_PAYLOAD_OFFSET:_PAYLOAD_OFFSET + len(payload)] = payload
+            _SEQUENCE.pack_into(self._mmap, _SEQUENCE_OFFSET, sequence + 1)
+        self._sequence = sequence + 1
+        self._synced_state = state
+        if stats.enabled:
+            stats.increment("sync.published")
+
+    def check(self):
+        """Apply the state in the file if another process published one since the last check.
+
+        This only reads the sequence when nothing changed, so it is cheap enough to run on every app update.
+
+        Returns:
+            bool: Whether a state was applied to the model.
+        """
+        if self._mmap is None:
+            return False
+        sequence = _SEQUENCE.unpack_from(self._mmap, _SEQUENCE_OFFSET)[0]
+        if sequence == self._sequence or sequence % 2:
+            # Nothing new, or a write is in progress and the state is read on the next update.
+            return False
+        return self._apply(sequence)
+
+    @timed("sync.apply")
+    def _apply(self, sequence):
+        writer_id, size = _HEADER.unpack_from(self._mmap)[3:]
+        payload = self._mmap[_PAYLOAD_OFFSET:_PAYLOAD_OFFSET + min(size, len(self._mmap) - _PAYLOAD_OFFSET)]
+        if _SEQUENCE.unpack_from(self._mmap, _SEQUENCE_OFFSET)[0] != sequence:
+            # Overwritten while being read: read it again on the next update.
+            return False
+        self._sequence = sequence
+        if writer_id == self._writer_id or sequence == 0:
+            return False
+        try:
+            state = ReticleState.from_dict(json.loads(payload.decode("utf-8")))
+        except (ValueError, TypeError, KeyError) as e:
+            carb.log_warn(f"[omni.example.reticle] Ignoring the invalid reticle state in '{self.path}': {e}")
+            return False
+        self._applying = True
+        try:
+            self.model.apply_state(state)
+        finally:
+            self._applying = False
+        # Not published back, even when notified on the next update by a debounced model.
+        self._synced_state = self.model.get_state()
+        if stats.enabled:
+            stats.increment("sync.applied")
+        return True
@@ -0,0 +1,362 @@
+"""Guide tracks baked over a timeline range for the CameraReticleExtension
+
+When the framing of the active camera is animated, the guides change on every frame of playback. A guide track
+holds the reticle geometry of every timecode of the timeline range, one row per timecode. It is baked in a
+background thread from the camera keys, which are read on the main thread, and during playback the overlay only
+indexes the track and updates its scene items in place. When camera keys change, only the timecodes up to the
+neighbouring keys are baked again.
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+import carb
+import numpy as np
+
+from . import constants, geometry, guides
+from .models import ReticleState
+
+# Bakes run one at a time, in submission order, on a single worker thread shared by all the overlays.
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="omni.example.reticle.tracks")
+    return _executor
+
+
+def shutdown():
+    """Stop the bake worker thread. Pending bakes are dropped."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+def get_camera_framing_samples(prim):
+    """Read the keys of the framing attributes of a camera prim, to bake its framing over time.
+
+    Args:
+        prim (Usd.Prim): The camera prim.
+
+    Returns:
+        dict: (times, values) arrays of every authored framing attribute, keyed by attribute name. Attributes
+            without time samples have a single key at time 0.
+    """
+    samples = {}
+    if not prim or not prim.IsValid():
+        return samples
+    from pxr import Usd
+    for name in constants.CAMERA_FRAMING_ATTRIBUTES:
+        attribute = prim.GetAttribute(name)
+        if not attribute:
+            continue
+        times = list(attribute.GetTimeSamples())
+        if times:
+            values = [attribute.Get(Usd.TimeCode(time)) for time in times]
+        else:
+            values = [attribute.Get(Usd.TimeCode.Default())]
+        samples[name] = (np.asarray(times or [0.0], dtype=float), np.asarray(values, dtype=float))
+    return samples
+
+
+def get_changed_time_range(old_samples, new_samples):
+    """Get the time range over which the framing of two sets of keys from get_camera_framing_samples() differs.
+
+    Values are interpolated linearly between keys and held before the first and after the last key, so changing a
+    key affects the framing up to its neighbouring keys.
+
+    Args:
+        old_samples (dict): Keys before the change.
+        new_samples (dict): Keys after the change.
+
+    Returns:
+        tuple: (start, end) times, -inf or inf for open ranges, or None if the framing didn't change.
+    """
+    start = end = None
+    for name in set(old_samples) | set(new_samples):
+        old_keys = set(zip(*(array.tolist() for array in old_samples.get(name, ([], [])))))
+        new_keys = set(zip(*(array.tolist() for array in new_samples.get(name, ([], [])))))
+        changed_times = [time for time, _ in old_keys ^ new_keys]
+        if not changed_times:
+            continue
+        if name not in old_samples or name not in new_samples:
+            # Authoring or removing an attribute changes the framing at all times.
+            return -math.inf, math.inf
+        times = sorted({time for time, _ in old_keys | new_keys})
+        first, last = min(changed_times), max(changed_times)
+        before = [time for time in times if time < first]
+        after = [time for time in times if time > last]
+        changed_start = before[-1] if before else -math.inf
+        changed_end = after[0] if after else math.inf
+        start = changed_start if start is None else min(start, changed_start)
+        end = changed_end if end is None else max(end, changed_end)
+    return None if start is None else (start, end)
+
+
+def bake_camera_framing(samples, times):
+    """Interpolate the framing of a camera at many times.
+
+    Args:
+        samples (dict): Framing attribute keys from get_camera_framing_samples().
+        times (ArrayLike): (N,) times to get the framing at.
+
+    Returns:
+        tuple: (N,) gate aspect ratios, NaN where the camera has no valid apertures, and (N,) overscans.
+    """
+    times = np.asarray(times, dtype=float)
+
+    def interpolate(name, default):
+        if name not in samples:
+            return np.full(times.shape, default)
+        return np.interp(times, *samples[name])
+
+    horizontal_aperture = interpolate(constants.CAMERA_HORIZONTAL_APERTURE_ATTRIBUTE, 0.0)
+    vertical_aperture = interpolate(constants.CAMERA_VERTICAL_APERTURE_ATTRIBUTE, 0.0)
+    squeeze = interpolate(constants.CAMERA_SQUEEZE_ATTRIBUTE, 1.0)
+    overscan = np.maximum(interpolate(constants.CAMERA_OVERSCAN_ATTRIBUTE, 0.0), 0.0)
+    valid = (horizontal_aperture > 0) & (vertical_aperture > 0) & (squeeze > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gate_aspect_ratio = np.where(valid, horizontal_aperture * squeeze / vertical_aperture, np.nan)
+    return gate_aspect_ratio, overscan
+
+
+class TrackKey(NamedTuple):
+    """Everything a guide track depends on besides the camera keys.
+
+    Attributes:
+        camera_path (str): Path of the camera the track frames, or None for the whole render target.
+        aspect_ratio (float): The render target aspect ratio.
+        preserve_vertical (bool): Whether the SceneView uses PRESERVE_ASPECT_VERTICAL.
+        composition_guide (guides.Guide): The composition guide.
+        safe_percentages (tuple): 0-1 percentages of the enabled safe areas.
+        letterbox_ratio (float): The letterbox aspect ratio.
+        start (int): First timecode of the track.
+        end (int): Last timecode of the track.
+    """
+    camera_path: str
+    aspect_ratio: float
+    preserve_vertical: bool
+    composition_guide: guides.Guide
+    safe_percentages: tuple
+    letterbox_ratio: float
+    start: int
+    end: int
+
+
+def get_track_key(camera_path, aspect_ratio, preserve_vertical, state: ReticleState, start, end):
+    """Get the key of the guide track of a reticle, quantized like the geometry cache keys.
+
+    Args:
+        camera_path (str): Path of the active camera, or None.
+        aspect_ratio (float): The render target aspect ratio.
+        preserve_vertical (bool): Whether the SceneView uses PRESERVE_ASPECT_VERTICAL.
+        state (ReticleState): The reticle model values.
+        start (float): First timecode of the timeline range.
+        end (float): Last timecode of the timeline range.
+
+    Returns:
+        TrackKey: The key.
+    """
+    precision = constants.GEOMETRY_CACHE_PRECISION
+    return TrackKey(
+        camera_path,
+        round(aspect_ratio, precision),
+        bool(preserve_vertical),
+        guides.get_guide(state.composition_mode),
+        tuple(round(safe_area.percentage / 100.0, precision) for safe_area in state.safe_areas if safe_area.enabled),
+        round(state.letterbox_ratio, precision),
+        int(math.floor(start)),
+        int(math.ceil(end)),
+    )
+
+
+def bake_guide_track(key: TrackKey, samples, start, end):
+    """Compute the reticle geometry of a range of timecodes in one vectorized pass.
+
+    Args:
+        key (TrackKey): The track key.
+        samples (dict): Camera framing keys from get_camera_framing_samples().
+        start (int): First timecode to bake.
+        end (int): Last timecode to bake.
+
+    Returns:
+        geometry.ReticleGeometry: float32 arrays with one row per timecode.
+    """
+    timecodes = np.arange(start, end + 1, dtype=float)
+    gate_aspect_ratio, overscan = bake_camera_framing(samples, timecodes)
+    # Timecodes without valid apertures frame the whole render target.
+    gate_aspect_ratio = np.where(np.isnan(gate_aspect_ratio), key.aspect_ratio, gate_aspect_ratio)
+    gate_scale = geometry.get_gate_scale(key.aspect_ratio, gate_aspect_ratio, overscan)
+    reticle_geometry = geometry.compute_reticle_geometry(key.aspect_ratio, key.preserve_vertical,
+                                                         key.composition_guide, key.safe_percentages,
+                                                         key.letterbox_ratio, gate_scale)
+    # The gate scale has one row per timecode, so every geometry array does too.
+    return geometry.ReticleGeometry(*(np.ascontiguousarray(array, dtype=np.float32) for array in reticle_geometry))
+
+
+class GuideTrack:
+    """Reticle geometry baked for every timecode of a range.
+
+    Attributes:
+        key (TrackKey): What the track was baked for.
+        samples (dict): The camera framing keys the track was baked from.
+        geometry (geometry.ReticleGeometry): float32 arrays with one row per timecode from key.start to key.end.
+        animated (bool): Whether the framing changes over the range, i.e. the rows differ.
+    """
+    def __init__(self, key: TrackKey, samples, track_geometry):
+        self.key = key
+        self.samples = samples
+        self.geometry = track_geometry
+        self.animated = any(len(times) > 1 for times, _ in samples.values())
+
+    def get_geometry(self, timecode):
+        """Get the geometry of the nearest baked timecode.
+
+        Args:
+            timecode (float): The timecode.
+
+        Returns:
+            geometry.ReticleGeometry: Views on the track row, or None if the timecode is out of the track range.
+        """
+        index = int(round(timecode)) - self.key.start
+        if index < 0 or index > self.key.end - self.key.start:
+            return None
+        return geometry.ReticleGeometry(*(array[index] for array in self.geometry))
+
+    def splice(self, start, track_geometry):
+        """Replace rows of the track.
+
+        Args:
+            start (int): Timecode of the first replaced row.
+            track_geometry (geometry.ReticleGeometry): The new rows.
+        """
+        index = start - self.key.start
+        for array, rows in zip(self.geometry, track_geometry):
+            array[index:index + len(rows)] = rows
+
+
+class _BakeJob(NamedTuple):
+    future: object
+    generation: int
+    key: TrackKey
+    samples: dict
+    start: int
+    full: bool
+
+
+class GuideTrackBaker:
+    """Keep the guide track of an overlay baked for its reticle and camera keys.
+
+    Bakes run in a background thread. Their results are picked up on the main thread, by request() and
+    get_geometry(), so tracks are never modified while the overlay reads them.
+    """
+    def __init__(self):
+        self._track = None
+        self._jobs = []
+        # Incremented whenever the whole track needs baking again, so older bakes are dropped.
+        self._generation = 0
+        # Key and camera keys of the last requested bake.
+        self._key = None
+        self._samples = None
+        self._keys_changed = True
+        # Whether the last bake for the key failed, until the key or the camera keys change
+        self._failed = False
+
+    def destroy(self):
+        """Cancel pending bakes and drop the track."""
+        for job in self._jobs:
+            job.future.cancel()
+        self._jobs = []
+        self._track = None
+        self._key = None
+
+    @property
+    def baking(self):
+        """bool: Whether bakes are still running or waiting to run."""
+        return any(not job.future.done() for job in self._jobs)
+
+    @property
+    def failed(self):
+        """bool: Whether baking the track for the last requested key and camera keys failed."""
+        self._collect()
+        return self._failed
+
+    def invalidate_keys(self):
+        """Read the camera keys again on the next request(), e.g. after a framing attribute of the camera changed."""
+        self._keys_changed = True
+
+    def request(self, key: TrackKey, camera_prim):
+        """Bake the track for a key, or the rows affected by changed camera keys, unless already baked or baking.
+
+        Args:
+            key (TrackKey): The track key.
+            camera_prim (Usd.Prim): The camera prim, read on the calling thread. None to frame the render target.
+        """
+        self._collect()
+        samples = self._samples
+        if self._keys_changed or samples is None:
+            samples = get_camera_framing_samples(camera_prim) if camera_prim is not None else {}
+            self._keys_changed = False
+        if key != self._key:
+            # Every row depends on the key: bake the whole track.
+            self._key = key
+            self._samples = samples
+            self._generation += 1
+            self._submit(key, samples, key.start, key.end, full=True)
+            return
+        if samples is self._samples:
+            return
+        changed = get_changed_time_range(self._samples, samples)
+        self._samples = samples
+        if changed is None:
+            return
+        start = max(key.start, int(math.floor(changed[0])) if changed[0] > -math.inf else key.start)
+        end = min(key.end, int(math.ceil(changed[1])) if changed[1] < math.inf else key.end)
+        if start <= end:
+            self._submit(key, samples, start, end, full=False)
+
+    def _submit(self, key, samples, start, end, full):
+        self._failed = False
+        future = _get_executor().submit(bake_guide_track, key, samples, start, end)
+        self._jobs.append(_BakeJob(future, self._generation, key, samples, start, full))
+
+    def _collect(self):
+        """Apply the finished bakes, in submission order."""
+        while self._jobs and self._jobs[0].future.done():
+            job = self._jobs.pop(0)
+            if job.future.cancelled() or job.generation != self._generation:
+                continue
+            try:
+                track_geometry = job.future.result()
+            except Exception as e:
+                # Bakes run arbitrary camera keys: any failure drops the track instead of raising on every frame.
+                carb.log_error(f"[omni.example.reticle] Failed to bake the guide track of {job.key.camera_path}: {e}")
+                self._track = None
+                self._failed = True
+                continue
+            if job.full:
+                self._track = GuideTrack(job.key, job.samples, track_geometry)
+            elif self._track is not None and self._track.key == job.key:
+                self._track.splice(job.start, track_geometry)
+                self._track.samples = job.samples
+                self._track.animated = any(len(times) > 1 for times, _ in job.samples.values())
+
+    def get_geometry(self, key: TrackKey, timecode):
+        """Get the baked geometry of a timecode.
+
+        Args:
+            key (TrackKey): The track key.
+            timecode (float): The timecode.
+
+        Returns:
+            geometry.ReticleGeometry: The geometry, or None if the track for the key isn't baked yet, doesn't
+                cover the timecode or isn't animated.
+        """
+        self._collect()
+        track = self._track
+        if track is None or track.key != key or not track.animated:
+            return None
+        return track.get_geometry(timecode)
@@ -0,0 +1,68 @@
+"""Utilities used by the CameraReticleExtension"""
+import asyncio
+import weakref
+
+import omni.kit.app
+
+
+def weak_method(method):
+    """Wrap a bound method so that registering the wrapper as a callback doesn't keep its object alive.
+
+    Args:
+        method (Callable): The bound method to wrap.
+
+    Returns:
+        Callable: Calls the method while its object is alive, does nothing afterwards.
+    """
+    method_ref = weakref.WeakMethod(method)
+
+    def call(*args, **kwargs):
+        bound_method = method_ref()
+        if bound_method is not None:
+            return bound_method(*args, **kwargs)
+        return None
+
+    return call
+
+
+class DeferredCall:
+    """Call a function once on the next app update, no matter how many times it was scheduled before then.
+
+    This is used to coalesce bursts of events (model changes, window resizes) into a single
+    trailing-edge call per UI frame.
+    """
+    def __init__(self, fn):
+        """DeferredCall constructor
+
+        Args:
+            fn (Callable): The function to call on the next app update.
+        """
+        self._fn = fn
+        self._task = None
+
+    @property
+    def pending(self):
+        """bool: Whether a call is scheduled and hasn't run yet."""
+        return self._task is not None
+
+    def schedule(self):
+        """Schedule a call on the next app update if one isn't already scheduled."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._call_on_next_update())
+
+    def cancel(self):
+        """Cancel the scheduled call, if any."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def flush(self):
+        """Run the scheduled call immediately, if any."""
+        if self._task is not None:
+            self.cancel()
+            self._fn()
+
+    async def _call_on_next_update(self):
+        await omni.kit.app.get_app().next_update_async()
+        self._task = None
+        self._fn()
@@ -1,4 +1,5 @@
-from functools import partial
+import weakref
+from functools import lru_cache, partial
 
 import carb
 import omni.ui as ui
@@ -6,224 +7,635 @@ from omni.ui import color as cl
 from omni.ui import scene
 
 from . import constants
-from .constants import CompositionGuidelines
-from .models import ReticleModel
-from . import styles
+from .camera import DEFAULT_FRAMING, CameraFraming, CameraFramingTracker
+from .instrumentation import stats, timed
+from .models import BUILTIN_SAFE_AREAS, ReticleModel, ReticleState, SafeAreaModel
+from .utils import DeferredCall, weak_method
+
+# The geometry (NumPy) and styles (icons, style dicts) modules are imported where they are first needed, so that
+# starting the extension with every guide off only pays for the Reticle button.
+
+# Style of the Reticle button, built once for every menu.
+_RETICLE_BUTTON_STYLE = {"margin": 10, "padding": 5, "color": cl.white}
+# Reticle menu layout. The popup height is computed from its rows, as show_at() places it from its size.
+_MENU_WIDTH = 400
+_MENU_TITLE_HEIGHT = 30
+_MENU_COMPOSITION_COLUMNS = 2
+_MENU_COMPOSITION_ROW_HEIGHT = 75
+_MENU_ROW_HEIGHT = 30
+
+
+@lru_cache(maxsize=constants.GEOMETRY_CACHE_SIZE)
+def _get_cached_geometry(aspect_ratio, preserve_vertical, composition_guide, safe_percentages, letterbox_ratio,
+                         framing):
+    """Memoized geometry.compute_reticle_geometry(). The returned arrays are shared, so they are made read-only."""
+    from . import geometry
+    gate_scale = geometry.get_gate_scale(aspect_ratio, framing.gate_aspect_ratio, framing.overscan)
+    reticle_geometry = geometry.compute_reticle_geometry(aspect_ratio, preserve_vertical, composition_guide,
+                                                         safe_percentages, letterbox_ratio, gate_scale)
+    for array in reticle_geometry:
+        array.flags.writeable = False
+    return reticle_geometry
+
+
+def get_geometry(aspect_ratio, preserve_vertical, state, framing=DEFAULT_FRAMING):
+    """Get the reticle geometry from a bounded LRU cache.
+
+    The cache is keyed on the values of the state the geometry depends on and on the registered composition
+    guide, so re-registering a guide never returns stale geometry. Aspect ratios and ratios are quantized so
+    that tiny float differences between resizes still hit the cache.
+
+    Args:
+        aspect_ratio (float): The render target aspect ratio.
+        preserve_vertical (bool): Whether the SceneView uses PRESERVE_ASPECT_VERTICAL.
+        state (ReticleState): The reticle model values.
+        framing (CameraFraming): The framing of the active camera.
+
+    Returns:
+        geometry.ReticleGeometry: The guide coordinates, as read-only arrays.
+    """
+    from . import guides
+    precision = constants.GEOMETRY_CACHE_PRECISION
+    return _get_cached_geometry(
+        round(aspect_ratio, precision),
+        bool(preserve_vertical),
+        guides.get_guide(state.composition_mode),
+        tuple(round(safe_area.percentage / 100.0, precision) for safe_area in state.safe_areas if safe_area.enabled),
+        round(state.letterbox_ratio, precision),
+        CameraFraming(
+            None if framing.gate_aspect_ratio is None else round(framing.gate_aspect_ratio, precision),
+            round(framing.overscan, precision),
+        ),
+    )
+
+
+def _get_safe_area_layout(safe_areas):
+    """Get the values of safe areas their rectangles depend on, as opposed to their styles."""
+    return [(safe_area.name, safe_area.enabled, safe_area.enabled and safe_area.percentage)
+            for safe_area in safe_areas]
+
+
+def get_geometry_cache_info():
+    """Get the geometry cache statistics.
+
+    Returns:
+        functools._CacheInfo: Named tuple of hits, misses, maxsize and currsize.
+    """
+    return _get_cached_geometry.cache_info()
+
+
+def clear_geometry_cache():
+    """Clear the geometry cache and reset its statistics."""
+    _get_cached_geometry.cache_clear()
 
 
 class ReticleOverlay:
     """The reticle viewport overlay.
 
     Build the reticle graphics and ReticleMenu button on the given viewport window.
+
+    The overlay is retained: the SceneView and every guide item are built once by
+    build_viewport_overlay() and then updated in place by update_viewport_overlay()
+    whenever the ReticleModel or the viewport aspect ratio changes. The SceneView is only
+    rebuilt when its aspect ratio policy has to flip.
+
+    With defer_scene_view, build_viewport_overlay() only builds the ReticleMenu button and
+    the SceneView is built the first time a guide is enabled. With idle_scene_view set to
+    IDLE_SCENE_VIEW_HIDE or IDLE_SCENE_VIEW_DESTROY, the SceneView is hidden or destroyed
+    whenever the last guide is disabled, so idle viewports don't lay it out or draw it.
+
+    Viewport window changes are debounced: all the resize and view change events received
+    within a UI frame are applied once on the next app update.
+
+    With bake_tracks, the guides of an animated camera are baked over the timeline range in a
+    background thread when playback starts, and each timeline tick only indexes the baked track.
     """
-    _instances = []
+    _instances = weakref.WeakSet()
 
-    def __init__(self, model: ReticleModel, vp_win: ui.Window, ext_id: str):
+    def __init__(self, model: ReticleModel, vp_win: ui.Window, ext_id: str, defer_scene_view: bool = False,
+                 idle_scene_view: str = constants.IDLE_SCENE_VIEW_KEEP, bake_tracks: bool = False):
         """ReticleOverlay constructor
 
         Args:
             model (ReticleModel): The reticle model
             vp_win (Window): The viewport window to build the overlay on.
             ext_id (str): The extension id.
+            defer_scene_view (bool): Whether to wait for a guide to be enabled before building the SceneView.
+            idle_scene_view (str): What to do with the SceneView while no guide is enabled, one of
+                IDLE_SCENE_VIEW_KEEP, IDLE_SCENE_VIEW_HIDE or IDLE_SCENE_VIEW_DESTROY.
+            bake_tracks (bool): Whether to bake the guides of animated cameras for timeline playback.
         """
         self.model = model
         self.vp_win = vp_win
         self.ext_id = ext_id
-        # Rebuild the overlay whenever the viewport window changes
-        self.vp_win.set_height_changed_fn(self.on_window_changed)
-        self.vp_win.set_width_changed_fn(self.on_window_changed)
+        self.defer_scene_view = defer_scene_view
+        self.idle_scene_view = idle_scene_view
+        self.scene_view = None
+        # Placeholder frame the SceneView is built in
+        self._scene_frame = None
+        self.reticle_menu = None
+        self._aspect_ratio_policy = None
+        self._model_changed_sub = None
+        self._clear_scene_items()
+        # (aspect ratio, aspect ratio policy, camera framing) the guides were last built/updated for.
+        self._applied_window_state = None
+        self._window_changed = DeferredCall(self._apply_window_change)
+        # Update the overlay whenever the viewport window changes.
+        # The window callbacks are weak so they don't keep a destroyed overlay alive.
+        self.vp_win.set_height_changed_fn(weak_method(self.on_window_changed))
+        self.vp_win.set_width_changed_fn(weak_method(self.on_window_changed))
+        # The viewport backend is resolved once, and the fill and resolution values the resize path needs are
+        # cached and kept up to date by subscriptions: render settings for the legacy viewport, view changes for VP2.
+        self._is_legacy_viewport = type(self.vp_win).__name__ == "LegacyViewportWindow"
+        self._settings = carb.settings.get_settings()
+        self._settings_subs = []
         self._view_change_sub = None
-        try:
-            # VP2 resolution change sub
-            self._view_change_sub = self.vp_win.viewport_api.subscribe_to_view_change(self.on_window_changed)
-        except AttributeError:
-            carb.log_info("Using Viewport Legacy: Reticle will not automatically update on resolution changes.")
-                                                                            
-        # Rebuild the overlay whenever the model changes
-        self.model.add_reticle_changed_fn(self.build_viewport_overlay)
-        ReticleOverlay._instances.append(self)
+        self._fill_frame = False
+        self._resolution = None
+        # The guides frame the film gate of the active camera.
+        self._camera = CameraFramingTracker(weak_method(self._on_camera_changed))
+        self._framing = DEFAULT_FRAMING
+        # Guide track baker, created on the first timeline event with bake_tracks.
+        self._track_baker = None
+        self._timeline_sub = self._subscribe_to_timeline() if bake_tracks else None
+        if self._is_legacy_viewport:
+            for path in (constants.SETTING_RESOLUTION_FILL, constants.SETTING_RESOLUTION_WIDTH,
+                         constants.SETTING_RESOLUTION_HEIGHT):
+                self._settings_subs.append(self._settings.subscribe_to_node_change_events(
+                    path, weak_method(self._on_resolution_setting_changed)))
+        else:
+            try:
+                # VP2 resolution change sub
+                self._view_change_sub = self.vp_win.viewport_api.subscribe_to_view_change(
+                    weak_method(self._on_view_changed))
+            except AttributeError:
+                carb.log_info("Viewport has no view change events: Reticle will not automatically update on "
+                              "resolution changes.")
+        self._update_viewport_values()
+
+        # Update the overlay whenever the model changes
+        self._model_changed_sub = self.model.add_reticle_fields_changed_fn(self.update_viewport_overlay, weak=True)
+        ReticleOverlay._instances.add(self)
         resolution = self.vp_win.viewport_api.get_texture_resolution()
         self._aspect_ratio = resolution[0] / resolution[1]
 
     @classmethod
     def get_instances(cls):
-        """Get all created instances of ReticleOverlay"""
-        return cls._instances
-    
+        """Get all live, not destroyed instances of ReticleOverlay"""
+        return list(cls._instances)
+
+    @classmethod
+    def get_debug_counts(cls):
+        """Count the resources held by all live overlays. Used to check for leaks across reloads.
+
+        Returns:
+            dict: Number of live "overlays", "model_callbacks" registered on their models and "scene_items".
+        """
+        overlays = cls.get_instances()
+        models = {id(overlay.model): overlay.model for overlay in overlays}
+        return {
+            "overlays": len(overlays),
+            "model_callbacks": sum(model.get_callback_count() for model in models.values()),
+            "scene_items": sum(overlay.get_scene_item_count() for overlay in overlays),
+        }
+
     def __del__(self):
         self.destroy()
 
     def destroy(self):
+        """Remove the overlay from its viewport window and release all its resources.
+
+        Safe to call several times.
+        """
+        ReticleOverlay._instances.discard(self)
+        self._window_changed.cancel()
         self._view_change_sub = None
-        self.scene_view.scene.clear()
-        self.scene_view = None
-        self.reticle_menu.destroy()
-        self.reticle_menu = None
-        self.vp_win = None
+        for sub in self._settings_subs:
+            self._settings.unsubscribe_to_change_events(sub)
+        self._settings_subs = []
+        self._camera.destroy()
+        self._timeline_sub = None
+        if self._track_baker is not None:
+            self._track_baker.destroy()
+            self._track_baker = None
+        if self._model_changed_sub is not None:
+            self._model_changed_sub.unsubscribe()
+            self._model_changed_sub = None
+        if self.scene_view is not None:
+            self.scene_view.scene.clear()
+            self.scene_view = None
+        self._scene_frame = None
+        self._clear_scene_items()
+        if self.reticle_menu is not None:
+            self.reticle_menu.destroy()
+            self.reticle_menu = None
+        if self.vp_win is not None:
+            self.vp_win.get_frame(self.ext_id).clear()
+            self.vp_win = None
+
+    def _clear_scene_items(self):
+        """Drop the references to the scene items of the current SceneView."""
+        self._geometry = None
+        self._applied_state = None
+        self._guide_lines = None
+        self._guide_points = None
+        self._letterbox = None
+        # (polygon count, vertices per polygon) of each polygon set of the guide lines mesh, to restyle it
+        self._guide_line_shapes = []
+
+    def get_scene_item_count(self):
+        """Get the number of scene items currently held by the overlay.
+
+        Returns:
+            int: The number of scene items.
+        """
+        return sum(item is not None for item in (self._guide_lines, self._guide_points, self._letterbox))
 
     def on_window_changed(self, *args):
-        """Update aspect ratio and rebuild overlay when viewport window changes."""
+        """Schedule an update of the aspect ratio and the overlay on the next app update.
+
+        Several window change events are usually received for a single resize, they are all
+        collapsed into one update.
+        """
         if self.vp_win is None:
             return
-        
-        settings = carb.settings.get_settings()
-        if type(self.vp_win).__name__ == "LegacyViewportWindow":
-            fill = settings.get(constants.SETTING_RESOLUTION_FILL)
+        self._window_changed.schedule()
+
+    def _update_viewport_values(self):
+        """Cache whether the viewport fills its frame, its resolution and its active camera."""
+        viewport_api = self.vp_win.viewport_api
+        self._resolution = None
+        if self._is_legacy_viewport:
+            self._fill_frame = bool(self._settings.get(constants.SETTING_RESOLUTION_FILL))
+            width = self._settings.get(constants.SETTING_RESOLUTION_WIDTH)
+            height = self._settings.get(constants.SETTING_RESOLUTION_HEIGHT)
+            if width and height and width > 0 and height > 0:
+                self._resolution = (width, height)
         else:
-            fill = self.vp_win.viewport_api.fill_frame
-        
-        if fill:
+            self._fill_frame = bool(viewport_api.fill_frame)
+        if self._resolution is None:
+            self._resolution = tuple(viewport_api.resolution)
+        # Only starts watching another camera if the active camera or the stage changed.
+        self._camera.set_camera(getattr(viewport_api, "stage", None), getattr(viewport_api, "camera_path", None))
+
+    def _on_resolution_setting_changed(self, item, event_type):
+        if self.vp_win is None:
+            return
+        self._update_viewport_values()
+        self._window_changed.schedule()
+
+    def _on_view_changed(self, viewport_api):
+        if self.vp_win is None:
+            return
+        self._update_viewport_values()
+        self._window_changed.schedule()
+
+    def _on_camera_changed(self):
+        if self._track_baker is not None:
+            self._track_baker.invalidate_keys()
+        self.on_window_changed()
+
+    def _subscribe_to_timeline(self):
+        try:
+            import omni.timeline
+        except ImportError:
+            carb.log_info("[omni.example.reticle] omni.timeline unavailable: guide tracks won't be baked.")
+            return None
+        return omni.timeline.get_timeline_interface().get_timeline_event_stream().create_subscription_to_pop(
+            weak_method(self._on_timeline_event), name="omni.example.reticle guide tracks")
+
+    def _on_timeline_event(self, event):
+        """Bake the guide track when playback starts and show the baked guides of the current timecode."""
+        import omni.timeline
+        if event.type not in (int(omni.timeline.TimelineEventType.PLAY),
+                              int(omni.timeline.TimelineEventType.CURRENT_TIME_TICKED)):
+            return
+        if self.vp_win is None or self.scene_view is None or not self._scene_frame.visible:
+            return
+        if self._applied_state is None or self._aspect_ratio_policy is None:
+            return
+        from . import tracks
+        if self._track_baker is None:
+            self._track_baker = tracks.GuideTrackBaker()
+        timeline = omni.timeline.get_timeline_interface()
+        time_codes_per_second = timeline.get_time_codes_per_seconds()
+        key = tracks.get_track_key(
+            self._camera.camera_path,
+            self.get_aspect_ratio(),
+            self._aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL,
+            self._applied_state,
+            timeline.get_start_time() * time_codes_per_second,
+            timeline.get_end_time() * time_codes_per_second,
+        )
+        self._track_baker.request(key, self._camera.get_camera_prim())
+        if event.type == int(omni.timeline.TimelineEventType.CURRENT_TIME_TICKED):
+            track_geometry = self._track_baker.get_geometry(key, event.payload["currentTime"] * time_codes_per_second)
+            if track_geometry is not None:
+                self._apply_track_geometry(track_geometry)
+            elif self._track_baker.failed:
+                # Without a track, follow the camera with the framing read at the current time.
+                self.on_window_changed()
+
+    @timed("overlay.apply_track")
+    def _apply_track_geometry(self, track_geometry):
+        """Update the guides in place from a row of the baked guide track."""
+        self._geometry = track_geometry
+        self._update_guide_lines()
+        if self._applied_state.letterbox_enabled:
+            self._update_letterbox(True)
+
+    @timed("overlay.window_change")
+    def _apply_window_change(self):
+        """Update aspect ratio and the overlay after the viewport window changed.
+
+        The overlay is left untouched if neither the aspect ratio, the aspect ratio policy nor the camera framing
+        changed.
+        """
+        if self.vp_win is None:
+            return
+
+        if self._fill_frame:
             width = self.vp_win.frame.computed_width + 8
             height = self.vp_win.height
         else:
-            width, height = self.vp_win.viewport_api.resolution
+            width, height = self._resolution
         self._aspect_ratio = width / height
-        self.build_viewport_overlay()
 
-    def get_aspect_ratio_flip_threshold(self):
-        """Get magic number for aspect ratio policy.
+        if self.scene_view is None or not self._scene_frame.visible:
+            # The SceneView will be built or updated for the current aspect ratio when it's needed.
+            return
+        aspect_ratio_policy = self.get_aspect_ratio_policy()
+        if (self._aspect_ratio, aspect_ratio_policy, self._camera.get_framing()) == self._applied_window_state:
+            return
+        if aspect_ratio_policy != self._aspect_ratio_policy:
+            self._build_scene_view()
+        else:
+            self.update_viewport_overlay()
 
-        Aspect ratio policy doesn't seem to swap exactly when window_aspect_ratio == window_texture_aspect_ratio.
-        This is a hack that approximates where the policy changes.
+    def get_frame_aspect_ratio(self):
+        """Get the aspect ratio of the frame the SceneView fills.
+
+        Returns:
+            float: The aspect ratio of the overlay frame once it has been laid out, of the viewport window before.
         """
-        return self.get_aspect_ratio() - self.get_aspect_ratio() * 0.05
+        if self._scene_frame is not None and self._scene_frame.computed_width and self._scene_frame.computed_height:
+            return self._scene_frame.computed_width / self._scene_frame.computed_height
+        return self.vp_win.width / self.vp_win.height
+
+    def get_aspect_ratio_policy(self):
+        """Get the SceneView aspect ratio policy for the current viewport frame size.
 
+        The policy only flips once the frame aspect ratio is ASPECT_RATIO_POLICY_HYSTERESIS past the render
+        target aspect ratio, so resizing around the boundary doesn't rebuild the SceneView over and over.
+
+        Returns:
+            scene.AspectRatioPolicy: PRESERVE_ASPECT_VERTICAL if the viewport frame is wider than the render
+                target, PRESERVE_ASPECT_HORIZONTAL otherwise.
+        """
+        from . import geometry
+        previous = None
+        if self._aspect_ratio_policy is not None:
+            previous = self._aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL
+        if geometry.is_preserve_vertical(self.get_frame_aspect_ratio(), self.get_aspect_ratio(), previous):
+            return scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL
+        return scene.AspectRatioPolicy.PRESERVE_ASPECT_HORIZONTAL
+
+    @timed("overlay.rebuild")
     def build_viewport_overlay(self, *args):
-        """Build all viewport graphics and ReticleMenu button."""
+        """Build all viewport graphics and ReticleMenu button.
+
+        The SceneView is built right away unless defer_scene_view is set and no guide is enabled.
+        """
         if self.vp_win is not None:
+            self.scene_view = None
+            self._clear_scene_items()
             # Create a unique frame for our overlay
             with self.vp_win.get_frame(self.ext_id):
                 with ui.ZStack():
-                    # Set the aspect ratio policy depending if the viewport is wider than it is taller or vice versa.
-                    if self.vp_win.width / self.vp_win.height > self.get_aspect_ratio_flip_threshold():
-                        self.scene_view = scene.SceneView(aspect_ratio_policy=scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL)
-                    else:
-                        self.scene_view = scene.SceneView(aspect_ratio_policy=scene.AspectRatioPolicy.PRESERVE_ASPECT_HORIZONTAL)
-
-                    # Build all the scene view guidelines
-                    with self.scene_view.scene:
-                        if self.model.composition_mode.as_int == CompositionGuidelines.THIRDS:
-                            self._build_thirds()
-                        elif self.model.composition_mode.as_int == CompositionGuidelines.QUAD:
-                            self._build_quad()
-                        elif self.model.composition_mode.as_int == CompositionGuidelines.CROSSHAIR:
-                            self._build_crosshair()
-
-                        if self.model.action_safe_enabled.as_bool:
-                            self._build_safe_rect(self.model.action_safe_percentage.as_float / 100.0,
-                                                  color=cl.action_safe_default)
-                        if self.model.title_safe_enabled.as_bool:
-                            self._build_safe_rect(self.model.title_safe_percentage.as_float / 100.0,
-                                                  color=cl.title_safe_default)
-                        if self.model.custom_safe_enabled.as_bool:
-                            self._build_safe_rect(self.model.custom_safe_percentage.as_float / 100.0,
-                                                  color=cl.custom_safe_default)
-                        if self.model.letterbox_enabled.as_bool:
-                            self._build_letterbox()
+                    self._scene_frame = ui.Frame()
+                    # The frame is laid out after the window size changes, its final size gives the exact policy.
+                    self._scene_frame.set_computed_content_size_changed_fn(weak_method(self.on_window_changed))
 
                     # Build ReticleMenu button
                     with ui.VStack():
                         ui.Spacer()
                         with ui.HStack(height=0):
                             ui.Spacer()
-                            self.reticle_menu = ReticleMenu(self.model)
-
-    def _build_thirds(self):
-        """Build the scene ui graphics for the Thirds composition mode."""
-        aspect_ratio = self.get_aspect_ratio()
-        line_color = cl.comp_lines_default
-        inverse_ratio = 1 / aspect_ratio
-        if self.scene_view.aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL:
-            scene.Line([-0.333 * aspect_ratio, -1, 0], [-0.333 * aspect_ratio, 1, 0], color=line_color)
-            scene.Line([0.333 * aspect_ratio, -1, 0], [0.333 * aspect_ratio, 1, 0], color=line_color)
-            scene.Line([-aspect_ratio, -0.333, 0], [aspect_ratio, -0.333, 0], color=line_color)
-            scene.Line([-aspect_ratio, 0.333, 0], [aspect_ratio, 0.333, 0], color=line_color)
-        else:
-            scene.Line([-1, -0.333 * inverse_ratio, 0], [1, -0.333 * inverse_ratio, 0], color=line_color)
-            scene.Line([-1, 0.333 * inverse_ratio, 0], [1, 0.333 * inverse_ratio, 0], color=line_color)
-            scene.Line([-0.333, -inverse_ratio, 0], [-0.333, inverse_ratio, 0], color=line_color)
-            scene.Line([0.333, -inverse_ratio, 0], [0.333, inverse_ratio, 0], color=line_color)
-
-    def _build_quad(self):
-        """Build the scene ui graphics for the Quad composition mode."""
-        aspect_ratio = self.get_aspect_ratio()
-        line_color = cl.comp_lines_default
-        inverse_ratio = 1 / aspect_ratio
-        if self.scene_view.aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL:
-            scene.Line([0, -1, 0], [0, 1, 0], color=line_color)
-            scene.Line([-aspect_ratio, 0, 0], [aspect_ratio, 0, 0], color=line_color)
-        else:
-            scene.Line([0, -inverse_ratio, 0], [0, inverse_ratio, 0], color=line_color)
-            scene.Line([-1, 0, 0], [1, 0, 0], color=line_color)
-
-    def _build_crosshair(self):
-        """Build the scene ui graphics for the Crosshair composition mode."""
-        aspect_ratio = self.get_aspect_ratio()
-        line_color = cl.comp_lines_default
-        if self.scene_view.aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL:
-            scene.Line([0, 0.05 * aspect_ratio, 0], [0, 0.1 * aspect_ratio, 0], color=line_color)
-            scene.Line([0, -0.05 * aspect_ratio, 0], [0, -0.1 * aspect_ratio, 0], color=line_color)
-            scene.Line([0.05 * aspect_ratio, 0, 0], [0.1 * aspect_ratio, 0, 0], color=line_color)
-            scene.Line([-0.05 * aspect_ratio, 0, 0], [-0.1 * aspect_ratio, 0, 0], color=line_color)
-        else:
-            scene.Line([0, 0.05 * 1, 0], [0, 0.1 * 1, 0], color=line_color)
-            scene.Line([0, -0.05 * 1, 0], [0, -0.1 * 1, 0], color=line_color)
-            scene.Line([0.05 * 1, 0, 0], [0.1 * 1, 0, 0], color=line_color)
-            scene.Line([-0.05 * 1, 0, 0], [-0.1 * 1, 0, 0], color=line_color)
+                            if self.reticle_menu is None:
+                                self.reticle_menu = ReticleMenu(self.model)
+                            self.reticle_menu.build_button()
+            if not self.defer_scene_view or self.model.get_state().has_guides:
+                self._build_scene_view()
 
-        scene.Points([[0.00005, 0, 0]], sizes=[2], colors=[line_color])
+    @timed("overlay.build_scene_view")
+    def _build_scene_view(self):
+        """Build the SceneView and its guides in the placeholder frame, replacing the previous ones.
 
-    def _build_safe_rect(self, percentage, color):
-        """Build the scene ui graphics for the safe area rectangle
+        The guide items are created up front, hidden, and then filled by update_viewport_overlay().
+        """
+        self._clear_scene_items()
+        self._scene_frame.visible = True
+        with self._scene_frame:
+            # Set the aspect ratio policy depending on whether the viewport frame is wider than the render target.
+            self._aspect_ratio_policy = self.get_aspect_ratio_policy()
+            self.scene_view = scene.SceneView(aspect_ratio_policy=self._aspect_ratio_policy)
+
+            # Build all the scene view guidelines
+            with self.scene_view.scene:
+                self._build_guide_lines()
+                self._build_letterbox()
+        if stats.enabled:
+            stats.increment("overlay.scene_items_created", self.get_scene_item_count())
+        self.update_viewport_overlay()
+
+    @timed("overlay.update")
+    def update_viewport_overlay(self, changed_fields=None):
+        """Update the existing viewport graphics in place from the ReticleModel and aspect ratio.
 
         Args:
-            percentage (float): The 0-1 percentage the render target that the rectangle should fill.
-            color: The color to draw the rectangle wireframe with.
+            changed_fields (frozenset): Names of the ReticleModel submodels that changed. Only the guides
+                depending on values that differ from the ones last applied are updated. Updates every guide if None.
         """
-        aspect_ratio = self.get_aspect_ratio()
-        inverse_ratio = 1 / aspect_ratio
-        if self.scene_view.aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL:
-            scene.Rectangle(aspect_ratio*2*percentage, 1*2*percentage, thickness=1, wireframe=True, color=color)
+        if self.vp_win is None:
+            return
+        state = self.model.get_state()
+        if self.scene_view is None:
+            if self._scene_frame is not None and state.has_guides:
+                self._build_scene_view()
+            return
+
+        if self.idle_scene_view != constants.IDLE_SCENE_VIEW_KEEP:
+            if not state.has_guides:
+                if self._scene_frame.visible:
+                    self._release_scene_view()
+                return
+            if not self._scene_frame.visible:
+                # Window changes were ignored while hidden: rebuild if the policy flipped, otherwise update it all.
+                self._scene_frame.visible = True
+                if self.get_aspect_ratio_policy() != self._aspect_ratio_policy:
+                    self._build_scene_view()
+                    return
+                changed_fields = None
+
+        if changed_fields is not None:
+            if state == self._applied_state:
+                return
+            changed_fields = state.diff(self._applied_state)
+            window_state = (self._aspect_ratio, self._aspect_ratio_policy, self._camera.get_framing())
+            if window_state != self._applied_window_state:
+                # The window or camera framing changed since the guides were drawn. The pending window update
+                # would find them up to date once this update records the new framing: update them all.
+                changed_fields = None
+
+        def changed(*names):
+            return changed_fields is None or not changed_fields.isdisjoint(names)
+
+        # Changes to hidden guides are ignored, they are applied when the guide gets enabled.
+        updates = []
+        guide_lines_changed = changed("composition_mode") or (
+            changed("extra_safe_areas") and (changed_fields is None or _get_safe_area_layout(state.extra_safe_areas)
+                                             != _get_safe_area_layout(self._applied_state.extra_safe_areas)))
+        for _, enabled_name, percentage_name, _ in BUILTIN_SAFE_AREAS:
+            enabled = getattr(state, enabled_name)
+            guide_lines_changed |= changed(enabled_name) or (enabled and changed(percentage_name))
+        if guide_lines_changed:
+            updates.append(self._update_guide_lines)
+        if changed("letterbox_enabled") or (state.letterbox_enabled and changed("letterbox_ratio")):
+            updates.append(partial(self._update_letterbox, state.letterbox_enabled))
+        self._applied_state = state
+        # Style changes only recolor the existing items, they don't need the geometry.
+        if changed("guide_styles"):
+            if not guide_lines_changed:
+                self._update_guide_line_styles()
+            self._update_letterbox_style()
+        if not updates:
+            return
+
+        self._geometry = self._compute_geometry(state)
+        self._applied_window_state = (self._aspect_ratio, self._aspect_ratio_policy, self._framing)
+        for update in updates:
+            update()
+
+    def _release_scene_view(self):
+        """Hide or destroy the SceneView, according to idle_scene_view, because no guide is enabled."""
+        if self.idle_scene_view == constants.IDLE_SCENE_VIEW_DESTROY:
+            self.scene_view.scene.clear()
+            self.scene_view = None
+            self._scene_frame.clear()
+            self._clear_scene_items()
         else:
-            scene.Rectangle(1*2*percentage, inverse_ratio*2*percentage, thickness=1, wireframe=True, color=color)
+            self._scene_frame.visible = False
+        if stats.enabled:
+            stats.increment("overlay.scene_view_released")
+
+    @timed("overlay.compute_geometry")
+    def _compute_geometry(self, state: ReticleState):
+        """Compute the coordinates of every guide for a model state and the current aspect ratio.
 
+        Args:
+            state (ReticleState): The reticle model values.
+
+        Returns:
+            geometry.ReticleGeometry: The guide coordinates.
+        """
+        self._framing = self._camera.get_framing()
+        return get_geometry(
+            self.get_aspect_ratio(),
+            self._aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL,
+            state,
+            self._framing,
+        )
+
+    @timed("overlay.build_guide_lines")
+    def _build_guide_lines(self):
+        """Build the scene ui graphics for the composition guides and the safe areas.
+
+        All the guide lines and safe area rectangles are drawn by a single wireframe PolygonMesh, with one
+        polygon per line segment or rectangle. The guide points are drawn by a single Points item.
+        """
+        self._guide_lines = scene.PolygonMesh([[0, 0, 0], [0, 0, 0]], [[0, 0, 0, 0]] * 2, [2], [0, 1],
+                                              thicknesses=[1, 1], wireframe=True, visible=False)
+        self._guide_points = scene.Points([[0, 0, 0]], sizes=[2], colors=[[0, 0, 0, 0]], visible=False)
+
+    def _get_guide_line_styles(self):
+        """Get the colors and thicknesses of the polygon sets of the guide lines mesh, from the applied state."""
+        state = self._applied_state
+        composition_style = state.get_guide_style(constants.COMPOSITION_GUIDE_STYLE)
+        safe_styles = [state.get_guide_style(safe_area.name) for safe_area in state.safe_areas if safe_area.enabled]
+        return ([composition_style.color, [style.color for style in safe_styles]],
+                [composition_style.thickness, [style.thickness for style in safe_styles]])
+
+    @timed("overlay.update_guide_lines")
+    def _update_guide_lines(self):
+        """Update the scene ui graphics for the composition guides and the safe areas.
+
+        The rectangles of all the enabled safe areas, however many there are, are built in one vectorized pass.
+        """
+        from . import geometry
+        colors, thicknesses = self._get_guide_line_styles()
+        polygon_sets = [self._geometry.composition_lines, geometry.get_rect_outlines(self._geometry.safe_rects)]
+        mesh = geometry.pack_polygons(polygon_sets, colors, thicknesses)
+        self._guide_line_shapes = [polygons.shape[:2] for polygons in polygon_sets]
+        if len(mesh.vertex_counts):
+            self._guide_lines.positions = mesh.positions.tolist()
+            self._guide_lines.colors = mesh.colors.tolist()
+            self._guide_lines.vertex_counts = mesh.vertex_counts.tolist()
+            self._guide_lines.vertex_indices = mesh.vertex_indices.tolist()
+            self._guide_lines.thicknesses = mesh.thicknesses.tolist()
+        self._guide_lines.visible = len(mesh.vertex_counts) > 0
+
+        points = self._geometry.composition_points
+        if len(points):
+            self._guide_points.positions = points.tolist()
+            self._update_guide_point_styles()
+        self._guide_points.visible = len(points) > 0
+
+    @timed("overlay.update_guide_styles")
+    def _update_guide_line_styles(self):
+        """Restyle the guide lines and points in place from the applied state, keeping their positions."""
+        from . import geometry
+        # Points-only guides have no lines, but their points still take the composition style.
+        if self._guide_points.visible:
+            self._update_guide_point_styles()
+        if not any(polygon_count for polygon_count, _ in self._guide_line_shapes):
+            return
+        colors, thicknesses = self._get_guide_line_styles()
+        vertex_colors, vertex_thicknesses = geometry.pack_polygon_styles(self._guide_line_shapes, colors,
+                                                                         thicknesses)
+        self._guide_lines.colors = vertex_colors.tolist()
+        self._guide_lines.thicknesses = vertex_thicknesses.tolist()
+
+    def _update_guide_point_styles(self):
+        """Restyle the guide points in place, as squares twice as wide as the composition lines."""
+        style = self._applied_state.get_guide_style(constants.COMPOSITION_GUIDE_STYLE)
+        point_count = len(self._geometry.composition_points)
+        self._guide_points.colors = [list(style.color)] * point_count
+        self._guide_points.sizes = [2 * style.thickness] * point_count
+
+    @timed("overlay.build_letterbox")
     def _build_letterbox(self):
-        """Build the scene ui graphics for the letterbox."""
-        aspect_ratio = self.get_aspect_ratio()
-        letterbox_color = cl.letterbox_default
-        letterbox_ratio = self.model.letterbox_ratio.as_float
-
-        def build_letterbox_helper(width, height, x_offset, y_offset):
-            move = scene.Matrix44.get_translation_matrix(x_offset, y_offset, 0)
-            with scene.Transform(transform=move):
-                scene.Rectangle(width * 2, height * 2, thickness=0, wireframe=False, color=letterbox_color)
-            move = scene.Matrix44.get_translation_matrix(-x_offset, -y_offset, 0)
-            with scene.Transform(transform=move):
-                scene.Rectangle(width * 2, height * 2, thickness=0, wireframe=False, color=letterbox_color)
-
-        if self.scene_view.aspect_ratio_policy == scene.AspectRatioPolicy.PRESERVE_ASPECT_VERTICAL:
-            if letterbox_ratio >= aspect_ratio:
-                height = 1 - aspect_ratio / letterbox_ratio
-                rect_height = height / 2
-                rect_offset = 1 - rect_height
-                build_letterbox_helper(aspect_ratio, rect_height, 0, rect_offset)
-            else:
-                width = aspect_ratio - letterbox_ratio
-                rect_width = width / 2
-                rect_offset = aspect_ratio - rect_width
-                build_letterbox_helper(rect_width, 1, rect_offset, 0)
-        else:
-            inverse_ratio = 1 / aspect_ratio
-            if letterbox_ratio >= aspect_ratio:
-                height = inverse_ratio - 1 / letterbox_ratio
-                rect_height = height / 2
-                rect_offset = inverse_ratio - rect_height
-                build_letterbox_helper(1, rect_height, 0, rect_offset)
-            else:
-                width = (aspect_ratio - letterbox_ratio) * inverse_ratio
-                rect_width = width / 2
-                rect_offset = 1 - rect_width
-                build_letterbox_helper(rect_width, inverse_ratio, rect_offset, 0)
+        """Build the scene ui graphics for the letterbox. Both bars are drawn by a single PolygonMesh."""
+        self._letterbox = scene.PolygonMesh([[0, 0, 0]] * 8, [[0, 0, 0, 0]] * 8, [4, 4],
+                                            list(range(8)), wireframe=False, visible=False)
+
+    def _update_letterbox_style(self):
+        """Recolor the letterbox in place from the applied state."""
+        style = self._applied_state.get_guide_style(constants.LETTERBOX_GUIDE_STYLE)
+        self._letterbox.colors = [list(style.color)] * 8
+
+    @timed("overlay.update_letterbox")
+    def _update_letterbox(self, visible):
+        """Update the scene ui graphics for the letterbox.
+
+        Args:
+            visible (bool): Whether the letterbox should be visible.
+        """
+        if visible:
+            from . import geometry
+            letterbox_polygons = geometry.get_letterbox_polygons(self._geometry.letterbox_rects)
+            self._letterbox.positions = letterbox_polygons.reshape(-1, 3).tolist()
+            self._update_letterbox_style()
+        self._letterbox.visible = visible
 
     def get_aspect_ratio(self):
         """Get the aspect ratio of the viewport.
@@ -234,25 +646,80 @@ class ReticleOverlay:
         return self._aspect_ratio
 
 
+def _get_menu_height(guide_count, safe_area_count):
+    """Get the height of the reticle menu popup, the tallest of its composition and safe area columns.
+
+    Args:
+        guide_count (int): Number of composition guide buttons.
+        safe_area_count (int): Number of safe area rows.
+
+    Returns:
+        int: The height in pixels.
+    """
+    composition_rows = -(-guide_count // _MENU_COMPOSITION_COLUMNS)
+    composition_height = _MENU_TITLE_HEIGHT + composition_rows * _MENU_COMPOSITION_ROW_HEIGHT
+    # Safe area rows, then the letterbox title and row
+    safe_areas_height = 2 * _MENU_TITLE_HEIGHT + (safe_area_count + 1) * _MENU_ROW_HEIGHT
+    return max(composition_height, safe_areas_height)
+
+
 class ReticleMenu:
-    """The popup reticle menu"""
+    """The popup reticle menu
+
+    The menu popup is built the first time it is shown and reused afterwards. Its widgets are kept
+    in sync with the ReticleModel through callbacks registered once, when the popup is built.
+    The composition buttons and safe area rows are generated from the guides registry and the
+    model safe areas, and the popup is rebuilt when it is shown after either changed.
+    """
     def __init__(self, model: ReticleModel):
         """ReticleMenu constructor
 
-        Stores the model and builds the Reticle button.
-
         Args:
             model (ReticleModel): The reticle model
         """
         self.model = model
-        self.button = ui.Button("Reticle", width=0, height=0, mouse_pressed_fn=self.show_reticle_menu,
-                                style={"margin": 10, "padding": 5, "color": cl.white})
+        self.button = None
         self.reticle_menu = None
+        # Guide id -> composition button
+        self.composition_buttons = {}
+        # Revisions of the guides registry and of the model safe areas the popup was built from
+        self._menu_revision = None
+        # (submodel, callback id) of every callback registered on the model by the menu
+        self._model_callbacks = []
+        # Safe area name -> color swatch, recolored in place when the guide styles change
+        self._swatches = {}
+        self._model_changed_sub = None
+
+    def build_button(self):
+        """Build the Reticle button in the current layout, replacing the previously built one."""
+        if self.button is not None:
+            self.button.destroy()
+        self.button = ui.Button("Reticle", width=0, height=0, mouse_pressed_fn=self.show_reticle_menu,
+                                style=_RETICLE_BUTTON_STYLE)
 
     def destroy(self):
-        self.button.destroy()
-        self.button = None
-        self.reticle_menu = None
+        self._destroy_menu()
+        if self.button is not None:
+            self.button.destroy()
+            self.button = None
+
+    def _destroy_menu(self):
+        """Destroy the popup and remove its model callbacks."""
+        for submodel, callback_id in self._model_callbacks:
+            submodel.remove_value_changed_fn(callback_id)
+        self._model_callbacks = []
+        if self._model_changed_sub is not None:
+            self._model_changed_sub.unsubscribe()
+            self._model_changed_sub = None
+        self.composition_buttons = {}
+        self._swatches = {}
+        if self.reticle_menu is not None:
+            self.reticle_menu.destroy()
+            self.reticle_menu = None
+
+    def _add_model_callback(self, submodel, callback):
+        """Register a value changed callback on a submodel, to be removed when the menu is destroyed."""
+        self._model_callbacks.append((submodel, submodel.add_value_changed_fn(callback)))
 
     def on_group_check_changed(self, safe_area_group, model):
         """Enables/disables safe area groups
@@ -273,107 +740,93 @@ class ReticleMenu:
         buttons should be checked off. Sets the composition mode on the ReticleModel too.
 
         Args:
-            guideline_type (_type_): _description_
+            guideline_type (int): The id of the selected guide.
         """
         self.model.composition_mode.set_value(guideline_type)
-        self.comp_off_button.checked = guideline_type == CompositionGuidelines.OFF
-        self.comp_thirds_button.checked = guideline_type == CompositionGuidelines.THIRDS
-        self.comp_quad_button.checked = guideline_type == CompositionGuidelines.QUAD
-        self.comp_crosshair_button.checked = guideline_type == CompositionGuidelines.CROSSHAIR
+        self._update_composition_buttons()
+
+    def _update_composition_buttons(self, *args):
+        """Check the button of the current composition mode and uncheck the others."""
+        guideline_type = self.model.composition_mode.as_int
+        for guide_id, button in self.composition_buttons.items():
+            button.checked = guide_id == guideline_type
+
+    def _on_reticle_changed(self, changed_fields):
+        """Recolor the safe area swatches in place when the guide styles changed."""
+        if "guide_styles" not in changed_fields:
+            return
+        from . import styles
+        for name, swatch in self._swatches.items():
+            swatch.style = styles.get_swatch_style(self.model.get_guide_style(name).color)
 
     def show_reticle_menu(self, x, y, button, modifier):
-        """Build and show the reticle menu popup."""
-        self.reticle_menu = ui.Menu("Reticle", width=400, height=200)
-        self.reticle_menu.clear()
+        """Show the reticle menu popup, building it the first time or if the registered guides changed."""
+        from . import guides
+        if self.reticle_menu is None or self._menu_revision != (guides.get_revision(), self.model.safe_areas_revision):
+            self._destroy_menu()
+            self._build_menu()
+        self.reticle_menu.show_at(x - self.reticle_menu.width, y - self.reticle_menu.height)
+
+    def _build_safe_area_row(self, safe_area: SafeAreaModel):
+        """Build the checkbox, slider and color swatch of a safe area in the current layout."""
+        from . import styles
+        with ui.HStack(width=0, height=_MENU_ROW_HEIGHT):
+            ui.Spacer(width=20)
+            cb = ui.CheckBox(model=safe_area.enabled)
+            safe_area_group = ui.HStack(enabled=safe_area.enabled.as_bool)
+            callback = partial(self.on_group_check_changed, safe_area_group)
+            self._add_model_callback(cb.model, callback)
+            with safe_area_group:
+                ui.Spacer(width=10)
+                # Fixed width labels keep the sliders of all the rows aligned.
+                ui.Label(safe_area.name, alignment=ui.Alignment.TOP, width=80)
+                with ui.VStack():
+                    ui.FloatSlider(safe_area.percentage, width=100, format="%.0f%%", min=0, max=100, step=1)
+                    self._swatches[safe_area.name] = ui.Rectangle(
+                        height=5, style=styles.get_swatch_style(safe_area.color))
+                    ui.Spacer()
+
+    def _build_menu(self):
+        """Build the reticle menu popup and register the callbacks keeping it in sync with the model."""
+        from . import guides, styles
+        self._menu_revision = (guides.get_revision(), self.model.safe_areas_revision)
+        registered_guides = guides.get_guides()
+        comp_group_style = styles.get_comp_group_style(tuple(registered_guides))
+        self.reticle_menu = ui.Menu("Reticle", width=_MENU_WIDTH,
+                                    height=_get_menu_height(len(registered_guides), len(self.model.safe_areas)))
 
         with self.reticle_menu:
-            with ui.Frame(width=0, height=100):
+            with ui.Frame(width=0, height=0):
                 with ui.HStack():
                     with ui.VStack():
-                        ui.Label("Composition", alignment=ui.Alignment.LEFT, height=30)
-                        with ui.VGrid(style=styles.comp_group_style, width=150, height=0,
-                                      column_count=2, row_height=75):
+                        ui.Label("Composition", alignment=ui.Alignment.LEFT, height=_MENU_TITLE_HEIGHT)
+                        with ui.VGrid(style=comp_group_style, width=150, height=0,
+                                      column_count=_MENU_COMPOSITION_COLUMNS,
+                                      row_height=_MENU_COMPOSITION_ROW_HEIGHT):
                             current_comp_mode = self.model.composition_mode.as_int
-                            with ui.HStack():
-                                off_checked = current_comp_mode == CompositionGuidelines.OFF
-                                callback = partial(self.on_composition_mode_changed, CompositionGuidelines.OFF)
-                                self.comp_off_button = ui.Button("Off", name="Off", checked=off_checked,
-                                                                 width=70, height=70, clicked_fn=callback)
-                            with ui.HStack():
-                                thirds_checked = current_comp_mode == CompositionGuidelines.THIRDS
-                                callback = partial(self.on_composition_mode_changed, CompositionGuidelines.THIRDS)
-                                self.comp_thirds_button = ui.Button("Thirds", name="Thirds", checked=thirds_checked,
-                                                                    width=70, height=70, clicked_fn=callback)
-                            with ui.HStack():
-                                quad_checked = current_comp_mode == CompositionGuidelines.QUAD
-                                callback = partial(self.on_composition_mode_changed, CompositionGuidelines.QUAD)
-                                self.comp_quad_button = ui.Button("Quad", name="Quad", checked=quad_checked,
-                                                                  width=70, height=70, clicked_fn=callback)
-                            with ui.HStack():
-                                crosshair_checked = current_comp_mode == CompositionGuidelines.CROSSHAIR
-                                callback = partial(self.on_composition_mode_changed,
-                                                   CompositionGuidelines.CROSSHAIR)
-                                self.comp_crosshair_button = ui.Button("Crosshair", name="Crosshair",
-                                                                       checked=crosshair_checked, width=70, height=70,
-                                                                       clicked_fn=callback)
+                            for guide in registered_guides:
+                                with ui.HStack():
+                                    callback = partial(self.on_composition_mode_changed, guide.id)
+                                    self.composition_buttons[guide.id] = ui.Button(
+                                        guide.label, name=guide.name, checked=current_comp_mode == guide.id,
+                                        width=70, height=70, clicked_fn=callback)
                     ui.Spacer(width=10)
                     with ui.VStack(style=styles.safe_areas_group_style):
-                        ui.Label("Safe Areas", alignment=ui.Alignment.LEFT, height=30)
-                        with ui.HStack(width=0):
-                            ui.Spacer(width=20)
-                            cb = ui.CheckBox(model=self.model.action_safe_enabled)
-                            action_safe_group = ui.HStack(enabled=self.model.action_safe_enabled.as_bool)
-                            callback = partial(self.on_group_check_changed, action_safe_group)
-                            cb.model.add_value_changed_fn(callback)
-                            with action_safe_group:
-                                ui.Spacer(width=10)
-                                ui.Label("Action Safe", alignment=ui.Alignment.TOP)
-                                ui.Spacer(width=14)
-                                with ui.VStack():
-                                    ui.FloatSlider(self.model.action_safe_percentage, width=100,
-                                                   format="%.0f%%", min=0, max=100, step=1)
-                                    ui.Rectangle(name="ActionSwatch", height=5)
-                                    ui.Spacer()
-                        with ui.HStack(width=0):
-                            ui.Spacer(width=20)
-                            cb = ui.CheckBox(model=self.model.title_safe_enabled)
-                            title_safe_group = ui.HStack(enabled=self.model.title_safe_enabled.as_bool)
-                            callback = partial(self.on_group_check_changed, title_safe_group)
-                            cb.model.add_value_changed_fn(callback)
-                            with title_safe_group:
-                                ui.Spacer(width=10)
-                                ui.Label("Title Safe", alignment=ui.Alignment.TOP)
-                                ui.Spacer(width=25)
-                                with ui.VStack():
-                                    ui.FloatSlider(self.model.title_safe_percentage, width=100,
-                                                   format="%.0f%%", min=0, max=100, step=1)
-                                    ui.Rectangle(name="TitleSwatch", height=5)
-                                    ui.Spacer()
-                        with ui.HStack(width=0):
-                            ui.Spacer(width=20)
-                            cb = ui.CheckBox(model=self.model.custom_safe_enabled)
-                            custom_safe_group = ui.HStack(enabled=self.model.custom_safe_enabled.as_bool)
-                            callback = partial(self.on_group_check_changed, custom_safe_group)
-                            cb.model.add_value_changed_fn(callback)
-                            with custom_safe_group:
-                                ui.Spacer(width=10)
-                                ui.Label("Custom Safe", alignment=ui.Alignment.TOP)
-                                ui.Spacer(width=5)
-                                with ui.VStack():
-                                    ui.FloatSlider(self.model.custom_safe_percentage, width=100,
-                                                   format="%.0f%%", min=0, max=100, step=1)
-                                    ui.Rectangle(name="CustomSwatch", height=5)
-                                    ui.Spacer()
-                        ui.Label("Letterbox", alignment=ui.Alignment.LEFT, height=30)
-                        with ui.HStack(width=0):
+                        ui.Label("Safe Areas", alignment=ui.Alignment.LEFT, height=_MENU_TITLE_HEIGHT)
+                        for safe_area in self.model.safe_areas:
+                            self._build_safe_area_row(safe_area)
+                        ui.Label("Letterbox", alignment=ui.Alignment.LEFT, height=_MENU_TITLE_HEIGHT)
+                        with ui.HStack(width=0, height=_MENU_ROW_HEIGHT):
                             ui.Spacer(width=20)
                             cb = ui.CheckBox(model=self.model.letterbox_enabled)
                             letterbox_group = ui.HStack(enabled=self.model.letterbox_enabled.as_bool)
                             callback = partial(self.on_group_check_changed, letterbox_group)
-                            cb.model.add_value_changed_fn(callback)
+                            self._add_model_callback(cb.model, callback)
                             with letterbox_group:
                                 ui.Spacer(width=10)
                                 ui.Label("Letterbox Ratio", alignment=ui.Alignment.TOP)
                                 ui.Spacer(width=5)
                                 ui.FloatDrag(self.model.letterbox_ratio, width=35, min=0.001, step=0.01)
-        self.reticle_menu.show_at(x - self.reticle_menu.width, y - self.reticle_menu.height)
+        # Keep the composition buttons in sync when the mode is changed from elsewhere (e.g. another viewport).
+        self._add_model_callback(self.model.composition_mode, self._update_composition_buttons)
+        self._model_changed_sub = self.model.add_reticle_fields_changed_fn(self._on_reticle_changed, weak=True)
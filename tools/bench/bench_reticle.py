@@ -0,0 +1,753 @@
+"""Headless benchmarks for omni.example.reticle.
+
+Runs the extension on plain CPython with the stand-ins from standins.py and measures the overlay rebuild and
+update paths, extension startup, ReticleModel notifications, preset loading, window resize storms, the control
+endpoint and the reticle menu. Results are printed as JSON (or written to --output) so they can be compared between
+releases.
+
+Usage:
+    python tools/bench/bench_reticle.py [--output results.json] [--repeat 200]
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+import standins  # noqa: E402
+from reticle_control import ReticleControlClient  # noqa: E402
+
+standins.install()
+
+from omni.example.reticle.instrumentation import stats  # noqa: E402
+from omni.example.reticle.constants import CompositionGuidelines  # noqa: E402
+from omni.example.reticle.models import ReticleModel, ReticleState  # noqa: E402
+from omni.example.reticle.presets import PresetStore, ReticlePresets  # noqa: E402
+from omni.example.reticle.views import ReticleOverlay  # noqa: E402
+from omni.example.reticle import constants, views  # noqa: E402
+
+EXT_ID = "omni.example.reticle-bench"
+PROBE_STARTUP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probe_startup.py")
+
+# Calls of the instrumented ReticleOverlay methods, reset by each benchmark.
+CALLS = {}
+
+
+def _count_calls(cls, name):
+    method = getattr(cls, name)
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        CALLS[name] = CALLS.get(name, 0) + 1
+        return method(*args, **kwargs)
+
+    setattr(cls, name, wrapper)
+
+
+for _name in ("build_viewport_overlay", "_build_scene_view", "update_viewport_overlay", "_compute_geometry"):
+    _count_calls(ReticleOverlay, _name)
+
+
+def _reset():
+    CALLS.clear()
+    standins.reset_counters()
+
+
+def _summarize(samples):
+    """Summarize durations (in seconds) as microsecond statistics."""
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "min_us": samples[0] * 1e6,
+        "median_us": statistics.median(samples) * 1e6,
+        "mean_us": statistics.mean(samples) * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+        "max_us": samples[-1] * 1e6,
+    }
+
+
+def _create_overlay(model=None, title="Viewport", resolution=(1920, 1080), **kwargs):
+    window = standins.ViewportWindow(title, resolution=resolution)
+    overlay = ReticleOverlay(model if model is not None else ReticleModel(), window, EXT_ID, **kwargs)
+    overlay.build_viewport_overlay()
+    return window, overlay
+
+
+def _destroy(window, overlay):
+    overlay.destroy()
+    window.destroy()
+
+
+def _enable_all_guides(model):
+    with model.batch_update():
+        model.composition_mode.set_value(1)
+        model.action_safe_enabled.set_value(True)
+        model.title_safe_enabled.set_value(True)
+        model.custom_safe_enabled.set_value(True)
+        model.letterbox_enabled.set_value(True)
+
+
+def _run_frames(frames):
+    asyncio.get_event_loop().run_until_complete(standins.get_app().update_async(frames))
+
+
+def bench_rebuild(repeat):
+    """Full build_viewport_overlay() with every guide enabled."""
+    window, overlay = _create_overlay()
+    _enable_all_guides(overlay.model)
+    samples = []
+    _reset()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        overlay.build_viewport_overlay()
+        samples.append(time.perf_counter() - start)
+    result = {
+        "latency": _summarize(samples),
+        "scene_items_per_rebuild": standins.items_created("scene") / repeat,
+        "ui_items_per_rebuild": standins.items_created("ui") / repeat,
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_model_change(repeat):
+    """A single submodel change, as fired by each tick of a safe area slider drag."""
+    window, overlay = _create_overlay()
+    _enable_all_guides(overlay.model)
+    fired = []
+    subscription = overlay.model.add_reticle_fields_changed_fn(fired.append)
+    samples = []
+    _reset()
+    for index in range(repeat):
+        start = time.perf_counter()
+        overlay.model.action_safe_percentage.set_value(50 + index % 50)
+        samples.append(time.perf_counter() - start)
+    result = {
+        "latency": _summarize(samples),
+        "notifications_per_change": len(fired) / repeat,
+        "overlay_updates_per_change": CALLS.get("update_viewport_overlay", 0) / repeat,
+        "overlay_rebuilds_per_change": CALLS.get("build_viewport_overlay", 0) / repeat,
+        "scene_items_per_change": standins.items_created("scene") / repeat,
+        "model_callbacks": overlay.model.get_callback_count(),
+    }
+    subscription.unsubscribe()
+    _destroy(window, overlay)
+    return result
+
+
+def bench_style_change(repeat):
+    """Guide color, opacity and thickness changes, as fired while dragging a color picker or a thickness slider."""
+    window, overlay = _create_overlay()
+    _enable_all_guides(overlay.model)
+    overlay.reticle_menu.show_reticle_menu(0, 0, 0, 0)
+    names = [constants.COMPOSITION_GUIDE_STYLE, constants.LETTERBOX_GUIDE_STYLE, "Action Safe", "Title Safe"]
+    samples = []
+    _reset()
+    for index in range(repeat):
+        name = names[index % len(names)]
+        start = time.perf_counter()
+        overlay.model.set_guide_style(name, color=(index % 2, 0.5, 1.0), opacity=0.5 + index % 50 / 100,
+                                      thickness=1 + index % 3)
+        samples.append(time.perf_counter() - start)
+    result = {
+        "latency": _summarize(samples),
+        "overlay_updates_per_change": CALLS.get("update_viewport_overlay", 0) / repeat,
+        "overlay_rebuilds_per_change": CALLS.get("build_viewport_overlay", 0) / repeat,
+        "geometry_computes_per_change": CALLS.get("_compute_geometry", 0) / repeat,
+        "items_per_change": standins.items_created() / repeat,
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_safe_areas(repeat, counts=(1, 3, 10, 30)):
+    """A safe area slider change with more and more user-defined safe areas enabled."""
+    result = {}
+    for count in counts:
+        window, overlay = _create_overlay()
+        model = overlay.model
+        with model.batch_update():
+            for index in range(count):
+                model.add_safe_area("Safe Area {}".format(index), 50 + index % 50)
+        safe_area = model.safe_areas[-1]
+        samples = []
+        _reset()
+        for index in range(repeat):
+            start = time.perf_counter()
+            safe_area.percentage.set_value(50 + index % 50)
+            samples.append(time.perf_counter() - start)
+        result[str(count)] = {
+            "latency": _summarize(samples),
+            "overlay_updates_per_change": CALLS.get("update_viewport_overlay", 0) / repeat,
+            "scene_items_per_change": standins.items_created("scene") / repeat,
+        }
+        _destroy(window, overlay)
+    return result
+
+
+def bench_preset(repeat):
+    """Setting five values at once, unbatched and batched."""
+    window, overlay = _create_overlay()
+    model = overlay.model
+
+    def apply(index, batched):
+        values = (
+            (model.composition_mode, 1 + index % 3),
+            (model.action_safe_enabled, True),
+            (model.action_safe_percentage, 80 + index % 10),
+            (model.letterbox_enabled, True),
+            (model.letterbox_ratio, 2 + (index % 10) / 10),
+        )
+        if batched:
+            model.begin_update()
+        for submodel, value in values:
+            submodel.set_value(value)
+        if batched:
+            model.end_update()
+
+    result = {}
+    for batched in (False, True):
+        fired = []
+        subscription = model.add_reticle_fields_changed_fn(fired.append)
+        samples = []
+        _reset()
+        for index in range(repeat):
+            start = time.perf_counter()
+            apply(index, batched)
+            samples.append(time.perf_counter() - start)
+        result["batched" if batched else "unbatched"] = {
+            "latency": _summarize(samples),
+            "notifications_per_preset": len(fired) / repeat,
+            "overlay_updates_per_preset": CALLS.get("update_viewport_overlay", 0) / repeat,
+        }
+        subscription.unsubscribe()
+    _destroy(window, overlay)
+    return result
+
+
+def bench_preset_load(repeat, preset_count=100):
+    """Reading a presets file and restoring the last used state, as done on the first update after startup."""
+    window, overlay = _create_overlay()
+    model = overlay.model
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = PresetStore(os.path.join(temp_dir, "presets.json"))
+        state = model.get_state()
+        for index in range(preset_count):
+            store.set_preset("Preset {}".format(index), state.replace(letterbox_ratio=1 + index / 10),
+                             project="project {}".format(index % 4) if index % 2 else None)
+        store.set_last_used(state.replace(composition_mode=1, action_safe_enabled=True, letterbox_enabled=True))
+        store.save()
+        file_size = os.path.getsize(store.path)
+
+        load_samples = []
+        restore_samples = []
+        fired = []
+        subscription = model.add_reticle_fields_changed_fn(fired.append)
+        _reset()
+        for index in range(repeat):
+            model.apply_state(state)
+            fired.clear()
+            CALLS.clear()
+            start = time.perf_counter()
+            presets = ReticlePresets(model, PresetStore(store.path))
+            constructed = time.perf_counter()
+            _run_frames(1)
+            restored = time.perf_counter()
+            load_samples.append(constructed - start)
+            restore_samples.append(restored - constructed)
+            presets.destroy()
+        result = {
+            "presets": preset_count,
+            "file_bytes": file_size,
+            "startup_latency": _summarize(load_samples),
+            "restore_latency": _summarize(restore_samples),
+            "notifications_per_restore": len(fired),
+            "overlay_updates_per_restore": CALLS.get("update_viewport_overlay", 0),
+        }
+        subscription.unsubscribe()
+    _destroy(window, overlay)
+    return result
+
+
+def bench_sync(repeat):
+    """Reticle state sync between two viewports' models through a shared file, as between two Kit processes."""
+    from omni.example.reticle.sync import ReticleStateSync
+    window, overlay = _create_overlay()
+    peer_window, peer_overlay = _create_overlay(title="Peer Viewport")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "reticle.sync")
+        sync = ReticleStateSync(overlay.model, path)
+        peer_sync = ReticleStateSync(peer_overlay.model, path)
+        _enable_all_guides(overlay.model)
+        _run_frames(1)
+
+        idle_samples = []
+        for _ in range(repeat * 100):
+            start = time.perf_counter()
+            peer_sync.check()
+            idle_samples.append(time.perf_counter() - start)
+
+        publish_samples = []
+        apply_samples = []
+        fired = []
+        subscription = peer_overlay.model.add_reticle_fields_changed_fn(fired.append)
+        _reset()
+        for index in range(repeat):
+            start = time.perf_counter()
+            with overlay.model.batch_update():
+                overlay.model.action_safe_percentage.set_value(50 + index % 50)
+                overlay.model.letterbox_ratio.set_value(1.5 + index % 10 / 10)
+            published = time.perf_counter()
+            peer_sync.check()
+            applied = time.perf_counter()
+            publish_samples.append(published - start)
+            apply_samples.append(applied - published)
+        result = {
+            "idle_check": _summarize(idle_samples),
+            "publish_latency": _summarize(publish_samples),
+            "apply_latency": _summarize(apply_samples),
+            "peer_notifications_per_change": len(fired) / repeat,
+            "in_sync": peer_overlay.model.get_state() == overlay.model.get_state(),
+        }
+        subscription.unsubscribe()
+        result["startup"] = _bench_sync_startup(temp_dir, path, peer_sync, overlay.model.get_state())
+        sync.destroy()
+        peer_sync.destroy()
+    _destroy(window, overlay)
+    _destroy(peer_window, peer_overlay)
+    return result
+
+
+def _bench_sync_startup(temp_dir, path, peer_sync, peer_state):
+    """Start the extension as a process joining a sync session, with a different last used reticle."""
+    from omni.example.reticle.extension import ExampleViewportReticleExtension
+    store = PresetStore(os.path.join(temp_dir, "presets.json"))
+    store.set_last_used(peer_state.replace(letterbox_enabled=True, letterbox_ratio=peer_state.letterbox_ratio + 1))
+    store.save()
+    settings = standins.get_settings()
+    previous = {key: settings.get(key) for key in (constants.SETTING_PRESETS_PATH, constants.SETTING_SYNC_PATH)}
+    settings.set(constants.SETTING_PRESETS_PATH, store.path)
+    settings.set(constants.SETTING_SYNC_PATH, path)
+    extension = ExampleViewportReticleExtension()
+    extension.on_startup("omni.example.reticle-bench")
+    # Past the deferred restore of the last used reticle and the debounced notifications
+    _run_frames(3)
+    peer_sync.check()
+    result = {
+        "adopted": extension.sync.adopted,
+        "kept_peer_state": extension.reticle_manager.model.get_state() == peer_state,
+        "peer_unchanged": peer_sync.model.get_state() == peer_state,
+    }
+    extension.on_shutdown()
+    for key, value in previous.items():
+        settings.set(key, value)
+    return result
+
+
+def bench_idle_toggle(repeat):
+    """Disabling the last guide and enabling it again, for each way of handling the idle SceneView."""
+    result = {}
+    for idle_scene_view in ("keep", "hide", "destroy"):
+        window, overlay = _create_overlay(idle_scene_view=idle_scene_view)
+        model = overlay.model
+        disable_samples = []
+        enable_samples = []
+        _reset()
+        for index in range(repeat):
+            start = time.perf_counter()
+            model.letterbox_enabled.set_value(True)
+            enabled = time.perf_counter()
+            model.letterbox_enabled.set_value(False)
+            enable_samples.append(enabled - start)
+            disable_samples.append(time.perf_counter() - enabled)
+        result[idle_scene_view] = {
+            "enable_latency": _summarize(enable_samples),
+            "disable_latency": _summarize(disable_samples),
+            "scene_items_per_toggle": standins.items_created("scene") / repeat,
+            "idle_scene_view_drawn": overlay.scene_view is not None and overlay._scene_frame.visible,
+        }
+        _destroy(window, overlay)
+    return result
+
+
+def bench_resize_storm(events):
+    """Hundreds of width/height/view change events, as fired while drag-resizing a viewport over a few frames."""
+    window, overlay = _create_overlay()
+    _enable_all_guides(overlay.model)
+    frames = 10
+    _reset()
+    settings_reads = standins.get_settings().reads
+    resolution_reads = window.viewport_api.resolution_reads
+    start = time.perf_counter()
+    for frame in range(frames):
+        for index in range(events // frames):
+            window.resize(width=1000 + frame * 50 + index, height=600 + frame * 20 + index // 2)
+            window.viewport_api.resolution = (1920 + frame * 10, 1080)
+        _run_frames(1)
+    duration = time.perf_counter() - start
+    result = {
+        "events": events * 3,
+        "frames": frames,
+        "duration_ms": duration * 1e3,
+        "overlay_updates": CALLS.get("update_viewport_overlay", 0),
+        "overlay_rebuilds": CALLS.get("build_viewport_overlay", 0),
+        "scene_view_rebuilds": CALLS.get("_build_scene_view", 0),
+        "scene_items_created": standins.items_created("scene"),
+        "settings_reads": standins.get_settings().reads - settings_reads,
+        "viewport_resolution_reads": window.viewport_api.resolution_reads - resolution_reads,
+        "geometry_cache": views.get_geometry_cache_info()._asdict(),
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_policy_boundary(frames):
+    """A viewport drag-resized back and forth across the render target aspect ratio, one resize per frame."""
+    window, overlay = _create_overlay(resolution=(1920, 1080))
+    _enable_all_guides(overlay.model)
+    _reset()
+    start = time.perf_counter()
+    for frame in range(frames):
+        # Frame aspect ratios within +-0.5% of 16:9, flipping side every frame.
+        width = 1600 + (4 if frame % 2 else -4)
+        window.resize(width=width, height=900)
+        _run_frames(1)
+    duration = time.perf_counter() - start
+    result = {
+        "frames": frames,
+        "duration_ms": duration * 1e3,
+        "scene_view_rebuilds": CALLS.get("_build_scene_view", 0),
+        "aspect_ratio_policy": str(overlay._aspect_ratio_policy),
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_raster(frame_count, resolution=(1920, 1080)):
+    """Burning the reticle into a stream of rendered frames."""
+    import numpy as np
+    from omni.example.reticle import raster
+    state = ReticleState.get_default().replace(
+        composition_mode=CompositionGuidelines.THIRDS, action_safe_enabled=True, title_safe_enabled=True,
+        letterbox_enabled=True)
+    width, height = resolution
+    raster.clear_mask_cache()
+    start = time.perf_counter()
+    mask = raster.get_reticle_mask(state, width, height)
+    mask_duration = time.perf_counter() - start
+    images = [np.full((height, width, 3), 128, dtype=np.uint8) for _ in range(min(frame_count, 8))]
+    frames = (images[index % len(images)] for index in range(frame_count))
+    start = time.perf_counter()
+    for _ in raster.draw_reticle_frames(frames, state):
+        pass
+    duration = time.perf_counter() - start
+    return {
+        "resolution": list(resolution),
+        "frames": frame_count,
+        "mask_ms": mask_duration * 1e3,
+        "mask_pixels": len(mask.rows),
+        "blend_ms_per_frame": duration / frame_count * 1e3,
+        "mask_cache": raster.get_mask_cache_info()._asdict(),
+    }
+
+
+def bench_camera(edits, prim_count=100000):
+    """Camera framing tracking on a large stage: edits to unrelated prims, to the camera and camera switches."""
+    stage = standins.Stage()
+    for index in range(prim_count):
+        stage.DefinePrim(f"/World/Prim_{index}", size=1.0)
+    stage.DefinePrim("/World/Camera", horizontalAperture=20.955, verticalAperture=15.2908)
+    stage.DefinePrim("/World/Anamorphic", horizontalAperture=22.0, verticalAperture=18.6, squeeze=2.0, overscan=0.1)
+    window, overlay = _create_overlay()
+    window.viewport_api.stage = stage
+    window.viewport_api.camera_path = "/World/Camera"
+    window.viewport_api.notify_view_change()
+    overlay.model.action_safe_enabled.set_value(True)
+    _run_frames(1)
+    watcher = standins.get_watcher()
+    result = {"prims": prim_count}
+    # Kit's default camera apertures on a 16:9 render target: the gate must stay inside the render target.
+    from omni.example.reticle import geometry
+    framing = overlay._framing
+    result["default_camera"] = {
+        "framing": framing._asdict(),
+        "gate_scale": geometry.get_gate_scale(overlay.get_aspect_ratio(), framing.gate_aspect_ratio,
+                                              framing.overscan).tolist(),
+    }
+
+    _reset()
+    dispatched, reads = watcher.dispatched, stage.reads
+    start = time.perf_counter()
+    for index in range(edits):
+        stage.GetPrimAtPath(f"/World/Prim_{index % prim_count}").GetAttribute("size").Set(float(index))
+    _run_frames(1)
+    result["unrelated_edits"] = {
+        "edits": edits,
+        "duration_ms": (time.perf_counter() - start) * 1e3,
+        "callbacks": watcher.dispatched - dispatched,
+        "attribute_reads": stage.reads - reads,
+        "overlay_updates": CALLS.get("update_viewport_overlay", 0),
+    }
+
+    camera = stage.GetPrimAtPath("/World/Camera")
+    _reset()
+    reads = stage.reads
+    for index in range(edits):
+        camera.GetAttribute("horizontalAperture").Set(20.0 + index % 10)
+    _run_frames(1)
+    result["camera_edits"] = {
+        "edits": edits,
+        "attribute_reads": stage.reads - reads,
+        "overlay_updates": CALLS.get("update_viewport_overlay", 0),
+    }
+
+    _reset()
+    window.viewport_api.camera_path = "/World/Anamorphic"
+    window.viewport_api.notify_view_change()
+    _run_frames(1)
+    result["camera_switch"] = {
+        "overlay_updates": CALLS.get("update_viewport_overlay", 0),
+        "framing": overlay._framing._asdict(),
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_playback(frame_count=240):
+    """Timeline playback of an animated camera with baked guide tracks, and re-baking after a key edit."""
+    from omni.example.reticle import tracks
+    stage = standins.Stage()
+    camera = stage.DefinePrim("/World/Camera", verticalAperture=15.2908, overscan=0.05)
+    aperture = camera.GetAttribute("horizontalAperture")
+    for timecode, value in ((0, 20.955), (frame_count // 2, 36.0), (frame_count, 24.0)):
+        aperture.Set(value, time=timecode)
+    timeline = standins.get_timeline()
+    timeline.start_time = 0.0
+    timeline.end_time = frame_count / timeline.time_codes_per_second
+    window, overlay = _create_overlay(bake_tracks=True)
+    window.viewport_api.stage = stage
+    window.viewport_api.camera_path = "/World/Camera"
+    window.viewport_api.notify_view_change()
+    _enable_all_guides(overlay.model)
+    _run_frames(1)
+
+    def wait_for_bake():
+        start = time.perf_counter()
+        while overlay._track_baker.baking:
+            time.sleep(0.0005)
+        return (time.perf_counter() - start) * 1e3
+
+    timeline.play()
+    bake_ms = wait_for_bake()
+    _reset()
+    ticks = []
+    for timecode in range(frame_count + 1):
+        start = time.perf_counter()
+        timeline.tick(timecode)
+        ticks.append(time.perf_counter() - start)
+    result = {
+        "frames": frame_count + 1,
+        "bake_ms": bake_ms,
+        "tick_us": _summarize(ticks),
+        "track_updates": CALLS.get("update_viewport_overlay", 0),
+        "scene_items_created": standins.items_created("scene"),
+    }
+
+    reads = stage.reads
+    aperture.Set(30.0, time=frame_count)
+    timeline.tick(0)
+    result["key_edit"] = {
+        "rebake_ms": wait_for_bake(),
+        "attribute_reads": stage.reads - reads,
+    }
+    _destroy(window, overlay)
+    tracks.shutdown()
+    return result
+
+
+def bench_multi_viewport(repeat, viewport_count=6):
+    """A shared model change with several viewports attached."""
+    model = ReticleModel()
+    _enable_all_guides(model)
+    overlays = [_create_overlay(model, "Viewport {}".format(index)) for index in range(viewport_count)]
+    samples = []
+    _reset()
+    for index in range(repeat):
+        start = time.perf_counter()
+        model.letterbox_ratio.set_value(2 + (index % 10) / 10)
+        samples.append(time.perf_counter() - start)
+    result = {
+        "viewports": viewport_count,
+        "latency": _summarize(samples),
+        "overlay_updates_per_change": CALLS.get("update_viewport_overlay", 0) / repeat,
+        "overlay_rebuilds_per_change": CALLS.get("build_viewport_overlay", 0) / repeat,
+        "debug_counts": ReticleOverlay.get_debug_counts(),
+    }
+    for window, overlay in overlays:
+        _destroy(window, overlay)
+    return result
+
+
+def bench_control(repeat, viewport_count=6):
+    """Command batches sent through the control endpoint to viewports with their own models, one after the other
+    and pipelined."""
+    from omni.example.reticle.control import ReticleControlServer
+    from omni.example.reticle.manager import ReticleManager
+    windows = [standins.ViewportWindow("Viewport {}".format(index)) for index in range(viewport_count)]
+    manager = ReticleManager(EXT_ID, share_model=False)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        server = ReticleControlServer(manager, os.path.join(temp_dir, "reticle.sock"))
+        server.start()
+        _run_frames(1)
+
+        def get_batch(index):
+            return {"commands": [
+                {"op": "set", "values": {"composition_mode": 1 + index % 3, "letterbox_enabled": True,
+                                         "letterbox_ratio": 1.5 + index % 10 / 10}},
+                {"op": "set_safe_area", "name": "Action Safe", "enabled": True, "percentage": 50 + index % 50},
+            ]}
+
+        async def send():
+            async with ReticleControlClient(server.path) as client:
+                sequential = [await client.send_batch(**get_batch(index)) for index in range(repeat)]
+                start = time.perf_counter()
+                pipelined = await client.send_batches([get_batch(index) for index in range(repeat)])
+                return sequential, pipelined, time.perf_counter() - start
+
+        _reset()
+        sequential, pipelined, pipelined_duration = asyncio.get_event_loop().run_until_complete(send())
+        result = {
+            "viewports": viewport_count,
+            "apply_latency": _summarize([response["apply_ms"] / 1e3 for response in sequential]),
+            "round_trip_latency": _summarize([response["round_trip_ms"] / 1e3 for response in sequential]),
+            "pipelined_batches_per_s": repeat / pipelined_duration,
+            "overlay_updates_per_batch": CALLS.get("update_viewport_overlay", 0) / (2 * repeat),
+            "overlay_rebuilds_per_batch": CALLS.get("build_viewport_overlay", 0) / (2 * repeat),
+            "rejected_batches": sum(not response["ok"] for response in sequential + pipelined),
+        }
+        server.destroy()
+    manager.destroy()
+    for window in windows:
+        window.destroy()
+    return result
+
+
+def bench_menu(repeat):
+    """Opening the reticle menu popup."""
+    window, overlay = _create_overlay()
+    samples = []
+    _reset()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        overlay.reticle_menu.show_reticle_menu(500, 500, 0, 0)
+        samples.append(time.perf_counter() - start)
+    result = {
+        "latency": _summarize(samples),
+        "ui_items_created": standins.items_created("ui"),
+        "submodel_callbacks": overlay.model.action_safe_enabled.get_value_changed_fn_count(),
+    }
+    _destroy(window, overlay)
+    return result
+
+
+def bench_startup(repeat):
+    """Extension import and on_startup with every guide off, with the SceneView deferred and built eagerly.
+
+    Each sample runs in a new interpreter so module imports are paid for every time.
+    """
+    result = {}
+    for defer_scene_view in (False, True):
+        probes = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, PROBE_STARTUP_PATH, "deferred" if defer_scene_view else "eager"],
+                                    check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+            probes.append(json.loads(output.splitlines()[-1]))
+        summary = {"total_latency": _summarize([probe["total_ms"] / 1e3 for probe in probes])}
+        summary.update({key: value for key, value in probes[-1].items() if not key.endswith("_ms")})
+        result["deferred" if defer_scene_view else "eager"] = summary
+    return result
+
+
+def _get_extension_version():
+    path = os.path.join(standins.EXTENSION_PATH, "config", "extension.toml")
+    with open(path) as toml:
+        for line in toml:
+            if line.startswith("version"):
+                return line.split("=", 1)[1].strip().strip('"')
+    return None
+
+
+def run(repeat, instrumentation=False):
+    """Run all benchmarks.
+
+    Args:
+        repeat (int): Number of iterations of each timed operation.
+        instrumentation (bool): Whether to enable the extension instrumentation and add its report to the results.
+
+    Returns:
+        dict: The benchmark results.
+    """
+    stats.reset()
+    stats.enabled = instrumentation
+    benchmarks = {
+        "startup": lambda: bench_startup(max(1, repeat // 20)),
+        "rebuild": lambda: bench_rebuild(repeat),
+        "model_change": lambda: bench_model_change(repeat),
+        "style_change": lambda: bench_style_change(repeat),
+        "safe_areas": lambda: bench_safe_areas(repeat),
+        "preset": lambda: bench_preset(repeat),
+        "preset_load": lambda: bench_preset_load(repeat),
+        "sync": lambda: bench_sync(repeat),
+        "idle_toggle": lambda: bench_idle_toggle(repeat),
+        "resize_storm": lambda: bench_resize_storm(repeat * 2),
+        "policy_boundary": lambda: bench_policy_boundary(repeat),
+        "raster": lambda: bench_raster(repeat),
+        "camera": lambda: bench_camera(repeat * 10),
+        "playback": lambda: bench_playback(),
+        "multi_viewport": lambda: bench_multi_viewport(repeat),
+        "control": lambda: bench_control(repeat),
+        "menu": lambda: bench_menu(repeat),
+    }
+    results = {}
+    for name, benchmark in benchmarks.items():
+        views.clear_geometry_cache()
+        results[name] = benchmark()
+    report = {
+        "extension_version": _get_extension_version(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "results": results,
+    }
+    if instrumentation:
+        report["instrumentation"] = stats.get_report()
+        stats.enabled = False
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout.")
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations of each timed operation.")
+    parser.add_argument("--instrumentation", action="store_true",
+                        help="Enable the extension instrumentation and include its report.")
+    args = parser.parse_args()
+
+    results = json.dumps(run(args.repeat, args.instrumentation), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(results + "\n")
+    else:
+        print(results)
+
+
+if __name__ == "__main__":
+    main()
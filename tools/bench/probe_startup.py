@@ -0,0 +1,52 @@
+"""Start and stop omni.example.reticle once in a fresh interpreter and print what startup cost as JSON.
+
+Used by the startup benchmark of bench_reticle.py, which runs it in a new process for every sample so module
+imports are paid for every time.
+
+Usage:
+    python tools/bench/probe_startup.py {eager,deferred}
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import standins  # noqa: E402
+
+EXT_ID = "omni.example.reticle-bench"
+
+
+def main():
+    defer_scene_view = sys.argv[1] == "deferred"
+    standins.install()
+    settings = standins.get_settings()
+    settings.set("/exts/omni.example.reticle/deferSceneView", defer_scene_view)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings.set("/exts/omni.example.reticle/presets/path", os.path.join(temp_dir, "presets.json"))
+        standins.ViewportWindow("Viewport")
+        preloaded = set(sys.modules)
+
+        start = time.perf_counter()
+        import omni.example.reticle
+        imported = time.perf_counter()
+        extension = omni.example.reticle.ExampleViewportReticleExtension()
+        extension.on_startup(EXT_ID)
+        started = time.perf_counter()
+
+        loaded = set(sys.modules) - preloaded
+        print(json.dumps({
+            "import_ms": (imported - start) * 1e3,
+            "on_startup_ms": (started - imported) * 1e3,
+            "total_ms": (started - start) * 1e3,
+            "scene_items_created": standins.items_created("scene"),
+            "ui_items_created": standins.items_created("ui"),
+            "numpy_imported": "numpy" in loaded,
+            "styles_imported": "omni.example.reticle.styles" in loaded,
+        }))
+        extension.on_shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,842 @@
+"""Lightweight stand-ins for the Kit modules used by omni.example.reticle.
+
+These are only meant to run the extension code on plain CPython for benchmarking. They mimic the small
+subset of omni.ui, omni.ui.scene, carb, omni.ext, omni.kit.app, omni.kit.viewport.utility, omni.usd,
+omni.timeline and pxr that the extension touches and count every widget and scene item that gets created.
+"""
+import asyncio
+import collections
+import enum
+import os
+import sys
+import tempfile
+import types
+
+EXTENSION_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "exts", "omni.example.reticle"))
+
+# Number of ui widgets and scene items created, keyed by type name.
+CREATED = collections.Counter()
+
+
+def reset_counters():
+    """Reset all creation counters."""
+    CREATED.clear()
+
+
+def items_created(module=None):
+    """Get the total number of created objects, optionally filtered by stand-in module ("ui" or "scene")."""
+    if module is None:
+        return sum(CREATED.values())
+    prefix = module + "."
+    return sum(count for name, count in CREATED.items() if name.startswith(prefix))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# omni.ui
+# ---------------------------------------------------------------------------------------------------------------------
+_container_stack = []
+
+
+class _Widget:
+    _module = "ui"
+
+    def __init__(self, *args, **kwargs):
+        CREATED["{}.{}".format(self._module, type(self).__name__)] += 1
+        self.args = args
+        self.children = []
+        self.visible = True
+        self.enabled = True
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        if _container_stack:
+            _container_stack[-1].children.append(self)
+
+    def destroy(self):
+        self.children = []
+
+    def set_computed_content_size_changed_fn(self, fn):
+        self.computed_content_size_changed_fn = fn
+
+    def __enter__(self):
+        _container_stack.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _container_stack.pop()
+
+
+class _Container(_Widget):
+    def clear(self):
+        self.children = []
+
+
+class Frame(_Container):
+    def __init__(self, *args, **kwargs):
+        self._build_fn = None
+        self.computed_width = 0
+        self.computed_height = 0
+        super().__init__(*args, **kwargs)
+
+    def __enter__(self):
+        self.clear()
+        return super().__enter__()
+
+    def set_build_fn(self, fn):
+        self._build_fn = fn
+
+    def rebuild(self):
+        self.clear()
+        if self._build_fn is not None:
+            with self:
+                self._build_fn()
+
+
+class ZStack(_Container):
+    pass
+
+
+class VStack(_Container):
+    pass
+
+
+class HStack(_Container):
+    pass
+
+
+class VGrid(_Container):
+    pass
+
+
+class Menu(_Container):
+    def __init__(self, title="", **kwargs):
+        self.shown = False
+        self.width = 0
+        self.height = 0
+        super().__init__(title, **kwargs)
+
+    def show_at(self, x, y):
+        self.shown = True
+
+    def hide(self):
+        self.shown = False
+
+
+class Spacer(_Widget):
+    pass
+
+
+class Label(_Widget):
+    pass
+
+
+class Button(_Widget):
+    def __init__(self, text="", **kwargs):
+        self.text = text
+        self.checked = False
+        super().__init__(**kwargs)
+
+
+class _ModelWidget(_Widget):
+    def __init__(self, model=None, **kwargs):
+        super().__init__(**kwargs)
+        self.model = model
+
+
+class CheckBox(_ModelWidget):
+    pass
+
+
+class FloatSlider(_ModelWidget):
+    pass
+
+
+class FloatDrag(_ModelWidget):
+    pass
+
+
+class Rectangle(_Widget):
+    pass
+
+
+class Image(_Widget):
+    pass
+
+
+class Alignment(enum.IntEnum):
+    LEFT = 0
+    TOP = 1
+    CENTER = 2
+
+
+class SliderDrawMode(enum.IntEnum):
+    FILLED = 0
+    HANDLE = 1
+    DRAG = 2
+
+
+class _SimpleModel:
+    _cast = float
+
+    def __init__(self, value=0, min=None, max=None):
+        self._value = self._cast(value)
+        self.min = min
+        self.max = max
+        self._callbacks = {}
+        self._next_id = 0
+
+    def add_value_changed_fn(self, fn):
+        self._next_id += 1
+        self._callbacks[self._next_id] = fn
+        return self._next_id
+
+    def remove_value_changed_fn(self, callback_id):
+        self._callbacks.pop(callback_id, None)
+
+    def get_value_changed_fn_count(self):
+        return len(self._callbacks)
+
+    def set_value(self, value):
+        value = self._cast(value)
+        if self.min is not None:
+            value = self._cast(max(self.min, value))
+        if self.max is not None:
+            value = self._cast(min(self.max, value))
+        if value == self._value:
+            return
+        self._value = value
+        for fn in list(self._callbacks.values()):
+            fn(self)
+
+    def get_value_as_int(self):
+        return int(self._value)
+
+    def get_value_as_bool(self):
+        return bool(self._value)
+
+    def get_value_as_float(self):
+        return float(self._value)
+
+    as_int = property(get_value_as_int)
+    as_bool = property(get_value_as_bool)
+    as_float = property(get_value_as_float)
+
+
+class SimpleIntModel(_SimpleModel):
+    _cast = int
+
+
+class SimpleBoolModel(_SimpleModel):
+    _cast = bool
+
+
+class SimpleFloatModel(_SimpleModel):
+    _cast = float
+
+
+class _ColorShade:
+    """Stand-in for omni.ui.color: callable for packing colors, attribute access for named shades."""
+
+    def __call__(self, r, g=None, b=None, a=1.0):
+        if g is None:
+            return r
+        channels = [int(max(0.0, min(1.0, c)) * 255) for c in (r, g, b, a)]
+        return (channels[3] << 24) | (channels[2] << 16) | (channels[1] << 8) | channels[0]
+
+    def __getattr__(self, name):
+        return 0xFFFFFFFF
+
+
+class Window(_Widget):
+    def __init__(self, title="", width=400, height=300, **kwargs):
+        self.title = title
+        super().__init__(**kwargs)
+        self.width = width
+        self.height = height
+        self.frame = Frame()
+        self.frame.computed_width = width
+        self.frame.computed_height = height
+
+
+class Workspace:
+    _visibility_changed_fns = []
+
+    @classmethod
+    def set_window_visibility_changed_callback(cls, fn):
+        cls._visibility_changed_fns.append(fn)
+        return fn
+
+    @classmethod
+    def remove_window_visibility_changed_callback(cls, fn):
+        if fn in cls._visibility_changed_fns:
+            cls._visibility_changed_fns.remove(fn)
+
+    @classmethod
+    def notify_window_visibility_changed(cls, title, visible):
+        for fn in list(cls._visibility_changed_fns):
+            fn(title, visible)
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# omni.ui.scene
+# ---------------------------------------------------------------------------------------------------------------------
+class _SceneItem(_Widget):
+    _module = "scene"
+
+
+class _SceneContainer(_SceneItem):
+    def clear(self):
+        self.children = []
+
+
+class _Scene(_SceneContainer):
+    pass
+
+
+class AspectRatioPolicy(enum.IntEnum):
+    STRETCH = 0
+    PRESERVE_ASPECT_FIT = 1
+    PRESERVE_ASPECT_CROP = 2
+    PRESERVE_ASPECT_VERTICAL = 3
+    PRESERVE_ASPECT_HORIZONTAL = 4
+
+
+class SceneView(_Widget):
+    _module = "scene"
+
+    def __init__(self, aspect_ratio_policy=AspectRatioPolicy.PRESERVE_ASPECT_FIT, **kwargs):
+        super().__init__(**kwargs)
+        self.aspect_ratio_policy = aspect_ratio_policy
+        self.scene = _Scene()
+        # The scene is not a child of whatever container is open while the SceneView is created.
+        CREATED["scene._Scene"] -= 1
+
+
+class Transform(_SceneContainer):
+    def __init__(self, transform=None, **kwargs):
+        self.transform = transform
+        super().__init__(**kwargs)
+
+
+class Line(_SceneItem):
+    def __init__(self, start=None, end=None, **kwargs):
+        self.start = start
+        self.end = end
+        super().__init__(**kwargs)
+
+
+class Curve(_SceneItem):
+    def __init__(self, positions=None, **kwargs):
+        self.positions = positions
+        super().__init__(**kwargs)
+
+
+class SceneRectangle(_SceneItem):
+    def __init__(self, width=1, height=1, **kwargs):
+        self.width = width
+        self.height = height
+        super().__init__(**kwargs)
+
+
+class Points(_SceneItem):
+    def __init__(self, positions=None, **kwargs):
+        self.positions = positions
+        super().__init__(**kwargs)
+
+
+class PolygonMesh(_SceneItem):
+    def __init__(self, positions=None, colors=None, vertex_counts=None, vertex_indices=None, **kwargs):
+        self.positions = positions
+        self.colors = colors
+        self.vertex_counts = vertex_counts
+        self.vertex_indices = vertex_indices
+        super().__init__(**kwargs)
+
+
+class Matrix44(list):
+    @staticmethod
+    def get_translation_matrix(x, y, z):
+        return Matrix44([1, 0, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, x, y, z, 1])
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# carb
+# ---------------------------------------------------------------------------------------------------------------------
+class _Settings:
+    def __init__(self):
+        self._values = {}
+        self._subscriptions = {}
+        self._next_id = 0
+        self.reads = 0
+
+    def get(self, path):
+        self.reads += 1
+        return self._values.get(path)
+
+    def set(self, path, value):
+        self._values[path] = value
+        for sub_path, fn in list(self._subscriptions.values()):
+            if path == sub_path:
+                fn(path, "CHANGED")
+
+    def set_default(self, path, value):
+        self._values.setdefault(path, value)
+
+    def subscribe_to_node_change_events(self, path, fn):
+        self._next_id += 1
+        self._subscriptions[self._next_id] = (path, fn)
+        return self._next_id
+
+    def unsubscribe_to_change_events(self, sub_id):
+        self._subscriptions.pop(sub_id, None)
+
+
+_settings = _Settings()
+
+
+def _log(msg):
+    pass
+
+
+class _Tokens:
+    """Resolves ${data} and ${temp} to the system temporary directory."""
+    def resolve(self, path):
+        temp_dir = tempfile.gettempdir()
+        return path.replace("${data}", temp_dir).replace("${temp}", temp_dir)
+
+
+_tokens = _Tokens()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# omni.kit.app
+# ---------------------------------------------------------------------------------------------------------------------
+class _EventStream:
+    def __init__(self):
+        self._subscribers = {}
+        self._next_id = 0
+
+    def create_subscription_to_pop(self, fn, name=None, order=0):
+        self._next_id += 1
+        sub_id = self._next_id
+        self._subscribers[sub_id] = fn
+        stream = self
+
+        class _Subscription:
+            def unsubscribe(self):
+                stream._subscribers.pop(sub_id, None)
+
+            def __del__(self):
+                self.unsubscribe()
+
+        return _Subscription()
+
+    def pump(self, event=None):
+        for fn in list(self._subscribers.values()):
+            fn(event)
+
+
+class _App:
+    def __init__(self):
+        self._waiters = []
+        self.frame = 0
+        self._update_stream = _EventStream()
+
+    def get_update_event_stream(self):
+        return self._update_stream
+
+    def next_update_async(self):
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.append(future)
+        return future
+
+    async def update_async(self, frames=1):
+        """Advance the stand-in app by a number of frames, resuming anything waiting on next_update_async."""
+        for _ in range(frames):
+            # Let freshly scheduled tasks reach their first await.
+            for _ in range(3):
+                await asyncio.sleep(0)
+            self.frame += 1
+            waiters, self._waiters = self._waiters, []
+            for future in waiters:
+                if not future.done():
+                    future.set_result(None)
+            self._update_stream.pump()
+            for _ in range(3):
+                await asyncio.sleep(0)
+
+
+_app = _App()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Viewport
+# ---------------------------------------------------------------------------------------------------------------------
+class ViewportAPI:
+    def __init__(self, resolution=(1920, 1080), camera_path="/OmniverseKit_Persp"):
+        self._resolution = tuple(resolution)
+        self.fill_frame = False
+        self.camera_path = camera_path
+        self.stage = None
+        self._view_change_fns = {}
+        self._next_id = 0
+        self.resolution_reads = 0
+
+    @property
+    def resolution(self):
+        self.resolution_reads += 1
+        return self._resolution
+
+    @resolution.setter
+    def resolution(self, value):
+        self._resolution = tuple(value)
+        self.notify_view_change()
+
+    def get_texture_resolution(self):
+        return self._resolution
+
+    def subscribe_to_view_change(self, fn):
+        self._next_id += 1
+        sub_id = self._next_id
+        self._view_change_fns[sub_id] = fn
+        fns = self._view_change_fns
+
+        class _Subscription:
+            def __del__(self):
+                fns.pop(sub_id, None)
+
+        return _Subscription()
+
+    def notify_view_change(self):
+        for fn in list(self._view_change_fns.values()):
+            fn(self)
+
+
+class ViewportWindow(Window):
+    _instances = []
+
+    def __init__(self, title="Viewport", width=1280, height=720, resolution=(1920, 1080)):
+        super().__init__(title, width=width, height=height)
+        self.viewport_api = ViewportAPI(resolution)
+        self._frames = {}
+        self._width_changed_fn = None
+        self._height_changed_fn = None
+        ViewportWindow._instances.append(self)
+
+    def get_frame(self, name):
+        if name not in self._frames:
+            self._frames[name] = Frame()
+        return self._frames[name]
+
+    def set_width_changed_fn(self, fn):
+        self._width_changed_fn = fn
+
+    def set_height_changed_fn(self, fn):
+        self._height_changed_fn = fn
+
+    def resize(self, width=None, height=None):
+        """Resize the window, firing width/height changed callbacks like omni.ui does."""
+        if width is not None and width != self.width:
+            self.width = width
+            self.frame.computed_width = width
+            if self._width_changed_fn is not None:
+                self._width_changed_fn(width)
+        if height is not None and height != self.height:
+            self.height = height
+            self.frame.computed_height = height
+            if self._height_changed_fn is not None:
+                self._height_changed_fn(height)
+
+    def destroy(self):
+        if self in ViewportWindow._instances:
+            ViewportWindow._instances.remove(self)
+        super().destroy()
+
+
+def _get_active_viewport_window(*args, **kwargs):
+    return ViewportWindow._instances[0] if ViewportWindow._instances else None
+
+
+def _get_viewport_window_instances(*args, **kwargs):
+    return iter(list(ViewportWindow._instances))
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# omni.usd / pxr
+# ---------------------------------------------------------------------------------------------------------------------
+class SdfPath(str):
+    def AppendProperty(self, name):
+        return SdfPath(f"{self}.{name}")
+
+
+class UsdTimeCode:
+    """A timecode, or the default time when built without a value."""
+    def __init__(self, value=None):
+        self._value = None if value is None else float(value)
+
+    @classmethod
+    def Default(cls):
+        return cls()
+
+    def IsDefault(self):
+        return self._value is None
+
+    def GetValue(self):
+        return float("nan") if self._value is None else self._value
+
+
+class _Watcher:
+    """Dispatches attribute changes to the callbacks subscribed to their exact path, like omni.usd's UsdWatcher."""
+    def __init__(self):
+        self._fns = collections.defaultdict(dict)
+        self._next_id = 0
+        self.dispatched = 0
+
+    def _subscribe(self, path, fn):
+        self._next_id += 1
+        sub_id = self._next_id
+        fns = self._fns[str(path)]
+        fns[sub_id] = fn
+
+        class _Subscription:
+            def __del__(self):
+                fns.pop(sub_id, None)
+
+        return _Subscription()
+
+    def subscribe_to_change_info_path(self, path, fn):
+        return self._subscribe(path, fn)
+
+    def subscribe_to_resync_path(self, path, fn):
+        return self._subscribe(path, fn)
+
+    def notify(self, path):
+        fns = self._fns.get(str(path))
+        if fns:
+            for fn in list(fns.values()):
+                self.dispatched += 1
+                fn(SdfPath(path))
+
+
+_watcher = _Watcher()
+
+
+class _Attribute:
+    def __init__(self, prim, name):
+        self._prim = prim
+        self._name = name
+
+    def __bool__(self):
+        return self._name in self._prim._values or self._name in self._prim._samples
+
+    def GetTimeSamples(self):
+        return sorted(self._prim._samples.get(self._name, {}))
+
+    def Get(self, time=None):
+        self._prim.stage.reads += 1
+        if isinstance(time, UsdTimeCode):
+            time = None if time.IsDefault() else time.GetValue()
+        samples = self._prim._samples.get(self._name)
+        if samples and time is not None:
+            # Linear interpolation, held before the first and after the last sample, like USD. The default time
+            # only reads the default value.
+            times = sorted(samples)
+            if time <= times[0]:
+                return samples[times[0]]
+            for start, end in zip(times, times[1:]):
+                if time <= end:
+                    return samples[start] + (samples[end] - samples[start]) * (time - start) / (end - start)
+            return samples[times[-1]]
+        return self._prim._values.get(self._name)
+
+    def Set(self, value, time=None):
+        if time is None:
+            self._prim._values[self._name] = value
+        else:
+            self._prim._samples.setdefault(self._name, {})[time] = value
+        _watcher.notify(f"{self._prim.path}.{self._name}")
+        return True
+
+
+class _Prim:
+    def __init__(self, stage, path):
+        self.stage = stage
+        self.path = path
+        self._values = {}
+        self._samples = {}
+
+    def IsValid(self):
+        return True
+
+    def GetAttribute(self, name):
+        return _Attribute(self, name)
+
+
+class Stage:
+    """A flat stage of prims holding attribute values."""
+    def __init__(self):
+        self._prims = {}
+        self.reads = 0
+
+    def DefinePrim(self, path, **values):
+        prim = self._prims.get(path) or _Prim(self, path)
+        self._prims[path] = prim
+        for name, value in values.items():
+            prim._values[name] = value
+        return prim
+
+    def GetPrimAtPath(self, path):
+        return self._prims.get(str(path))
+
+
+class _UsdContext:
+    def __init__(self):
+        self._stage_event_stream = _EventStream()
+
+    def get_stage_url(self):
+        return ""
+
+    def get_stage_event_stream(self):
+        return self._stage_event_stream
+
+
+class StageEventType(enum.IntEnum):
+    OPENED = 0
+    CLOSING = 1
+
+
+_usd_context = _UsdContext()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# omni.timeline
+# ---------------------------------------------------------------------------------------------------------------------
+class TimelineEventType(enum.IntEnum):
+    PLAY = 0
+    PAUSE = 1
+    STOP = 2
+    CURRENT_TIME_CHANGED = 3
+    CURRENT_TIME_TICKED = 4
+
+
+class _TimelineEvent:
+    def __init__(self, event_type, payload=None):
+        self.type = int(event_type)
+        self.payload = payload or {}
+
+
+class _Timeline:
+    def __init__(self):
+        self._event_stream = _EventStream()
+        self.start_time = 0.0
+        self.end_time = 10.0
+        self.time_codes_per_second = 24.0
+        self.current_time = 0.0
+
+    def get_timeline_event_stream(self):
+        return self._event_stream
+
+    def get_start_time(self):
+        return self.start_time
+
+    def get_end_time(self):
+        return self.end_time
+
+    def get_time_codes_per_seconds(self):
+        return self.time_codes_per_second
+
+    def get_current_time(self):
+        return self.current_time
+
+    def play(self):
+        self._event_stream.pump(_TimelineEvent(TimelineEventType.PLAY))
+
+    def tick(self, timecode):
+        """Advance playback to a timecode, firing CURRENT_TIME_TICKED like the timeline does on every frame."""
+        self.current_time = timecode / self.time_codes_per_second
+        self._event_stream.pump(_TimelineEvent(TimelineEventType.CURRENT_TIME_TICKED,
+                                               {"currentTime": self.current_time}))
+
+
+_timeline = _Timeline()
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Installation
+# ---------------------------------------------------------------------------------------------------------------------
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Install the stand-ins into sys.modules so omni.example.reticle can be imported without Kit."""
+    if "omni.ui" in sys.modules and getattr(sys.modules["omni.ui"], "IS_STANDIN", False):
+        return
+
+    omni = _module("omni")
+    # Let the real omni.example.reticle package be found next to the stand-ins.
+    omni.__path__ = [os.path.join(EXTENSION_PATH, "omni")]
+    ui_attrs = {name: value for name, value in globals().items()
+                if name in ("Frame", "ZStack", "VStack", "HStack", "VGrid", "Menu", "Spacer", "Label", "Button",
+                            "CheckBox", "FloatSlider", "FloatDrag", "Rectangle", "Image", "Alignment",
+                            "SliderDrawMode", "SimpleIntModel", "SimpleBoolModel", "SimpleFloatModel", "Window",
+                            "Workspace")}
+    ui = _module("omni.ui", IS_STANDIN=True, color=_ColorShade(), **ui_attrs)
+    ui.__path__ = []
+    scene = _module("omni.ui.scene", SceneView=SceneView, AspectRatioPolicy=AspectRatioPolicy, Transform=Transform,
+                    Line=Line, Curve=Curve, Rectangle=SceneRectangle, Points=Points, PolygonMesh=PolygonMesh,
+                    Matrix44=Matrix44)
+    ui.scene = scene
+    omni.ui = ui
+
+    ext = _module("omni.ext", IExt=type("IExt", (), {}))
+    omni.ext = ext
+    kit = _module("omni.kit")
+    kit.__path__ = []
+    omni.kit = kit
+    app = _module("omni.kit.app", get_app=lambda: _app)
+    kit.app = app
+    viewport = _module("omni.kit.viewport")
+    viewport.__path__ = []
+    kit.viewport = viewport
+    utility = _module("omni.kit.viewport.utility", get_active_viewport_window=_get_active_viewport_window)
+    viewport.utility = utility
+    window = _module("omni.kit.viewport.window", get_viewport_window_instances=_get_viewport_window_instances,
+                     ViewportWindow=ViewportWindow)
+    viewport.window = window
+
+    carb = _module("carb", log_info=_log, log_warn=_log, log_error=_log)
+    carb.__path__ = []
+    carb.settings = _module("carb.settings", get_settings=lambda: _settings)
+    carb.tokens = _module("carb.tokens", get_tokens_interface=lambda: _tokens)
+
+    omni.usd = _module("omni.usd", get_watcher=lambda: _watcher, get_context=lambda: _usd_context,
+                       StageEventType=StageEventType)
+    omni.timeline = _module("omni.timeline", get_timeline_interface=lambda: _timeline,
+                            TimelineEventType=TimelineEventType)
+    pxr = _module("pxr")
+    pxr.__path__ = []
+    pxr.Sdf = _module("pxr.Sdf", Path=SdfPath)
+    pxr.Usd = _module("pxr.Usd", TimeCode=UsdTimeCode)
+
+
+def get_app():
+    """Get the stand-in omni.kit.app application."""
+    return _app
+
+
+def get_settings():
+    """Get the stand-in carb settings."""
+    return _settings
+
+
+def get_watcher():
+    """Get the stand-in omni.usd watcher."""
+    return _watcher
+
+
+def get_timeline():
+    """Get the stand-in omni.timeline interface."""
+    return _timeline
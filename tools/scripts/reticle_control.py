@@ -0,0 +1,129 @@
+"""Client of the omni.example.reticle control endpoint.
+
+Sends batches of reticle commands to a Kit process whose /exts/omni.example.reticle/control/path setting is set, and
+prints the JSON response of each batch. Only needs the Python standard library, so it runs outside Kit. See
+omni/example/reticle/control.py for the commands.
+
+Usage:
+    python tools/scripts/reticle_control.py SOCKET_PATH BATCHES_JSON
+
+BATCHES_JSON is a file holding a JSON list of batches, each a {"commands": [...], "viewports": [...]} object.
+Use - to read it from stdin.
+
+From Python:
+    async with ReticleControlClient("/tmp/reticle.sock") as client:
+        response = await client.send_batch([{"op": "set", "values": {"letterbox_ratio": 2.39}}], ["Viewport"])
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+
+# Largest response line read, which grows with the number of viewports whose state is requested.
+MAX_RESPONSE_SIZE = 16 * 1024 * 1024
+
+
+class ReticleControlClient:
+    """Async client of the reticle control endpoint. Use it as an async context manager or call connect()."""
+    def __init__(self, path):
+        """ReticleControlClient constructor
+
+        Args:
+            path (str): The Unix socket path of the endpoint.
+        """
+        self.path = path
+        self._reader = None
+        self._writer = None
+        self._ids = itertools.count(1)
+
+    async def connect(self):
+        """Connect to the endpoint."""
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path, limit=MAX_RESPONSE_SIZE)
+
+    async def close(self):
+        """Close the connection."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._reader = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def _write_batch(self, commands, viewports=None, get_state=False):
+        request = {"id": next(self._ids), "commands": list(commands)}
+        if viewports is not None:
+            request["viewports"] = list(viewports)
+        if get_state:
+            request["get_state"] = True
+        self._writer.write(json.dumps(request, separators=(",", ":")).encode("utf-8") + b"\n")
+
+    async def _read_response(self):
+        line = await self._reader.readline()
+        if not line:
+            raise ConnectionError("The reticle control endpoint closed the connection")
+        return json.loads(line)
+
+    async def send_batch(self, commands, viewports=None, get_state=False):
+        """Send a batch of commands and wait for its response.
+
+        Args:
+            commands (list): The command dicts.
+            viewports (list): Titles of the viewport windows to apply the commands to. All of them if None.
+            get_state (bool): Whether to get the resulting state of each viewport in the response.
+
+        Returns:
+            dict: The response, with its "round_trip_ms" added. "ok" is false and "error" is set if the batch was
+            rejected.
+        """
+        start = time.perf_counter()
+        self._write_batch(commands, viewports, get_state)
+        await self._writer.drain()
+        response = await self._read_response()
+        response["round_trip_ms"] = (time.perf_counter() - start) * 1e3
+        return response
+
+    async def send_batches(self, batches):
+        """Send several batches at once and wait for all their responses, which are applied in order.
+
+        Args:
+            batches (list): Dicts of the send_batch() arguments.
+
+        Returns:
+            list: The response of each batch.
+        """
+        for batch in batches:
+            self._write_batch(batch.get("commands", []), batch.get("viewports"), batch.get("get_state", False))
+        await self._writer.drain()
+        return [await self._read_response() for _ in batches]
+
+
+async def _send(path, batches):
+    async with ReticleControlClient(path) as client:
+        return await client.send_batches(batches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="Unix socket path of the reticle control endpoint.")
+    parser.add_argument("batches", help="JSON file holding a list of batches, - for stdin.")
+    args = parser.parse_args()
+    if args.batches == "-":
+        batches = json.load(sys.stdin)
+    else:
+        with open(args.batches, "r", encoding="utf-8") as batches_file:
+            batches = json.load(batches_file)
+    responses = asyncio.run(_send(args.path, batches))
+    for response in responses:
+        print(json.dumps(response))
+    return 0 if all(response.get("ok") for response in responses) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())